@@ -0,0 +1,256 @@
+"""Pre-registered test accounts, leased exclusively to one test at a time.
+
+Registering a user through the UI costs several page loads, and random
+4-digit email suffixes collide once workers run in parallel. Instead the
+runner registers a batch of accounts up front over HTTP (concurrently,
+see http_auth) and stores them with their credentials in a JSON file.
+A test that needs "an existing user" leases one, which is a locked file
+update and no page loads; the lease is returned when the test ends.
+
+A test that changes an account in a way later tests should not see
+(enrolling in courses, say) releases it dirty; dirty accounts are never
+leased again and are dropped by reclaim(). Leases held by processes that
+have exited are freed by reclaim() as well, so a crashed worker cannot
+strand accounts. A lease records its owner's host, boot, PID namespace
+and process start time, so a reused PID is not mistaken for the owner.
+A lease taken somewhere reclaim() cannot inspect (another host or
+container sharing the file) is only freed once it is older than
+SMS_ACCOUNT_LEASE_MAX_AGE_MIN minutes.
+
+    python account_pool.py seed --count 20
+    python account_pool.py status
+    python account_pool.py reclaim
+"""
+import argparse
+import fcntl
+import json
+import os
+import secrets
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import config
+from http_auth import AppClient, AuthError
+
+FREE = "free"
+LEASED = "leased"
+DIRTY = "dirty"
+
+SEED_CONCURRENCY = 8
+
+
+def new_account(prefix="pool"):
+    """Credentials for an account that does not exist yet (48 random bits, no collisions)."""
+    token = secrets.token_hex(6)
+    return {'name': f"Pool User {token}", 'email': f"{prefix}{token}@example.com",
+            'password': secrets.token_urlsafe(12)}
+
+
+def _read(path):
+    try:
+        with open(path) as handle:
+            return handle.read().strip()
+    except OSError:
+        return None
+
+
+def _start_time(pid):
+    """The process's start time in clock ticks since boot (Linux), or None."""
+    stat = _read(f"/proc/{pid}/stat")
+    if stat is None:
+        return None
+    # The command name may contain spaces; fields after it are space-separated
+    return int(stat.rsplit(")", 1)[1].split()[19])
+
+
+def _namespace():
+    """Where a PID means something: this host, this boot, this PID namespace."""
+    try:
+        pid_namespace = os.readlink("/proc/self/ns/pid")
+    except OSError:
+        pid_namespace = None
+    return {'host': socket.gethostname(), 'boot': _read("/proc/sys/kernel/random/boot_id"),
+            'pid_ns': pid_namespace}
+
+
+def _owner():
+    pid = os.getpid()
+    return dict(_namespace(), pid=pid, start=_start_time(pid))
+
+
+def _alive(owner):
+    """True while the lease owner runs; None when it cannot be checked from here."""
+    if not isinstance(owner, dict) or any(owner.get(key) != value for key, value in _namespace().items()):
+        return None
+    try:
+        os.kill(owner['pid'], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    # The PID may have been reused by a process started later
+    return owner.get('start') is None or _start_time(owner['pid']) == owner['start']
+
+
+class Account:
+    """A leased account; release() hands it back."""
+
+    def __init__(self, pool, record):
+        self.pool = pool
+        self.name = record['name']
+        self.email = record['email']
+        self.password = record['password']
+
+    def as_dict(self):
+        return {'name': self.name, 'email': self.email, 'password': self.password}
+
+    def release(self, dirty=False):
+        self.pool.release(self, dirty)
+
+    def __repr__(self):
+        return f"Account({self.email!r})"
+
+
+class AccountPool:
+    """Accounts registered on one application, persisted in a shared JSON file.
+
+    The file holds a list of accounts per base URL; every read-modify-write
+    happens under an exclusive flock, so workers in separate processes can
+    lease from the same file.
+    """
+
+    def __init__(self, base_url=None, path=None):
+        self.base_url = (base_url or config.BASE_URL).rstrip("/") + "/"
+        self.path = path or config.ACCOUNT_POOL
+
+    @contextmanager
+    def _locked(self):
+        """Yield this application's account list and save it back afterwards."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.path) as handle:
+                        data = json.load(handle)
+                except (FileNotFoundError, ValueError):
+                    data = {}
+                accounts = data.setdefault(self.base_url, [])
+                yield accounts
+                with open(self.path + ".tmp", "w") as handle:
+                    json.dump(data, handle, indent=2, sort_keys=True)
+                os.replace(self.path + ".tmp", self.path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def counts(self):
+        with self._locked() as accounts:
+            counts = {FREE: 0, LEASED: 0, DIRTY: 0}
+            for record in accounts:
+                counts[record['state']] += 1
+            return counts
+
+    def seed(self, count, concurrency=SEED_CONCURRENCY):
+        """Register accounts until `count` are free; returns how many were created."""
+        with self._locked() as accounts:
+            missing = count - sum(1 for record in accounts if record['state'] == FREE)
+        if missing <= 0:
+            return 0
+        # Registration happens outside the lock so workers can keep leasing meanwhile
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, missing))) as executor:
+            created = [record for record in executor.map(self._register, range(missing)) if record]
+        with self._locked() as accounts:
+            accounts.extend(created)
+        return len(created)
+
+    def _register(self, _):
+        record = new_account()
+        try:
+            AppClient(self.base_url).register(record['name'], record['email'], record['password'])
+        except (AuthError, OSError):
+            return None
+        record.update(state=FREE, owner=None, leased_at=None)
+        return record
+
+    def lease(self):
+        """Take a free account exclusively, registering a fresh one if the pool is empty."""
+        owner = _owner()
+        with self._locked() as accounts:
+            for record in accounts:
+                if record['state'] == FREE:
+                    record.update(state=LEASED, owner=owner, leased_at=time.time())
+                    return Account(self, record)
+        record = new_account()
+        AppClient(self.base_url).register(record['name'], record['email'], record['password'])
+        record.update(state=LEASED, owner=owner, leased_at=time.time())
+        with self._locked() as accounts:
+            accounts.append(record)
+        return Account(self, record)
+
+    def release(self, account, dirty=False):
+        with self._locked() as accounts:
+            for record in accounts:
+                if record['email'] == account.email:
+                    record.update(state=DIRTY if dirty else FREE, owner=None, leased_at=None)
+                    break
+
+    @staticmethod
+    def _held(record, cutoff):
+        alive = _alive(record['owner'])
+        if alive is None:
+            return (record.get('leased_at') or 0) >= cutoff
+        return alive
+
+    def reclaim(self, max_age_minutes=None):
+        """Free leases whose process is gone and forget dirty accounts.
+
+        Leases whose owner cannot be checked from here expire after
+        max_age_minutes. Returns (freed, dropped).
+        """
+        if max_age_minutes is None:
+            max_age_minutes = config.ACCOUNT_LEASE_MAX_AGE_MIN
+        cutoff = time.time() - max_age_minutes * 60
+        freed = dropped = 0
+        with self._locked() as accounts:
+            kept = []
+            for record in accounts:
+                if record['state'] == DIRTY:
+                    dropped += 1
+                    continue
+                if record['state'] == LEASED and not self._held(record, cutoff):
+                    record.update(state=FREE, owner=None, leased_at=None)
+                    freed += 1
+                kept.append(record)
+            accounts[:] = kept
+        return freed, dropped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the pre-registered test account pool")
+    parser.add_argument("--base-url", default=config.BASE_URL)
+    parser.add_argument("--path", default=config.ACCOUNT_POOL, help="pool file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed = sub.add_parser("seed", help="register accounts until COUNT are free")
+    seed.add_argument("--count", type=int, default=config.ACCOUNT_POOL_SIZE)
+    seed.add_argument("--concurrency", type=int, default=SEED_CONCURRENCY)
+    sub.add_parser("status", help="show free / leased / dirty counts")
+    sub.add_parser("reclaim", help="free orphaned leases and drop dirty accounts")
+    args = parser.parse_args(argv)
+
+    pool = AccountPool(args.base_url, args.path)
+    if args.command == "seed":
+        start = time.monotonic()
+        created = pool.seed(args.count, args.concurrency)
+        print(f"Registered {created} account(s) in {time.monotonic() - start:.2f}s")
+    elif args.command == "reclaim":
+        freed, dropped = pool.reclaim()
+        print(f"Freed {freed} lease(s), dropped {dropped} dirty account(s)")
+    print(", ".join(f"{state}: {count}" for state, count in pool.counts().items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
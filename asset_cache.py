@@ -0,0 +1,248 @@
+"""Serve third-party assets (Bootstrap CSS/JS, fonts) from an on-disk cache.
+
+Every navigation otherwise reloads the app's CDN stylesheet and script
+before the page finishes loading. AssetInterceptor pauses those requests
+through the DevTools Fetch domain and fulfils them from a content-addressed
+cache, so page loads stop depending on CDN latency and the suite works on
+an air-gapped runner.
+
+    python asset_cache.py populate --from-page http://3.89.8.171/
+    python asset_cache.py populate https://cdn.example.com/lib.css ...
+    python asset_cache.py list
+
+Interception is on whenever the cache directory has an index; set
+SMS_ASSET_OFFLINE=1 to fail cache misses immediately instead of going
+to the network.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from urllib.parse import urljoin, urlsplit
+
+import config
+
+INTERCEPTED_TYPES = ("Stylesheet", "Script", "Font")
+FETCH_TIMEOUT = 30
+# Total time close() may spend caching missed assets, so a slow CDN cannot hold up teardown
+CLOSE_FETCH_BUDGET = 10
+
+
+def _normalise(url):
+    return url.split("#", 1)[0]
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class AssetCache:
+    """URL -> response index over content-addressed bodies stored under root/objects."""
+
+    def __init__(self, root=None):
+        self.root = root or config.ASSET_CACHE
+        self.index_path = os.path.join(self.root, "index.json")
+        self.lock = threading.Lock()
+        self._encoded = {}
+        try:
+            with open(self.index_path) as handle:
+                self.index = json.load(handle)
+        except FileNotFoundError:
+            self.index = {}
+
+    def exists(self):
+        return os.path.exists(self.index_path)
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def get(self, url):
+        """Return (entry, base64 body) for a cached url, or None."""
+        entry = self.index.get(_normalise(url))
+        if entry is None:
+            return None
+        with self.lock:
+            encoded = self._encoded.get(entry["sha256"])
+            if encoded is None:
+                try:
+                    with open(self._object_path(entry["sha256"]), "rb") as handle:
+                        encoded = base64.b64encode(handle.read()).decode()
+                except FileNotFoundError:
+                    return None
+                self._encoded[entry["sha256"]] = encoded
+        return entry, encoded
+
+    def put(self, url, content_type, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as handle:
+                handle.write(body)
+            os.replace(path + ".tmp", path)
+        with self.lock:
+            self.index[_normalise(url)] = {"sha256": digest, "content_type": content_type,
+                                           "size": len(body)}
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.index_path + ".tmp", "w") as handle:
+                json.dump(self.index, handle, indent=2, sort_keys=True)
+            os.replace(self.index_path + ".tmp", self.index_path)
+
+    def populate(self, urls, budget=None):
+        """Download urls into the cache; returns the ones that failed.
+
+        With a budget in seconds, URLs not fetched by then count as failed.
+        """
+        deadline = None if budget is None else time.monotonic() + budget
+        failed = []
+        for url in urls:
+            timeout = FETCH_TIMEOUT
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    failed.append(url)
+                    continue
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    self.put(url, response.headers.get("Content-Type", "application/octet-stream"),
+                             response.read())
+            except OSError:
+                failed.append(url)
+        return failed
+
+
+def third_party_assets(page_url):
+    """Stylesheet and script URLs referenced by page_url that live on another origin."""
+    from static_tier import snapshot
+
+    page = snapshot(page_url)
+    urls = []
+    for node in page.root.iter():
+        attr = {"link": "href", "script": "src"}.get(node.tag)
+        if attr and node.attrs.get(attr):
+            url = urljoin(page_url, node.attrs[attr])
+            if _origin(url) != _origin(page_url):
+                urls.append(url)
+    return urls
+
+
+class AssetInterceptor:
+    """Fulfils a browser window's third-party asset requests from an AssetCache."""
+
+    def __init__(self, driver, cache, app_url, offline=False):
+        from cdp import PageSession
+
+        self.cache = cache
+        self.app_origin = _origin(app_url)
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.missed = set()
+        self.session = PageSession(driver)
+        self.session.on("Fetch.requestPaused", self._paused)
+        self.session.send("Fetch.enable", {"patterns": [
+            {"urlPattern": "*", "resourceType": kind, "requestStage": "Request"}
+            for kind in INTERCEPTED_TYPES]})
+
+    async def _paused(self, params, session_id):
+        request_id = params["requestId"]
+        url = params["request"]["url"]
+        if _origin(url) == self.app_origin:
+            await self.session.send_async("Fetch.continueRequest", {"requestId": request_id})
+            return
+        cached = self.cache.get(url)
+        if cached:
+            entry, body = cached
+            self.hits += 1
+            await self.session.send_async("Fetch.fulfillRequest", {
+                "requestId": request_id,
+                "responseCode": 200,
+                "responseHeaders": [
+                    {"name": "Content-Type", "value": entry["content_type"]},
+                    {"name": "Access-Control-Allow-Origin", "value": "*"},
+                    {"name": "Cache-Control", "value": "max-age=31536000, immutable"},
+                ],
+                "body": body,
+            })
+            return
+        self.misses += 1
+        self.missed.add(url)
+        if self.offline:
+            await self.session.send_async("Fetch.failRequest", {"requestId": request_id,
+                                                                "errorReason": "InternetDisconnected"})
+        else:
+            await self.session.send_async("Fetch.continueRequest", {"requestId": request_id})
+
+    def close(self):
+        """Stop intercepting and, when online, cache what was missed for next time, within CLOSE_FETCH_BUDGET."""
+        try:
+            self.session.send("Fetch.disable")
+        except Exception:
+            pass
+        self.session.close()
+        if self.missed and not self.offline:
+            self.cache.populate(sorted(self.missed), budget=CLOSE_FETCH_BUDGET)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def intercept(driver, app_url):
+    """Start serving cached assets for driver's window, or return None if there is no cache.
+
+    Interception is an optimisation: if DevTools cannot be reached the
+    tests simply run with network-loaded assets.
+    """
+    if not config.INTERCEPT_ASSETS:
+        return None
+    cache = AssetCache()
+    if not cache.exists():
+        return None
+    try:
+        return AssetInterceptor(driver, cache, app_url, offline=config.ASSET_OFFLINE)
+    except Exception as error:
+        print(f"Asset interception disabled: {error}")
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local third-party asset cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    populate = sub.add_parser("populate", help="download assets into the cache")
+    populate.add_argument("urls", nargs="*", help="asset URLs to cache")
+    populate.add_argument("--from-page", action="append", default=[], metavar="URL",
+                          help="also cache the third-party CSS/JS referenced by this page")
+    populate.add_argument("--stub-assets", action="store_true",
+                          help="also cache the assets referenced by stub_server.py")
+    sub.add_parser("list", help="show cached URLs")
+    args = parser.parse_args(argv)
+
+    cache = AssetCache()
+    if args.command == "list":
+        for url, entry in sorted(cache.index.items()):
+            print(f"{entry['sha256'][:12]} {entry['size']:>9}  {url}")
+        return 0
+    urls = list(args.urls)
+    for page in args.from_page:
+        try:
+            urls.extend(third_party_assets(page))
+        except OSError as error:
+            print(f"Could not read {page}: {error}")
+    if args.stub_assets:
+        import stub_server
+        urls.extend([stub_server.BOOTSTRAP_CSS, stub_server.BOOTSTRAP_JS])
+    failed = cache.populate(urls)
+    print(f"Cached {len(urls) - len(failed)} asset(s) in {cache.root}")
+    for url in failed:
+        print(f"  failed: {url}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
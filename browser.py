@@ -0,0 +1,211 @@
+"""Chrome session factory.
+
+Each session gets its own profile directory and DevTools port so that
+several browsers can run side by side on one machine.
+
+Two named browser profiles are available (SMS_BROWSER_PROFILE):
+
+  * default - normal page-load strategy, every resource loaded, 1920x1080
+  * lean    - eager page-load strategy; images, fonts, media and analytics
+              blocked through DevTools; background networking, component
+              updates and extensions disabled; a smaller window
+
+A test decorated with @full_fidelity gets the default resource set and
+window size even in a lean session (the page-load strategy is fixed per
+session, but setUp waits for readyState "complete" either way).
+"""
+import os
+import shutil
+import tempfile
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+import config
+
+DEFAULT = "default"
+LEAN = "lean"
+
+PROFILES = {
+    DEFAULT: {
+        'page_load_strategy': "normal",
+        'arguments': [],
+        'window_size': (1920, 1080),
+        'blocked_urls': [],
+    },
+    LEAN: {
+        'page_load_strategy': "eager",
+        'arguments': [
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-extensions",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--mute-audio",
+            "--no-first-run",
+        ],
+        'window_size': (1024, 768),
+        'blocked_urls': [
+            # images
+            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+            # fonts
+            "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+            # media
+            "*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav",
+            # analytics
+            "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+            "*hotjar.com*", "*segment.io*",
+        ],
+    },
+}
+
+
+def full_fidelity(test_method):
+    """Run this test with every resource loaded and the full-size window."""
+    test_method.sms_full_fidelity = True
+    return test_method
+
+
+def chrome_options(worker=None, profile=None):
+    """Build headless Chrome options isolated for the given worker.
+
+    Returns the options and the temporary profile directory they point at.
+    """
+    worker = config.worker_id() if worker is None else worker
+    settings = PROFILES[profile or config.BROWSER_PROFILE]
+    profile_dir = tempfile.mkdtemp(prefix=f"sms-chrome-w{worker}-")
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=%d,%d" % settings['window_size'])
+    chrome_options.add_argument(f"--remote-debugging-port={config.DEBUG_PORT_BASE + worker}")
+    chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    for argument in settings['arguments']:
+        chrome_options.add_argument(argument)
+    chrome_options.page_load_strategy = settings['page_load_strategy']
+    # Leave unexpected alerts open and report them instead of silently dismissing
+    # them, so page_state.detect can see them in a single call
+    chrome_options.unhandled_prompt_behavior = "ignore"
+    # Keep the console so reporter.py can attach it to failures
+    chrome_options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
+    return chrome_options, profile_dir
+
+
+def apply_profile(driver, profile):
+    """Switch a running session's URL blocking and window size to profile's settings."""
+    if getattr(driver, "sms_active_profile", None) == profile:
+        return
+    settings = PROFILES[profile]
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": settings['blocked_urls']})
+    driver.set_window_size(*settings['window_size'])
+    driver.sms_active_profile = profile
+
+
+def launch_chrome(worker=None, profile=None):
+    """Start a new local Chrome session, never a pooled one (the pool daemon uses this)."""
+    options, profile_dir = chrome_options(worker, profile)
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        raise
+    driver.sms_profile_dir = profile_dir
+    return driver
+
+
+def create_driver(worker=None, profile=None):
+    """Start a Chrome session, or borrow a warm one when a browser pool is configured.
+
+    Either way the session must be handed back through quit_driver.
+    """
+    profile = profile or config.BROWSER_PROFILE
+    if config.BROWSER_POOL:
+        from browser_pool import Lease
+        driver = Lease().driver
+    else:
+        driver = launch_chrome(worker, profile)
+    driver.sms_base_profile = profile
+    if profile != DEFAULT:
+        apply_profile(driver, profile)
+    else:
+        driver.sms_active_profile = DEFAULT
+    return driver
+
+
+def prepare_for_test(driver, test_method):
+    """Apply the session's profile, or the default one for @full_fidelity tests."""
+    wanted = DEFAULT if getattr(test_method, "sms_full_fidelity", False) else driver.sms_base_profile
+    apply_profile(driver, wanted)
+
+
+def quit_driver(driver, crashed=False):
+    """Close the browser and delete its profile directory, or return a pooled session."""
+    lease = getattr(driver, "sms_lease", None)
+    if lease:
+        lease.release(crashed)
+        return
+    try:
+        driver.quit()
+    finally:
+        profile_dir = getattr(driver, "sms_profile_dir", None)
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+def process_tree_rss(driver):
+    """Resident memory, in bytes, of chromedriver and every Chrome process under it.
+
+    Returns None when it cannot be measured (no local service, or not Linux).
+    """
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    if process is None:
+        return None
+    return tree_rss(process.pid)
+
+
+def process_tree(root_pid):
+    """root_pid followed by all of its descendants' pids (empty if not Linux)."""
+    if not os.path.isdir("/proc"):
+        return []
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as handle:
+                # The command name may contain spaces; the parent pid follows its closing paren
+                ppid = int(handle.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    pids = []
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pids.append(pid)
+        pending.extend(children.get(pid, ()))
+    return pids
+
+
+def process_rss(pid):
+    """Resident memory of one process in bytes (0 if it has gone)."""
+    try:
+        with open(f"/proc/{pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def tree_rss(root_pid):
+    """Resident memory, in bytes, of root_pid and all its descendants (None if not Linux)."""
+    if not os.path.isdir("/proc"):
+        return None
+    return sum(process_rss(pid) for pid in process_tree(root_pid))
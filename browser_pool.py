@@ -0,0 +1,327 @@
+"""Pre-warmed Chrome pool daemon.
+
+Keeps a number of Chrome sessions started and idle so that test classes can
+borrow one instead of paying driver spawn, browser launch and profile
+creation on every run:
+
+    python browser_pool.py serve --size 2 --max-uses 25
+    SMS_BROWSER_POOL=127.0.0.1:4455 python runner.py
+
+A borrowed session is reset (cookies, storage, extra windows) when it is
+returned, and recycled after a crash, a failed reset or `max_uses` leases.
+"""
+import argparse
+import queue
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+
+import browser
+import config
+
+DEFAULT_ADDRESS = "127.0.0.1:4455"
+AUTHKEY = b"sms-browser-pool"
+
+# Pool sessions use DevTools ports above the ones used by runner workers
+SLOT_OFFSET = 100
+
+# A slot whose Chrome fails to launch is retried after this many seconds,
+# doubling up to the maximum, until it comes up or the pool shuts down
+RELAUNCH_DELAY = 2
+RELAUNCH_MAX_DELAY = 60
+
+
+def parse_address(address):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+class PooledSession:
+    """A warm Chrome session owned by the daemon."""
+
+    def __init__(self, slot, driver):
+        self.slot = slot
+        self.driver = driver
+        self.uses = 0
+        self.created = time.monotonic()
+
+    def describe(self):
+        return {
+            'slot': self.slot,
+            'executor_url': self.driver.service.service_url,
+            'session_id': self.driver.session_id,
+            'capabilities': self.driver.caps,
+        }
+
+
+class BrowserPool:
+    """Owns the warm sessions; hands them out, resets and recycles them."""
+
+    def __init__(self, size, max_uses, log=print):
+        self.size = size
+        self.max_uses = max_uses
+        self.log = log
+        self.sessions = {}
+        self.ready = queue.Queue()
+        self.lock = threading.Lock()
+        self.stats = {'leases': 0, 'recycled': 0, 'crashes': 0, 'launch_failures': 0}
+        self.closed = False
+
+    def start(self):
+        """Launch all sessions in parallel and wait for each first attempt.
+
+        Slots that fail keep retrying in the background; returns how many are warm.
+        """
+        threads = [threading.Thread(target=self._first_launch, args=(slot,)) for slot in range(self.size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(self.sessions)
+
+    def _first_launch(self, slot):
+        try:
+            self._spawn(slot)
+        except Exception as error:
+            self._launch_failed(slot, error, RELAUNCH_DELAY)
+            threading.Thread(target=self._relaunch, args=(slot,), daemon=True).start()
+
+    def _count(self, stat):
+        # Bumped from client, recycle and relaunch threads alike
+        with self.lock:
+            self.stats[stat] += 1
+
+    def _launch_failed(self, slot, error, delay):
+        self._count('launch_failures')
+        self.log(f"slot {slot}: Chrome failed to launch ({error}); retrying in {delay:.0f}s")
+
+    def _relaunch(self, slot):
+        """Bring a slot back, retrying with backoff, so a failed launch never loses it."""
+        delay = RELAUNCH_DELAY
+        while not self.closed:
+            time.sleep(delay)
+            try:
+                self._spawn(slot)
+                return
+            except Exception as error:
+                delay = min(delay * 2, RELAUNCH_MAX_DELAY)
+                self._launch_failed(slot, error, delay)
+
+    def _spawn(self, slot):
+        start = time.monotonic()
+        # Chrome itself, never create_driver(): with SMS_BROWSER_POOL set that
+        # would try to lease from this very daemon
+        driver = browser.launch_chrome(worker=SLOT_OFFSET + slot)
+        driver.get("about:blank")
+        with self.lock:
+            if self.closed:
+                browser.quit_driver(driver)
+                return
+            self.sessions[slot] = PooledSession(slot, driver)
+        self.ready.put(slot)
+        self.log(f"slot {slot}: warm in {time.monotonic() - start:.1f}s")
+
+    def acquire(self, timeout=60):
+        """Take a ready session, skipping any that died while idle."""
+        deadline = time.monotonic() + timeout
+        while True:
+            slot = self.ready.get(timeout=max(0.1, deadline - time.monotonic()))
+            session = self.sessions[slot]
+            try:
+                session.driver.current_url
+            except WebDriverException:
+                self.log(f"slot {slot}: died while idle")
+                # Off this thread: a slot that will not relaunch must not outlast the deadline
+                threading.Thread(target=self._recycle, args=(slot,), daemon=True).start()
+                continue
+            session.uses += 1
+            self._count('leases')
+            return session
+
+    def release(self, slot, crashed=False):
+        """Return a session; it is reset, or recycled when it is spent or broken."""
+        session = self.sessions[slot]
+        if crashed:
+            self._count('crashes')
+            reason = "crashed"
+        elif session.uses >= self.max_uses:
+            reason = f"reached {self.max_uses} uses"
+        else:
+            reason = None if self._reset(session.driver) else "reset failed"
+        if reason:
+            self.log(f"slot {slot}: recycling ({reason})")
+            threading.Thread(target=self._recycle, args=(slot,), daemon=True).start()
+        else:
+            self.ready.put(slot)
+
+    def _reset(self, driver):
+        """Bring a session back to a blank state; False if the browser misbehaves."""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            try:
+                driver.switch_to.alert.dismiss()
+            except WebDriverException:
+                pass
+            try:
+                driver.execute_script("localStorage.clear(); sessionStorage.clear();")
+            except WebDriverException:
+                pass  # about:blank and data: pages have no storage
+            driver.delete_all_cookies()
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.implicitly_wait(0)
+            driver.get("about:blank")
+            return True
+        except WebDriverException:
+            return False
+
+    def _recycle(self, slot):
+        with self.lock:
+            session = self.sessions.pop(slot, None)
+        if session:
+            try:
+                browser.quit_driver(session.driver)
+            except Exception:
+                pass
+        self._count('recycled')
+        try:
+            self._spawn(slot)
+        except Exception as error:
+            self._launch_failed(slot, error, RELAUNCH_DELAY)
+            self._relaunch(slot)
+
+    def shutdown(self):
+        self.closed = True
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            try:
+                browser.quit_driver(session.driver)
+            except Exception:
+                pass
+
+    def status(self):
+        return dict(self.stats, size=self.size, ready=self.ready.qsize(),
+                    uses={slot: s.uses for slot, s in self.sessions.items()})
+
+
+def _serve_connection(pool, conn):
+    """Handle one client; a lease still held when the client disconnects counts as a crash."""
+    leased = set()
+    try:
+        while True:
+            request = conn.recv()
+            op = request.get('op')
+            if op == 'acquire':
+                session = pool.acquire(request.get('timeout', 60))
+                leased.add(session.slot)
+                conn.send(session.describe())
+            elif op == 'release':
+                leased.discard(request['slot'])
+                pool.release(request['slot'], request.get('crashed', False))
+                conn.send({'ok': True})
+            elif op == 'status':
+                conn.send(pool.status())
+            else:
+                conn.send({'error': f"unknown op {op!r}"})
+    except (EOFError, ConnectionResetError, OSError):
+        pass
+    except queue.Empty:
+        conn.send({'error': "no session became ready in time"})
+    finally:
+        for slot in leased:
+            pool.release(slot, crashed=True)
+        conn.close()
+
+
+def serve(address, size, max_uses):
+    pool = BrowserPool(size, max_uses)
+    start = time.monotonic()
+    warm = pool.start()
+    print(f"Browser pool: {warm} of {size} session(s) warm in {time.monotonic() - start:.1f}s, "
+          f"listening on {address}", flush=True)
+    listener = Listener(parse_address(address), authkey=AUTHKEY)
+    try:
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=_serve_connection, args=(pool, conn), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        pool.shutdown()
+
+
+class AttachedDriver(webdriver.Remote):
+    """Remote driver that attaches to an existing chromedriver session instead of creating one."""
+
+    def __init__(self, executor_url, session_id, capabilities):
+        self._existing_session = (session_id, capabilities)
+        executor = ChromiumRemoteConnection(executor_url, vendor_prefix="goog", browser_name="chrome")
+        super().__init__(command_executor=executor, options=webdriver.ChromeOptions())
+
+    def start_session(self, capabilities):
+        self.session_id, self.caps = self._existing_session
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+    def quit(self):
+        """Leave the session running; it belongs to the pool."""
+
+
+class Lease:
+    """A session borrowed from the pool daemon."""
+
+    def __init__(self, address=None, timeout=60):
+        self.conn = Client(parse_address(address or config.BROWSER_POOL), authkey=AUTHKEY)
+        self.conn.send({'op': 'acquire', 'timeout': timeout})
+        info = self.conn.recv()
+        if 'error' in info:
+            self.conn.close()
+            raise RuntimeError(f"Browser pool: {info['error']}")
+        self.slot = info['slot']
+        self.driver = AttachedDriver(info['executor_url'], info['session_id'], info['capabilities'])
+        self.driver.sms_lease = self
+
+    def release(self, crashed=False):
+        try:
+            self.conn.send({'op': 'release', 'slot': self.slot, 'crashed': crashed})
+            self.conn.recv()
+        finally:
+            self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-warmed Chrome pool daemon")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_parser = sub.add_parser("serve", help="start the pool and serve leases")
+    serve_parser.add_argument("--address", default=config.BROWSER_POOL or DEFAULT_ADDRESS)
+    serve_parser.add_argument("--size", type=int, default=2, help="number of warm sessions")
+    serve_parser.add_argument("--max-uses", type=int, default=25,
+                              help="recycle a session after this many leases")
+    status_parser = sub.add_parser("status", help="print pool statistics")
+    status_parser.add_argument("--address", default=config.BROWSER_POOL or DEFAULT_ADDRESS)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.address, args.size, args.max_uses)
+    else:
+        conn = Client(parse_address(args.address), authkey=AUTHKEY)
+        conn.send({'op': 'status'})
+        print(conn.recv())
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
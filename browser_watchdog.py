@@ -0,0 +1,208 @@
+"""Keep long-lived Chrome sessions healthy.
+
+A test class keeps one browser for all of its tests, and over a long soak
+run Chrome's memory, renderer count and open file handles creep upward
+until commands slow down or the browser crashes. Between tests the
+watchdog samples:
+
+  * RSS of the whole Chrome process tree, and of its renderers alone
+  * the number of renderer processes
+  * open file descriptors across the tree, and open windows
+  * mean WebDriver command latency since the previous sample (finds and
+    navigations excluded, as their time depends on the page and the server)
+
+When a sample crosses a threshold (see config.py) the test class swaps in
+a fresh session before the next test, carrying the cookies over, and the
+recycle is logged with the metrics that triggered it. Every sample is kept
+and can be exported as a time series with the run report:
+
+    python runner.py --watchdog-report watchdog.json
+"""
+import json
+import os
+import threading
+import time
+
+from selenium.webdriver.remote.command import Command
+
+import browser
+import config
+from profiler import FIND_COMMANDS
+
+# Commands whose time depends on the page or the server rather than on Chrome's health:
+# finds can sit out the implicit wait, navigations and clicks (which submit forms)
+# wait for the application. Selenium 4 has no submit command; submit() runs a script.
+UNTIMED_COMMANDS = set(FIND_COMMANDS) | {Command.GET, Command.REFRESH, Command.GO_BACK, Command.GO_FORWARD,
+                                         Command.CLICK_ELEMENT}
+
+
+class Sample:
+    """Resource readings for one browser session, taken before a test."""
+
+    FIELDS = ("t", "worker", "test", "rss", "renderer_rss", "renderers", "fds", "windows",
+              "commands", "latency_ms")
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+def _is_renderer(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as handle:
+            return b"--type=renderer" in handle.read()
+    except OSError:
+        return False
+
+
+def _fd_count(pid):
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return 0
+
+
+def process_metrics(driver):
+    """RSS, renderer RSS, renderer count and open fds of the driver's Chrome, or None."""
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    if process is None or not os.path.isdir("/proc"):
+        return None
+    rss = renderer_rss = renderers = fds = 0
+    for pid in browser.process_tree(process.pid):
+        resident = browser.process_rss(pid)
+        rss += resident
+        fds += _fd_count(pid)
+        if _is_renderer(pid):
+            renderers += 1
+            renderer_rss += resident
+    return {'rss': rss, 'renderer_rss': renderer_rss, 'renderers': renderers, 'fds': fds}
+
+
+class Watchdog:
+    """Samples browser resources between tests and decides when to recycle the session."""
+
+    def __init__(self, enabled=True, max_rss_mb=None, max_renderers=None, max_fds=None,
+                 max_latency_ms=None):
+        self.enabled = enabled
+        self.max_rss = (config.WATCHDOG_MAX_RSS_MB if max_rss_mb is None else max_rss_mb) * 2 ** 20
+        self.max_renderers = config.WATCHDOG_MAX_RENDERERS if max_renderers is None else max_renderers
+        self.max_fds = config.WATCHDOG_MAX_FDS if max_fds is None else max_fds
+        self.max_latency_ms = config.WATCHDOG_MAX_LATENCY_MS if max_latency_ms is None else max_latency_ms
+        self.samples = []
+        self.recycles = []
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._commands = 0
+        self._command_time = 0.0
+
+    def attach(self, driver):
+        """Time every command the driver sends. No-op when the watchdog is off."""
+        if not self.enabled or getattr(driver, "sms_watched", False):
+            return driver
+        original = driver.execute
+
+        def timed_execute(driver_command, params=None):
+            if driver_command in UNTIMED_COMMANDS:
+                return original(driver_command, params)
+            start = time.monotonic()
+            try:
+                return original(driver_command, params)
+            finally:
+                with self._lock:
+                    self._commands += 1
+                    self._command_time += time.monotonic() - start
+
+        driver.execute = timed_execute
+        driver.sms_watched = True
+        return driver
+
+    def sample(self, driver, test):
+        with self._lock:
+            commands, command_time = self._commands, self._command_time
+            self._commands, self._command_time = 0, 0.0
+        sample = Sample(t=round(time.monotonic() - self._started, 3), worker=config.worker_id(), test=test,
+                        commands=commands,
+                        latency_ms=round(command_time / commands * 1000, 2) if commands else None)
+        metrics = process_metrics(driver)
+        if metrics:
+            for name, value in metrics.items():
+                setattr(sample, name, value)
+        sample.windows = len(driver.window_handles)
+        return sample
+
+    def breaches(self, sample):
+        """Human-readable reasons this sample calls for a recycle (empty when healthy)."""
+        reasons = []
+        if sample.rss is not None and sample.rss > self.max_rss:
+            reasons.append(f"RSS {sample.rss / 2 ** 20:.0f} MiB > {self.max_rss / 2 ** 20:.0f} MiB")
+        if sample.renderers is not None and sample.renderers > self.max_renderers:
+            reasons.append(f"{sample.renderers} renderers > {self.max_renderers}")
+        if sample.fds is not None and sample.fds > self.max_fds:
+            reasons.append(f"{sample.fds} open fds > {self.max_fds}")
+        if sample.latency_ms is not None and sample.latency_ms > self.max_latency_ms:
+            reasons.append(f"mean command latency {sample.latency_ms:.0f} ms > {self.max_latency_ms:.0f} ms")
+        return reasons
+
+    def check(self, driver, test):
+        """Sample the session before `test`; returns the reasons to recycle it, if any."""
+        if not self.enabled:
+            return []
+        try:
+            sample = self.sample(driver, test)
+        except Exception as error:
+            # A session that cannot even list its windows is gone
+            sample = Sample(t=round(time.monotonic() - self._started, 3), worker=config.worker_id(), test=test)
+            self.samples.append(sample)
+            return [f"session unresponsive ({type(error).__name__})"]
+        self.samples.append(sample)
+        return self.breaches(sample)
+
+    def record_recycle(self, test, reasons, seconds):
+        entry = {'t': round(time.monotonic() - self._started, 3), 'worker': config.worker_id(), 'test': test,
+                 'reasons': reasons, 'seconds': round(seconds, 3),
+                 'sample': self.samples[-1].as_dict() if self.samples else None}
+        self.recycles.append(entry)
+        print(f"♻️  Recycled browser before {test}: {'; '.join(reasons)} ({seconds:.1f}s)")
+
+    def drain(self):
+        """Return samples and recycles as plain dicts and start afresh."""
+        data = {'samples': [sample.as_dict() for sample in self.samples], 'recycles': self.recycles}
+        self.samples, self.recycles = [], []
+        return data
+
+
+def save_state(driver):
+    """Cookies worth carrying into a replacement session (empty if unavailable)."""
+    try:
+        return driver.get_cookies()
+    except Exception:
+        return []
+
+
+def restore_state(driver, base_url, cookies):
+    """Load the app's origin in the new session and put the cookies back."""
+    if not cookies:
+        return
+    driver.get(base_url)
+    for cookie in cookies:
+        cookie = {key: value for key, value in cookie.items() if key != "domain"}
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            pass
+
+
+def write_report(parts, path):
+    """Merge per-worker drain() dicts into one time series file."""
+    samples = sorted((s for part in parts for s in part['samples']), key=lambda s: (s['worker'], s['t']))
+    recycles = [r for part in parts for r in part['recycles']]
+    with open(path, "w") as handle:
+        json.dump({'fields': list(Sample.FIELDS), 'samples': samples, 'recycles': recycles}, handle, indent=2)
+    return recycles
+
+
+WATCHDOG = Watchdog(enabled=config.WATCHDOG)
@@ -0,0 +1,254 @@
+"""Minimal asyncio Chrome DevTools Protocol client.
+
+Selenium's execute_cdp_cmd can send commands but cannot receive events, so
+features that react to the browser (request interception, dialogs, virtual
+time) talk to Chrome's DevTools websocket directly. The websocket framing is
+implemented here on top of asyncio streams so no extra dependency is needed.
+
+CDPConnection is the asyncio API. PageSession wraps it for synchronous test
+code: it attaches to the window a Selenium driver is controlling and runs
+the connection on a shared background event loop.
+"""
+import asyncio
+import base64
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import struct
+import threading
+import urllib.request
+from urllib.parse import urlsplit
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+COMMAND_TIMEOUT = 30
+
+
+class CDPError(Exception):
+    """The browser answered a command with an error."""
+
+
+class ConnectionClosed(Exception):
+    """The DevTools websocket was closed."""
+
+
+class WebSocket:
+    """Just enough RFC 6455 for a DevTools client: masked text frames out, text frames in."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url):
+        parts = urlsplit(url)
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80, limit=2 ** 26)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((f"GET {parts.path or '/'} HTTP/1.1\r\n"
+                      f"Host: {parts.hostname}:{parts.port or 80}\r\n"
+                      "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        await writer.drain()
+        status = await reader.readline()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        expected = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        if b" 101 " not in status or headers.get("sec-websocket-accept") != expected:
+            writer.close()
+            raise ConnectionError(f"WebSocket handshake with {url} failed: {status!r}")
+        return cls(reader, writer)
+
+    @staticmethod
+    def _mask(payload, mask):
+        # XOR the whole payload at once; a per-byte loop is far too slow for large bodies
+        repeated = (mask * (len(payload) // 4 + 1))[:len(payload)]
+        return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(len(payload), "big")
+
+    def _frame(self, opcode, payload):
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 1 << 16:
+            header += bytes([0x80 | 126]) + struct.pack("!H", length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack("!Q", length)
+        mask = os.urandom(4)
+        return header + mask + (self._mask(payload, mask) if payload else b"")
+
+    async def send(self, text):
+        self.writer.write(self._frame(0x1, text.encode()))
+        await self.writer.drain()
+
+    async def recv(self):
+        """Return the next complete text message."""
+        fragments = []
+        while True:
+            first, second = await self.reader.readexactly(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+            mask = await self.reader.readexactly(4) if second & 0x80 else None
+            payload = await self.reader.readexactly(length) if length else b""
+            if mask:
+                payload = self._mask(payload, mask)
+            if opcode == 0x8:
+                raise ConnectionClosed()
+            if opcode == 0x9:
+                self.writer.write(self._frame(0xA, payload))
+                continue
+            if opcode == 0xA:
+                continue
+            fragments.append(payload)
+            if first & 0x80:
+                return b"".join(fragments).decode("utf-8")
+
+    async def close(self):
+        try:
+            self.writer.write(self._frame(0x8, b""))
+            await self.writer.drain()
+        except (ConnectionError, RuntimeError):
+            pass
+        self.writer.close()
+
+
+class CDPConnection:
+    """Commands and events over one DevTools websocket (flattened target sessions)."""
+
+    def __init__(self, socket):
+        self.socket = socket
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._handlers = {}
+        self._reader = asyncio.get_running_loop().create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, ws_url):
+        return cls(await WebSocket.connect(ws_url))
+
+    async def send(self, method, params=None, session_id=None, timeout=COMMAND_TIMEOUT):
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.socket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def on(self, event, handler, session_id=None):
+        """Call handler(params, session_id) for every `event`; coroutines are scheduled."""
+        self._handlers.setdefault((event, session_id), []).append(handler)
+
+    def forget(self, session_id):
+        """Drop every handler registered for a session that has gone away."""
+        for key in [key for key in self._handlers if key[1] == session_id]:
+            del self._handlers[key]
+
+    async def _read_loop(self):
+        try:
+            while True:
+                message = json.loads(await self.socket.recv())
+                if "id" in message:
+                    future = self._pending.get(message["id"])
+                    if future and not future.done():
+                        if "error" in message:
+                            future.set_exception(CDPError(message["error"].get("message")))
+                        else:
+                            future.set_result(message.get("result", {}))
+                    continue
+                session_id = message.get("sessionId")
+                for key in ((message["method"], session_id), (message["method"], None)):
+                    for handler in self._handlers.get(key, ()):
+                        result = handler(message.get("params", {}), session_id)
+                        if inspect.isawaitable(result):
+                            asyncio.ensure_future(result)
+        except (ConnectionClosed, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionClosed())
+
+    async def close(self):
+        self._reader.cancel()
+        await self.socket.close()
+
+
+def debugger_address(driver):
+    """host:port of the DevTools endpoint of a chromedriver-controlled Chrome."""
+    return driver.caps["goog:chromeOptions"]["debuggerAddress"]
+
+
+def browser_ws_url(address):
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=10) as response:
+        return json.load(response)["webSocketDebuggerUrl"]
+
+
+class _LoopThread:
+    """A background event loop shared by every synchronous CDP user in the process."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=self.loop.run_forever, name="cdp-loop", daemon=True)
+        thread.start()
+
+    @classmethod
+    def get(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def run(self, coroutine, timeout=COMMAND_TIMEOUT):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+
+class PageSession:
+    """Synchronous CDP session attached to the window a Selenium driver is controlling.
+
+    Event handlers run on the background loop thread, so they can answer
+    the browser (e.g. fulfil a paused request) while the test thread is
+    blocked inside a WebDriver command.
+    """
+
+    def __init__(self, driver):
+        self.loop = _LoopThread.get()
+        self.target_id = driver.current_window_handle
+        ws_url = browser_ws_url(debugger_address(driver))
+        self.connection = self.loop.run(CDPConnection.connect(ws_url))
+        attached = self.send("Target.attachToTarget", {"targetId": self.target_id, "flatten": True},
+                             session=False)
+        self.session_id = attached["sessionId"]
+
+    def send(self, method, params=None, session=True):
+        session_id = self.session_id if session else None
+        return self.loop.run(self.connection.send(method, params, session_id))
+
+    async def send_async(self, method, params=None):
+        """For use inside event handlers, which already run on the loop."""
+        return await self.connection.send(method, params, self.session_id)
+
+    def on(self, event, handler):
+        self.connection.on(event, handler, self.session_id)
+
+    def close(self):
+        try:
+            self.loop.run(self.connection.close(), timeout=5)
+        except Exception:
+            pass
@@ -0,0 +1,82 @@
+"""Run-time settings for the test suite.
+
+Everything here can be overridden through environment variables so that the
+Docker image and the Jenkins pipeline can tune a run without code changes.
+"""
+import os
+
+# Number of parallel workers used by runner.py (one Chrome per worker)
+WORKERS = int(os.environ.get("SMS_WORKERS", "1"))
+
+# Chrome's DevTools port for worker N is DEBUG_PORT_BASE + N
+DEBUG_PORT_BASE = int(os.environ.get("SMS_DEBUG_PORT_BASE", "9222"))
+
+
+def worker_id():
+    """Index of the current parallel worker (0 when running serially)."""
+    return int(os.environ.get("SMS_WORKER_ID", "0"))
+
+# host:port of a running browser_pool.py daemon; empty means start Chrome directly
+BROWSER_POOL = os.environ.get("SMS_BROWSER_POOL", "")
+
+# Application under test. Set SMS_LOCAL_SERVER=1 to have runner.py start the
+# bundled stub_server.py instead, optionally with artificial latency (ms) and
+# a cap on concurrently served requests.
+BASE_URL = os.environ.get("SMS_BASE_URL", "http://3.89.8.171/")
+LOCAL_SERVER = os.environ.get("SMS_LOCAL_SERVER", "") not in ("", "0")
+LOCAL_LATENCY_MS = float(os.environ.get("SMS_LOCAL_LATENCY_MS", "0"))
+LOCAL_JITTER_MS = float(os.environ.get("SMS_LOCAL_JITTER_MS", "0"))
+LOCAL_MAX_CONCURRENCY = int(os.environ.get("SMS_LOCAL_MAX_CONCURRENCY", "0"))
+
+# Write a WebDriver command profile to this JSON path (see profiler.py)
+PROFILE = os.environ.get("SMS_PROFILE", "")
+
+# Third-party asset cache (see asset_cache.py). Interception is active when the
+# cache has an index; SMS_ASSET_OFFLINE=1 fails misses instead of fetching them.
+ASSET_CACHE = os.environ.get("SMS_ASSET_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "asset_cache"))
+INTERCEPT_ASSETS = os.environ.get("SMS_INTERCEPT_ASSETS", "1") != "0"
+ASSET_OFFLINE = os.environ.get("SMS_ASSET_OFFLINE", "") not in ("", "0")
+
+# Browser profile: "default" loads everything in a 1920x1080 window; "lean"
+# uses the eager page-load strategy and blocks images, fonts, media and
+# analytics (see browser.py). Tests marked @browser.full_fidelity opt out.
+BROWSER_PROFILE = os.environ.get("SMS_BROWSER_PROFILE", "default")
+
+# Pre-registered accounts leased to tests (see account_pool.py); runner.py
+# tops the pool up to ACCOUNT_POOL_SIZE free accounts before browser tests.
+ACCOUNT_POOL = os.environ.get("SMS_ACCOUNT_POOL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "accounts.json"))
+ACCOUNT_POOL_SIZE = int(os.environ.get("SMS_ACCOUNT_POOL_SIZE", "8"))
+# Leases held from another host or container are freed after this many minutes
+ACCOUNT_LEASE_MAX_AGE_MIN = float(os.environ.get("SMS_ACCOUNT_LEASE_MAX_AGE_MIN", "60"))
+
+# Per-test duration history used to balance shards and workers (see sharding.py)
+DURATIONS = os.environ.get("SMS_DURATIONS", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".test_durations.json"))
+
+# Incremental mode (see incremental.py): tests unchanged since a pass recorded
+# within RESULT_CACHE_MAX_AGE_HOURS are reported as cached passes
+INCREMENTAL = os.environ.get("SMS_INCREMENTAL", "") not in ("", "0")
+RESULT_CACHE = os.environ.get("SMS_RESULT_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".test_result_cache.json"))
+RESULT_CACHE_MAX_AGE_HOURS = float(os.environ.get("SMS_RESULT_CACHE_MAX_AGE_HOURS", "24"))
+
+# Run browser tests this many at a time in isolated contexts of one Chrome
+# (see contexts.py); 0 keeps the one-Chrome-per-worker model
+CONTEXTS = int(os.environ.get("SMS_CONTEXTS", "0"))
+
+# Browser watchdog (see browser_watchdog.py): between tests, recycle the Chrome
+# session when any of these is exceeded. SMS_WATCHDOG=0 turns it off.
+WATCHDOG = os.environ.get("SMS_WATCHDOG", "1") != "0"
+WATCHDOG_MAX_RSS_MB = float(os.environ.get("SMS_WATCHDOG_MAX_RSS_MB", "2048"))
+WATCHDOG_MAX_RENDERERS = int(os.environ.get("SMS_WATCHDOG_MAX_RENDERERS", "10"))
+WATCHDOG_MAX_FDS = int(os.environ.get("SMS_WATCHDOG_MAX_FDS", "4096"))
+WATCHDOG_MAX_LATENCY_MS = float(os.environ.get("SMS_WATCHDOG_MAX_LATENCY_MS", "1000"))
+WATCHDOG_REPORT = os.environ.get("SMS_WATCHDOG_REPORT", "")
+
+# Let waits in @virtual_time.fast_forward tests run page timers ahead of the
+# wall clock through DevTools virtual time (see virtual_time.py)
+VIRTUAL_TIME = os.environ.get("SMS_VIRTUAL_TIME", "") not in ("", "0")
+
+# Stream per-test results to JUnit XML and JSON Lines here, with a screenshot,
+# page source and console log for each failure (see reporter.py). Empty turns
+# it off. Failure artifacts are capped at REPORT_MAX_MB, oldest deleted first.
+REPORT_DIR = os.environ.get("SMS_REPORT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-results", "live"))
+REPORT_MAX_MB = float(os.environ.get("SMS_REPORT_MAX_MB", "100"))
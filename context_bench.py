@@ -0,0 +1,90 @@
+"""Compare one Chrome per worker with one Chrome running isolated contexts.
+
+Runs the browser-tier tests at the same concurrency both ways and reports
+throughput (tests per second) and peak resident memory of this process
+and everything under it (worker processes, chromedrivers and Chromes),
+divided by the number of tests in flight.
+
+    python context_bench.py --concurrency 4 --local-server
+    python context_bench.py --concurrency 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import browser
+import config
+import runner
+
+SAMPLE_INTERVAL = 0.25
+
+
+class PeakRSS:
+    """Samples the RSS of this process tree on a background thread and keeps the peak."""
+
+    def __init__(self):
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, browser.tree_rss(os.getpid()) or 0)
+            self._stop.wait(SAMPLE_INTERVAL)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def measure(model, names, concurrency):
+    """Return (tests run, failed, seconds, peak RSS bytes) for one execution model."""
+    result = runner.MergedResult()
+    start = time.monotonic()
+    with PeakRSS() as rss:
+        if model == "contexts":
+            runner.run_contexts(names, concurrency, result, verbosity=0)
+        else:
+            runner.run_parallel(names, concurrency, result, verbosity=0)
+    failed = len(result.failures) + len(result.errors)
+    return result.testsRun, failed, time.monotonic() - start, rss.peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4],
+                        help="tests in flight (workers or contexts)")
+    parser.add_argument("--local-server", action="store_true", help="benchmark against stub_server.py")
+    parser.add_argument("--latency", type=float, default=0.0, help="stub server latency per request, in ms")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.local_server:
+        server = runner.start_local_server(args.latency, 0.0, 0)
+    _, names = runner.split_tiers(runner.test_names())
+    accounts = runner.account_pool.AccountPool()
+    accounts.seed(max(config.ACCOUNT_POOL_SIZE, max(args.concurrency)))
+
+    print(f"{'Model':<10} {'N':>3} {'Tests':>6} {'Failed':>7} {'Wall':>8} {'Tests/s':>8} "
+          f"{'Peak MiB':>9} {'MiB/test':>9}")
+    try:
+        for concurrency in args.concurrency:
+            for model in ("workers", "contexts"):
+                tests, failed, seconds, peak = measure(model, names, concurrency)
+                print(f"{model:<10} {concurrency:>3} {tests:>6} {failed:>7} {seconds:>7.1f}s "
+                      f"{tests / seconds:>8.2f} {peak / 2 ** 20:>9.0f} {peak / 2 ** 20 / concurrency:>9.0f}")
+    finally:
+        accounts.reclaim()
+        if server:
+            server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,551 @@
+"""Run many tests at once in one Chrome, each in its own browser context.
+
+The tests only need cookie and storage isolation, and a browser context
+(what an incognito window uses) provides exactly that for a few
+milliseconds instead of a new Chrome process. BrowserHost starts a single
+Chrome and opens one DevTools websocket to it. Every ContextDriver owns a
+browser context with one page, driven through a flattened CDP session on
+that shared asyncio connection (see cdp.py).
+
+ContextDriver is a synchronous adapter with the part of the WebDriver API
+the suite uses: get, find_element(s), click, send_keys, clear, text,
+get_attribute, execute_script, switch_to.alert, cookies. So an unmodified
+test method can run on it from a plain thread while the event loop thread
+multiplexes all contexts.
+
+    python runner.py --contexts 4
+    python context_bench.py --concurrency 4 --local-server
+"""
+import asyncio
+import json
+import sys
+import time
+
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    JavascriptException,
+    NoAlertPresentException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    UnexpectedAlertPresentException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+
+import account_pool
+import browser
+import config
+import planner
+from cdp import CDPConnection, CDPError, _LoopThread, browser_ws_url, debugger_address
+
+PAGE_LOAD_TIMEOUT = 60
+POLL_INTERVAL = 0.05
+
+# Errors meaning a remote object belonged to a document that has since been replaced
+_STALE_ERRORS = ("Cannot find context with specified id", "Could not find object with given id",
+                 "Cannot find default execution context", "Execution context was destroyed")
+
+_FIND_JS = """
+function (by, value, all) {
+    var root = (this && this.nodeType) ? this : document;
+    var found = [];
+    if (by === 'xpath') {
+        var result = document.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < result.snapshotLength; i++) found.push(result.snapshotItem(i));
+    } else if (by === 'link text' || by === 'partial link text') {
+        found = Array.prototype.filter.call(root.querySelectorAll('a'), function (a) {
+            var text = a.innerText.trim();
+            return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+        });
+    } else {
+        var css = {
+            'css selector': value,
+            'tag name': value,
+            'id': '#' + CSS.escape(value),
+            'name': '[name="' + CSS.escape(value) + '"]',
+            'class name': '.' + CSS.escape(value)
+        }[by];
+        found = Array.prototype.slice.call(root.querySelectorAll(css));
+    }
+    return all ? found : (found[0] || null);
+}
+"""
+
+# WebDriver's getAttribute: the property when it is a plain value, else the attribute
+_ATTRIBUTE_JS = """
+function (name) {
+    var prop = this[name];
+    if (typeof prop === 'boolean') return prop ? 'true' : null;
+    if (prop !== undefined && prop !== null && typeof prop !== 'object' && typeof prop !== 'function')
+        return String(prop);
+    return this.getAttribute(name);
+}
+"""
+
+_DISPLAYED_JS = """
+function () {
+    var style = getComputedStyle(this);
+    return style.visibility !== 'hidden' && style.display !== 'none'
+        && !!(this.offsetWidth || this.offsetHeight || this.getClientRects().length);
+}
+"""
+
+_CLICK_POINT_JS = """
+function () {
+    this.scrollIntoView({block: 'center', inline: 'center'});
+    var rect = this.getClientRects()[0] || this.getBoundingClientRect();
+    return {x: rect.left + rect.width / 2, y: rect.top + rect.height / 2};
+}
+"""
+
+_CLEAR_JS = """
+function () {
+    this.focus();
+    this.value = '';
+    this.dispatchEvent(new Event('input', {bubbles: true}));
+    this.dispatchEvent(new Event('change', {bubbles: true}));
+}
+"""
+
+
+def _stale(error):
+    return any(message in str(error) for message in _STALE_ERRORS)
+
+
+def _script_error(response):
+    details = response.get("exceptionDetails")
+    if not details:
+        return None
+    exception = details.get("exception") or {}
+    return exception.get("description") or details.get("text") or "JavaScript error"
+
+
+class BrowserHost:
+    """One Chrome whose browser contexts are handed out to concurrently running tests."""
+
+    def __init__(self, profile=None):
+        self.profile = profile or config.BROWSER_PROFILE
+        # chromedriver only launches Chrome here; every test talks DevTools directly
+        self.driver = browser.create_driver(profile=self.profile)
+        self.loop = _LoopThread.get()
+        self.connection = self.loop.run(CDPConnection.connect(browser_ws_url(debugger_address(self.driver))))
+
+    def run(self, coroutine, timeout=PAGE_LOAD_TIMEOUT + 5):
+        return self.loop.run(coroutine, timeout)
+
+    def new_driver(self):
+        return ContextDriver(self)
+
+    def rss(self):
+        """Resident memory of the whole Chrome process tree, in bytes."""
+        return browser.process_tree_rss(self.driver)
+
+    def close(self):
+        try:
+            self.run(self.connection.close(), timeout=5)
+        except Exception:
+            pass
+        browser.quit_driver(self.driver)
+
+
+class ContextAlert:
+    """switch_to.alert for a ContextDriver."""
+
+    def __init__(self, driver, dialog):
+        self.driver = driver
+        self.text = dialog["message"]
+        self._prompt_text = None
+
+    def accept(self):
+        self.driver.close_dialog(True, self._prompt_text)
+
+    def dismiss(self):
+        self.driver.close_dialog(False)
+
+    def send_keys(self, text):
+        self._prompt_text = text
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @property
+    def alert(self):
+        dialog = self.driver.dialog
+        if dialog is None:
+            raise NoAlertPresentException("no such alert")
+        return ContextAlert(self.driver, dialog)
+
+
+class ContextElement:
+    """A DOM node in a ContextDriver's page, addressed by its CDP remote object id."""
+
+    def __init__(self, driver, object_id):
+        self.driver = driver
+        self.object_id = object_id
+
+    def _call(self, function, *args):
+        return self.driver.call_on(self.object_id, function, *args)
+
+    @property
+    def tag_name(self):
+        return self._call("function () { return this.tagName.toLowerCase(); }")
+
+    @property
+    def text(self):
+        return self._call("function () { return this.innerText; }")
+
+    def get_attribute(self, name):
+        return self._call(_ATTRIBUTE_JS, name)
+
+    def get_property(self, name):
+        return self._call("function (name) { return this[name]; }", name)
+
+    def is_displayed(self):
+        return self._call(_DISPLAYED_JS)
+
+    def is_enabled(self):
+        return self._call("function () { return !this.disabled; }")
+
+    def is_selected(self):
+        return self._call("function () { return !!(this.checked || this.selected); }")
+
+    def clear(self):
+        self._call(_CLEAR_JS)
+
+    def send_keys(self, *values):
+        self._call("function () { this.focus(); }")
+        self.driver.send("Input.insertText", {"text": "".join(str(value) for value in values)})
+
+    def click(self):
+        """A real mouse click at the element's centre, as chromedriver does."""
+        point = self._call(_CLICK_POINT_JS)
+        for kind in ("mousePressed", "mouseReleased"):
+            try:
+                self.driver.send("Input.dispatchMouseEvent", {
+                    "type": kind, "x": point["x"], "y": point["y"], "button": "left", "clickCount": 1})
+            except UnexpectedAlertPresentException:
+                # The click opened an alert; like WebDriver, report it on the next command
+                return
+
+    def submit(self):
+        self._call("function () { (this.form || this).requestSubmit(); }")
+
+    def find_element(self, by=By.ID, value=None):
+        return self.driver._find(by, value, self.object_id, first=True)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.driver._find(by, value, self.object_id, first=False)
+
+
+class ContextDriver:
+    """WebDriver-shaped driver for one page in its own browser context."""
+
+    def __init__(self, host):
+        self.host = host
+        self.implicit_wait = 0.0
+        self.sms_base_profile = host.profile
+        self.sms_active_profile = browser.DEFAULT
+        # With the eager strategy, get() returns at DOMContentLoaded, like chromedriver
+        eager = browser.PROFILES[host.profile]['page_load_strategy'] == "eager"
+        self.load_event = "DOMContentLoaded" if eager else "load"
+        self.switch_to = _SwitchTo(self)
+        self.context_id = self.target_id = self.session_id = None
+        self.new_context()
+
+    # -- session plumbing --------------------------------------------------
+
+    def new_context(self):
+        """Replace this driver's browser context with a fresh one: no cookies, no storage."""
+        if self.context_id:
+            self.quit()
+        self.host.run(self._open())
+        self.sms_active_profile = browser.DEFAULT
+
+    async def _open(self):
+        connection = self.host.connection
+        self.dialog = None
+        self._dialog_opened = asyncio.Event()
+        self._lifecycle = asyncio.Event()
+        self._loaded = {}
+        created = await connection.send("Target.createBrowserContext", {"disposeOnDetach": True})
+        self.context_id = created["browserContextId"]
+        target = await connection.send("Target.createTarget", {
+            "url": "about:blank", "browserContextId": self.context_id})
+        self.target_id = target["targetId"]
+        attached = await connection.send("Target.attachToTarget", {"targetId": self.target_id, "flatten": True})
+        self.session_id = attached["sessionId"]
+        connection.on("Page.javascriptDialogOpening", self._on_dialog_opening, self.session_id)
+        connection.on("Page.javascriptDialogClosed", self._on_dialog_closed, self.session_id)
+        connection.on("Page.lifecycleEvent", self._on_lifecycle, self.session_id)
+        await connection.send("Page.enable", None, self.session_id)
+        await connection.send("Page.setLifecycleEventsEnabled", {"enabled": True}, self.session_id)
+
+    def _on_dialog_opening(self, params, session_id):
+        self.dialog = params
+        self._dialog_opened.set()
+
+    def _on_dialog_closed(self, params, session_id):
+        self.dialog = None
+        self._dialog_opened.clear()
+
+    def _on_lifecycle(self, params, session_id):
+        if params["frameId"] == self.target_id:
+            self._loaded.setdefault(params["loaderId"], set()).add(params["name"])
+            self._lifecycle.set()
+
+    async def _guarded(self, method, params):
+        """Send a page command, failing fast if an alert is (or becomes) open.
+
+        A page blocked on an alert does not answer script commands until the
+        alert is closed, so waiting for the reply would hang the test.
+        """
+        if self.dialog is not None:
+            raise UnexpectedAlertPresentException(alert_text=self.dialog["message"])
+        command = asyncio.ensure_future(self.host.connection.send(method, params, self.session_id))
+        opened = asyncio.ensure_future(self._dialog_opened.wait())
+        await asyncio.wait({command, opened}, return_when=asyncio.FIRST_COMPLETED)
+        opened.cancel()
+        if command.done():
+            return command.result()
+        # The reply arrives once the alert is handled; nobody is waiting for it any more
+        command.add_done_callback(lambda future: future.cancelled() or future.exception())
+        raise UnexpectedAlertPresentException(alert_text=self.dialog["message"] if self.dialog else None)
+
+    def send(self, method, params=None):
+        return self.host.run(self._guarded(method, params or {}))
+
+    def close_dialog(self, accept, prompt_text=None):
+        self.host.run(self._close_dialog(accept, prompt_text))
+
+    async def _close_dialog(self, accept, prompt_text):
+        params = {"accept": accept}
+        if prompt_text is not None:
+            params["promptText"] = prompt_text
+        try:
+            await self.host.connection.send("Page.handleJavaScriptDialog", params, self.session_id)
+        except CDPError as error:
+            raise NoAlertPresentException(str(error)) from None
+        # Don't wait for javascriptDialogClosed: the next command must not see a stale alert
+        self.dialog = None
+        self._dialog_opened.clear()
+
+    # -- navigation ----------------------------------------------------------
+
+    def get(self, url):
+        self.host.run(self._navigate(url))
+
+    async def _navigate(self, url):
+        self._loaded.clear()
+        result = await self._guarded("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise WebDriverException(f"unknown error: {result['errorText']} loading {url}")
+        loader = result.get("loaderId")
+        if not loader:
+            return   # same-document navigation
+        deadline = time.monotonic() + PAGE_LOAD_TIMEOUT
+        while self.load_event not in self._loaded.get(loader, ()) and self.dialog is None:
+            self._lifecycle.clear()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(f"timeout: page load of {url} did not finish")
+            opened = asyncio.ensure_future(self._dialog_opened.wait())
+            changed = asyncio.ensure_future(self._lifecycle.wait())
+            await asyncio.wait({opened, changed}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            opened.cancel()
+            changed.cancel()
+
+    def refresh(self):
+        self.get(self.current_url)
+
+    def back(self):
+        self.execute_script("history.back();")
+
+    @property
+    def current_url(self):
+        # Answered by the browser, so it works while an alert blocks the page
+        info = self.host.run(self.host.connection.send("Target.getTargetInfo", {"targetId": self.target_id}))
+        return info["targetInfo"]["url"]
+
+    @property
+    def title(self):
+        return self.execute_script("return document.title;")
+
+    @property
+    def page_source(self):
+        return self.execute_script("return document.documentElement.outerHTML;")
+
+    @property
+    def current_window_handle(self):
+        return self.target_id
+
+    # -- scripts and elements -------------------------------------------------
+
+    def _convert(self, remote):
+        """Turn a CDP RemoteObject into the value execute_script would return."""
+        if remote.get("subtype") == "node":
+            return ContextElement(self, remote["objectId"])
+        if remote.get("subtype") == "null" or remote.get("type") == "undefined":
+            return None
+        if "objectId" not in remote:
+            return remote.get("value")
+        if remote.get("subtype") == "array":
+            props = self.send("Runtime.getProperties", {"objectId": remote["objectId"], "ownProperties": True})
+            items = sorted((int(prop["name"]), prop["value"]) for prop in props["result"]
+                           if prop["name"].isdigit() and "value" in prop)
+            return [self._convert(value) for _, value in items]
+        response = self.send("Runtime.callFunctionOn", {
+            "objectId": remote["objectId"], "functionDeclaration": "function () { return this; }",
+            "returnByValue": True})
+        return response["result"].get("value")
+
+    def _argument(self, value):
+        if isinstance(value, ContextElement):
+            return {"objectId": value.object_id}
+        return {"value": value}
+
+    def call_on(self, object_id, function, *args):
+        """Call a JS function with `this` bound to a remote object; returns its value."""
+        try:
+            response = self.send("Runtime.callFunctionOn", {
+                "objectId": object_id, "functionDeclaration": function,
+                "arguments": [self._argument(arg) for arg in args], "awaitPromise": True})
+        except CDPError as error:
+            if _stale(error):
+                raise StaleElementReferenceException(str(error)) from None
+            raise WebDriverException(str(error)) from None
+        error = _script_error(response)
+        if error:
+            raise JavascriptException(error)
+        return self._convert(response["result"])
+
+    def execute_script(self, script, *args):
+        function = f"function () {{ {script}\n}}"
+        elements = [arg for arg in args if isinstance(arg, ContextElement)]
+        deadline = time.monotonic() + 2
+        while True:
+            try:
+                if elements:
+                    # Run in the elements' document, with arguments passed as remote objects
+                    return self.call_on(elements[0].object_id,
+                                        f"function () {{ return ({function}).apply(null, arguments); }}", *args)
+                response = self.send("Runtime.evaluate", {
+                    "expression": f"({function}).apply(null, {json.dumps(list(args))})",
+                    "awaitPromise": True})
+                error = _script_error(response)
+                if error:
+                    raise JavascriptException(error)
+                return self._convert(response["result"])
+            except CDPError as error:
+                # Mid-navigation there is briefly no document to run in
+                if not _stale(error) or time.monotonic() > deadline:
+                    raise WebDriverException(str(error)) from None
+                time.sleep(POLL_INTERVAL)
+
+    def _find_once(self, by, value, object_id, first):
+        try:
+            if object_id:
+                return self.call_on(object_id, _FIND_JS, by, value, not first)
+            return self.execute_script(f"return ({_FIND_JS}).apply(null, arguments);", by, value, not first)
+        except JavascriptException as error:
+            raise InvalidSelectorException(str(error)) from None
+
+    def _find(self, by, value, object_id=None, first=True):
+        """Locate elements, retrying for up to the implicit wait like WebDriver does."""
+        deadline = time.monotonic() + self.implicit_wait
+        while True:
+            found = self._find_once(by, value, object_id, first)
+            if found or time.monotonic() >= deadline:
+                break
+            time.sleep(POLL_INTERVAL)
+        if first and not found:
+            raise NoSuchElementException(f"no such element: {by}={value!r}")
+        return found if first else (found or [])
+
+    def find_element(self, by=By.ID, value=None):
+        return self._find(by, value, first=True)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._find(by, value, first=False)
+
+    def implicitly_wait(self, seconds):
+        self.implicit_wait = seconds
+
+    # -- cookies, window, raw DevTools ------------------------------------------
+
+    def get_cookies(self):
+        return self.send("Network.getCookies", {"urls": [self.current_url]})["cookies"]
+
+    def add_cookie(self, cookie):
+        params = dict(cookie, url=self.current_url)
+        if "expiry" in params:
+            params["expires"] = params.pop("expiry")
+        self.send("Network.setCookie", params)
+
+    def delete_cookie(self, name):
+        self.send("Network.deleteCookies", {"name": name, "url": self.current_url})
+
+    def delete_all_cookies(self):
+        self.send("Network.clearBrowserCookies")
+
+    def set_window_size(self, width, height):
+        self.send("Emulation.setDeviceMetricsOverride", {
+            "width": width, "height": height, "deviceScaleFactor": 0, "mobile": False})
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.send(cmd, cmd_args)
+
+    def quit(self):
+        """Close this context's page and discard its cookies and storage."""
+        if not self.context_id:
+            return
+        self.host.connection.forget(self.session_id)
+        try:
+            self.host.run(self.host.connection.send("Target.disposeBrowserContext",
+                                                    {"browserContextId": self.context_id}), timeout=10)
+        except Exception:
+            pass
+        self.context_id = self.target_id = self.session_id = None
+
+
+def context_case(test_class, host):
+    """Derive a copy of test_class whose tests run in browser contexts of host.
+
+    Each test gets a brand-new context, so the logout round trip that
+    setUp otherwise needs to shed the previous test's session is skipped.
+    Built on demand so that test discovery never collects it.
+    """
+    from waits import Waiter
+
+    process_start = sys.modules[test_class.__module__]._PROCESS_START
+
+    class ContextCase(test_class):
+        @classmethod
+        def setUpClass(cls):
+            cls.driver = host.new_driver()
+            cls.driver.implicitly_wait(10)
+            cls.assets = None
+            cls.clock = None
+            cls.wait = Waiter(cls.driver)
+            cls.accounts = account_pool.AccountPool(cls.base_url)
+            cls.test_user = dict(account_pool.new_account("testuser"), name='Test User')
+            cls.planner = planner.Planner(cls.driver, cls.wait, cls.base_url, cls.accounts)
+
+        @classmethod
+        def tearDownClass(cls):
+            cls.planner.release()
+            cls.driver.quit()
+
+        def setUp(self):
+            self.wait.begin(self._testMethodName)
+            if test_class.time_to_first_test is None:
+                test_class.time_to_first_test = time.monotonic() - process_start
+            self.driver.new_context()
+            browser.prepare_for_test(self.driver, getattr(self, self._testMethodName))
+            self.planner.forget(planner.BLANK)
+            self.account = self.planner.prepare(getattr(self, self._testMethodName))
+
+    ContextCase.__name__ = ContextCase.__qualname__ = f"{test_class.__name__}[context]"
+    return ContextCase
@@ -0,0 +1,158 @@
+"""HTTP-level shortcuts for registering and logging in without the browser UI.
+
+AppClient talks to register.php / login.php directly over pooled keep-alive
+connections and keeps its own cookie jar. The PHP session it ends up with
+can then be injected into a WebDriver session, so a test that only needs
+"a logged-in user on enroll.php" gets there with a single navigation.
+"""
+import http.client
+import queue
+import threading
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urljoin, urlsplit
+
+SESSION_COOKIE = "PHPSESSID"
+POOL_SIZE = 8
+
+
+class AuthError(Exception):
+    """Raised when registration or login over HTTP does not succeed."""
+
+
+class ConnectionPool:
+    """Keep-alive HTTP connections to a single host, reused across clients."""
+
+    def __init__(self, scheme, netloc, size=POOL_SIZE, timeout=10):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.netloc, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """Send one request and return (status, headers, body text)."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # The server closed an idle keep-alive connection; retry once on a fresh one
+                conn.close()
+                conn = self._connect()
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+            text = response.read().decode("utf-8", errors="replace")
+        except Exception:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+        return response.status, response.headers, text
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(base_url):
+    """Shared connection pool for the host of base_url."""
+    parts = urlsplit(base_url)
+    key = (parts.scheme, parts.netloc)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(parts.scheme, parts.netloc)
+        return _pools[key]
+
+
+class AppClient:
+    """Browserless client for the app's form endpoints with its own cookie jar."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.pool = get_pool(self.base_url)
+        self.cookies = SimpleCookie()
+
+    def _path(self, page):
+        return urlsplit(urljoin(self.base_url, page)).path or "/"
+
+    def request(self, method, page, fields=None):
+        """Send a request to page, tracking cookies; returns (status, headers, body)."""
+        headers = {"Connection": "keep-alive"}
+        body = None
+        if fields is not None:
+            body = urlencode(fields)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={m.value}" for k, m in self.cookies.items())
+        status, response_headers, text = self.pool.request(method, self._path(page), body, headers)
+        for header in response_headers.get_all("Set-Cookie") or []:
+            self.cookies.load(header)
+        return status, response_headers, text
+
+    def get(self, page):
+        return self.request("GET", page)
+
+    def post(self, page, fields):
+        return self.request("POST", page, fields)
+
+    def register(self, name, email, password):
+        """Register a new user through register.php."""
+        status, _, text = self.post("register.php", {"name": name, "email": email, "password": password})
+        if status >= 400 or "Registration successful" not in text:
+            raise AuthError(f"Registration of {email} failed (HTTP {status}): {text[:200]}")
+
+    def login(self, email, password):
+        """Log in through login.php and confirm that enroll.php is now reachable."""
+        status, _, text = self.post("login.php", {"email": email, "password": password})
+        if status >= 400 or "User not found" in text or "Invalid" in text:
+            raise AuthError(f"Login of {email} failed (HTTP {status}): {text[:200]}")
+        if not self.is_logged_in():
+            raise AuthError(f"Login of {email} did not establish a session")
+
+    def is_logged_in(self):
+        """True when enroll.php is served instead of redirecting back to the index."""
+        status, headers, text = self.get("enroll.php")
+        if 300 <= status < 400:
+            return "enroll.php" in (headers.get("Location") or "")
+        return status == 200 and "logout.php" in text
+
+    def session_cookie(self):
+        """Value of the PHP session cookie, or None when no session exists."""
+        morsel = self.cookies.get(SESSION_COOKIE)
+        return morsel.value if morsel else None
+
+
+def inject_session(driver, base_url, client):
+    """Copy the client's PHP session into the browser; the page must be on the app's domain."""
+    if not driver.current_url.startswith(base_url.rstrip("/")):
+        driver.get(base_url)
+    for name, morsel in client.cookies.items():
+        driver.delete_cookie(name)
+        driver.add_cookie({"name": name, "value": morsel.value, "path": morsel["path"] or "/"})
+
+
+def login_browser(driver, base_url, name, email, password, landing="enroll.php", register=True):
+    """Register and log in over HTTP, inject the session and open landing in one navigation.
+
+    Pass register=False for an account that already exists (see account_pool).
+    Returns the AppClient holding the same session.
+    """
+    client = AppClient(base_url)
+    if register:
+        client.register(name, email, password)
+    client.login(email, password)
+    inject_session(driver, base_url, client)
+    driver.get(urljoin(client.base_url, landing))
+    return client
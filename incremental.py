@@ -0,0 +1,126 @@
+"""Skip tests whose inputs have not changed since they last passed.
+
+A test's fingerprint hashes everything it can observe:
+
+  * the bodies of index.php, enroll.php and the form endpoints, as served
+    right now to an anonymous visitor by the application under test
+  * the stylesheet, script and image URLs the index page references
+
+The application's own origin is left out, so the same app on another
+host or port (e.g. a --local-server stub) hashes the same.
+  * the source of the test method and of the per-test setUp
+
+Fingerprints and the last outcome are kept in a local result cache. In
+incremental mode a test whose fingerprint matches a pass recorded less
+than the maximum cache age ago is reported as a cached pass and not run.
+
+    python runner.py --incremental
+    python runner.py --incremental --max-cache-age 6
+    python runner.py --incremental --force      # run everything, refresh the cache
+"""
+import hashlib
+import inspect
+import json
+import os
+import time
+from urllib.parse import urljoin, urlsplit
+
+import config
+from http_auth import AppClient
+from static_tier import parse_html
+
+PASS = "pass"
+# GETs only, without a session: these redirect or render without side effects
+FORM_ENDPOINTS = ("register.php", "login.php", "logout.php", "enroll.php")
+
+
+def _digest(*parts):
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(str(part).encode())
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def asset_urls(page_url, markup):
+    """Absolute URLs of the stylesheets, scripts and images a page references."""
+    urls = set()
+    for node in parse_html(markup).iter():
+        attr = {"link": "href", "script": "src", "img": "src"}.get(node.tag)
+        if attr and node.attrs.get(attr):
+            urls.add(urljoin(page_url, node.attrs[attr]))
+    return sorted(urls)
+
+
+def _without_origin(text, base_url):
+    parts = urlsplit(base_url)
+    return text.replace(f"{parts.scheme}://{parts.netloc}", "")
+
+
+def app_components(base_url):
+    """Hash of each part of the application the tests depend on, read anonymously."""
+    client = AppClient(base_url)
+    components = {}
+    status, headers, index = client.get("index.php")
+    components["index.php"] = _digest(status, _without_origin(index, base_url))
+    components["assets"] = _digest(*(_without_origin(url, base_url)
+                                     for url in asset_urls(client.base_url, index)))
+    for page in FORM_ENDPOINTS:
+        status, headers, text = AppClient(base_url).get(page)
+        components[page] = _digest(status, _without_origin(headers.get("Location") or "", base_url),
+                                   _without_origin(text, base_url))
+    return components
+
+
+def fingerprints(test_class, names, base_url):
+    """Fingerprint per test name."""
+    app = _digest(json.dumps(app_components(base_url), sort_keys=True))
+    harness = inspect.getsource(test_class.setUp)
+    return {name: _digest(app, harness, inspect.getsource(getattr(test_class, name)))
+            for name in names}
+
+
+def outcomes(parts):
+    """(passed, not passed) test names from run_tests() result dicts."""
+    failed = set()
+    for part in parts:
+        for test_id, _ in part['failures'] + part['errors'] + part['skipped']:
+            # unittest ids end in the method name, possibly followed by a description
+            failed.add(test_id.split()[0].rsplit(".", 1)[-1])
+    ran = {name for part in parts for name in part.get('durations') or {}}
+    return ran - failed, ran & failed
+
+
+class ResultCache:
+    """Last fingerprint and outcome per test, persisted as JSON."""
+
+    def __init__(self, path=None):
+        self.path = path or config.RESULT_CACHE
+        try:
+            with open(self.path) as handle:
+                self.entries = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def cached_passes(self, prints, max_age_hours):
+        """Names whose fingerprint matches a recent enough pass."""
+        cutoff = time.time() - max_age_hours * 3600
+        return [name for name, fingerprint in prints.items()
+                if (entry := self.entries.get(name))
+                and entry['fingerprint'] == fingerprint
+                and entry['outcome'] == PASS
+                and entry['recorded_at'] >= cutoff]
+
+    def record(self, prints, passed, failed):
+        now = time.time()
+        for name in passed:
+            if name in prints:
+                self.entries[name] = {'fingerprint': prints[name], 'outcome': PASS, 'recorded_at': now}
+        for name in failed:
+            self.entries.pop(name, None)
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".tmp", "w") as handle:
+            json.dump(self.entries, handle, indent=2, sort_keys=True)
+        os.replace(self.path + ".tmp", self.path)
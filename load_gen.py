@@ -0,0 +1,302 @@
+"""Protocol-level load generator built from the suite's user-journey scenarios.
+
+Replays the registration -> login -> enroll -> logout flow of
+test_08_complete_user_journey_registration_and_login as asyncio virtual
+users over pooled keep-alive HTTP connections; no browser is involved.
+
+    python load_gen.py --users 50 --ramp-up 10 --duration 60
+    python load_gen.py --local-server --latency 30 --users 20 --duration 15 --json load.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import string
+import sys
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urljoin, urlsplit
+
+import config
+from stats import percentile
+
+ENDPOINTS = ("index.php", "register.php", "login.php", "enroll.php", "logout.php")
+
+
+class HTTPError(Exception):
+    """A response that the scenario considers a failure."""
+
+
+class AsyncConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, shared by all virtual users."""
+
+    def __init__(self, base_url, limit=100, timeout=30):
+        parts = urlsplit(base_url)
+        if parts.scheme != "http":
+            raise ValueError("the load generator speaks plain HTTP only")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(limit)
+
+    async def _read_response(self, reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        status = int(status_line.split()[1])
+        headers = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append((name.strip().lower(), value.strip()))
+        fields = dict(headers)
+        if fields.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in fields:
+            body = await reader.readexactly(int(fields["content-length"]))
+        else:
+            # No length: the body ends when the server closes the connection
+            body = await reader.read()
+            fields["connection"] = "close"
+        keep_alive = fields.get("connection", "").lower() != "close"
+        return status, headers, body.decode("utf-8", errors="replace"), keep_alive
+
+    async def request(self, method, path, body=b"", headers=None):
+        """Send one request; returns (status, [(header, value)], body text)."""
+        async with self._slots:
+            for attempt in (0, 1):
+                if self._idle:
+                    reader, writer = self._idle.pop()
+                else:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout)
+                lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                         "Connection: keep-alive", f"Content-Length: {len(body)}"]
+                lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+                try:
+                    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+                    await writer.drain()
+                    status, response_headers, text, keep_alive = await asyncio.wait_for(
+                        self._read_response(reader), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if attempt:
+                        raise
+                    continue  # a stale keep-alive connection; retry on a fresh one
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return status, response_headers, text
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+class Stats:
+    """Latency samples and error counts per endpoint."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.scenarios = 0
+        self.failed_scenarios = 0
+
+    def record(self, endpoint, latency, ok):
+        self.samples.setdefault(endpoint, []).append(latency)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for endpoint, samples in self.samples.items():
+            ordered = sorted(samples)
+            endpoints[endpoint] = {
+                'requests': len(ordered),
+                'errors': self.errors.get(endpoint, 0),
+                'error_rate': round(self.errors.get(endpoint, 0) / len(ordered), 4),
+                'throughput': round(len(ordered) / elapsed, 2),
+                'p50_ms': round(percentile(ordered, 50) * 1000, 1),
+                'p95_ms': round(percentile(ordered, 95) * 1000, 1),
+                'p99_ms': round(percentile(ordered, 99) * 1000, 1),
+            }
+        total = sum(len(s) for s in self.samples.values())
+        return {
+            'elapsed': round(elapsed, 2),
+            'requests': total,
+            'throughput': round(total / elapsed, 2) if elapsed else 0.0,
+            'scenarios': self.scenarios,
+            'failed_scenarios': self.failed_scenarios,
+            'endpoints': endpoints,
+        }
+
+
+class VirtualUser:
+    """One simulated visitor with its own cookie jar."""
+
+    def __init__(self, pool, base_url, stats):
+        self.pool = pool
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.stats = stats
+        self.cookies = SimpleCookie()
+
+    async def call(self, endpoint, fields=None, check=None):
+        """Request endpoint, time it, and validate the response with check(status, body)."""
+        path = urlsplit(urljoin(self.base_url, endpoint)).path
+        headers = {}
+        body = b""
+        if fields is not None:
+            body = urlencode(fields).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={m.value}" for k, m in self.cookies.items())
+        start = time.monotonic()
+        ok = False
+        try:
+            status, response_headers, text = await self.pool.request(
+                "POST" if fields is not None else "GET", path, body, headers)
+            for name, value in response_headers:
+                if name == "set-cookie":
+                    self.cookies.load(value)
+            ok = status < 400 and (check is None or check(status, text))
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.stats.record(endpoint, time.monotonic() - start, ok)
+        if not ok:
+            raise HTTPError(endpoint)
+        return text
+
+    async def journey(self):
+        """Scenario from test_08: register, log in, open enroll.php, log out."""
+        suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=10))
+        email, password = f"load{suffix}@example.com", "journey123"
+        self.cookies = SimpleCookie()
+        await self.call("index.php", check=lambda s, t: "register.php" in t)
+        await self.call("register.php", {"name": "Load Test User", "email": email, "password": password},
+                        check=lambda s, t: "Registration successful" in t)
+        await self.call("login.php", {"email": email, "password": password},
+                        check=lambda s, t: "User not found" not in t and "Invalid" not in t)
+        await self.call("enroll.php", check=lambda s, t: s == 200 and "logout.php" in t)
+        await self.call("logout.php", {})
+
+    async def failed_login(self):
+        """Scenario from test_07: a login attempt for an unknown user."""
+        self.cookies = SimpleCookie()
+        await self.call("index.php")
+        await self.call("login.php", {"email": "nonexistent@example.com", "password": "wrongpassword"},
+                        check=lambda s, t: "User not found" in t)
+
+    async def browse(self):
+        """Scenario from test_10: anonymous visit that is bounced off enroll.php."""
+        self.cookies = SimpleCookie()
+        await self.call("index.php")
+        await self.call("enroll.php", check=lambda s, t: s in (301, 302, 303) or "login.php" in t)
+
+
+SCENARIOS = {
+    'journey': [('journey', 1.0)],
+    'mixed': [('journey', 0.6), ('failed_login', 0.2), ('browse', 0.2)],
+}
+
+
+async def _run_user(index, pool, base_url, stats, mix, start_at, stop_at):
+    await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+    user = VirtualUser(pool, base_url, stats)
+    names, weights = zip(*mix)
+    while time.monotonic() < stop_at:
+        scenario = random.choices(names, weights)[0]
+        stats.scenarios += 1
+        try:
+            await getattr(user, scenario)()
+        except HTTPError:
+            stats.failed_scenarios += 1
+
+
+async def run_load(base_url, users, ramp_up, duration, scenario="journey", connections=100):
+    """Run the load test and return the summary dict."""
+    pool = AsyncConnectionPool(base_url, limit=connections)
+    stats = Stats()
+    start = time.monotonic()
+    stop_at = start + ramp_up + duration
+    step = ramp_up / users if users else 0
+    try:
+        await asyncio.gather(*(
+            _run_user(i, pool, base_url, stats, SCENARIOS[scenario], start + i * step, stop_at)
+            for i in range(users)))
+    finally:
+        pool.close()
+    return stats.summary(time.monotonic() - start)
+
+
+def print_report(summary):
+    print("=" * 60)
+    print("LOAD SUMMARY:")
+    print(f"Elapsed: {summary['elapsed']}s, requests: {summary['requests']}, "
+          f"throughput: {summary['throughput']} req/s")
+    print(f"Scenarios: {summary['scenarios']}, failed: {summary['failed_scenarios']}")
+    print(f"{'Endpoint':<14} {'Reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Err %':>6}")
+    for endpoint in ENDPOINTS:
+        row = summary['endpoints'].get(endpoint)
+        if row:
+            print(f"{endpoint:<14} {row['requests']:>7} {row['throughput']:>8} {row['p50_ms']:>8} "
+                  f"{row['p95_ms']:>8} {row['p99_ms']:>8} {row['error_rate'] * 100:>6.2f}")
+    print("=" * 60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent load generator for the application")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds to start all users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds at full load")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="journey")
+    parser.add_argument("--connections", type=int, default=100, help="max pooled connections")
+    parser.add_argument("--base-url", default=config.BASE_URL)
+    parser.add_argument("--local-server", action="store_true", default=config.LOCAL_SERVER,
+                        help="start the bundled stub server and load it instead")
+    parser.add_argument("--latency", type=float, default=config.LOCAL_LATENCY_MS,
+                        help="stub server latency per request, in ms")
+    parser.add_argument("--max-concurrency", type=int, default=config.LOCAL_MAX_CONCURRENCY,
+                        help="stub server concurrent request limit")
+    parser.add_argument("--json", metavar="PATH", help="also write the summary as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if args.local_server:
+        import stub_server
+        server = stub_server.start(latency=args.latency / 1000, max_concurrency=args.max_concurrency)
+        base_url = server.base_url
+    print(f"Load test: {args.users} users, {args.ramp_up}s ramp-up, {args.duration}s "
+          f"against {base_url} ({args.scenario})")
+    try:
+        summary = asyncio.run(run_load(base_url, args.users, args.ramp_up, args.duration,
+                                       args.scenario, args.connections))
+    finally:
+        if server:
+            server.shutdown()
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(summary, handle, indent=2)
+    return 0 if summary['failed_scenarios'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
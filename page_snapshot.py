@@ -0,0 +1,224 @@
+"""Single-round-trip page snapshots.
+
+take() collects the form structure, input attributes, visibility flags and
+stylesheet/script URLs with one execute_script call, so a test can make all
+of its assertions in memory instead of paying one WebDriver HTTP round trip
+per find_element / get_attribute / is_displayed.
+
+    python page_snapshot.py      # compare round trips per test, old vs new
+"""
+import sys
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from static_tier import StaticDriver, StaticElement, select
+
+SNAPSHOT_JS = """
+function visible(el) {
+    if (el.closest('[hidden]')) return false;
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') return false;
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 || rect.height > 0;
+}
+function control(el) {
+    var form = el.form || el.closest('form');
+    return {
+        tag: el.tagName.toLowerCase(),
+        name: el.getAttribute('name'),
+        type: el.type || null,
+        required: el.hasAttribute('required'),
+        displayed: visible(el),
+        text: (el.innerText || '').trim(),
+        form: form ? form.getAttribute('action') : null
+    };
+}
+var urls = function (selector, attr) {
+    return Array.prototype.map.call(document.querySelectorAll(selector), function (el) { return el[attr]; });
+};
+return {
+    url: location.href,
+    title: document.title,
+    forms: Array.prototype.map.call(document.forms, function (form) {
+        return {action: form.getAttribute('action'), method: form.method, displayed: visible(form)};
+    }),
+    controls: Array.prototype.map.call(document.querySelectorAll('input, button, select, textarea'), control),
+    stylesheets: urls('link[href]', 'href'),
+    scripts: urls('script[src]', 'src')
+};
+"""
+
+
+class PageSnapshot:
+    """In-memory view of a page; lookups raise NoSuchElementException like find_element."""
+
+    def __init__(self, data):
+        self.data = data
+        self.url = data['url']
+        self.title = data['title']
+        self.forms = data['forms']
+        self.controls = data['controls']
+        self.stylesheets = data['stylesheets']
+        self.scripts = data['scripts']
+
+    def form(self, action):
+        for form in self.forms:
+            if form['action'] == action:
+                return form
+        raise NoSuchElementException(f"No form with action {action!r} in snapshot")
+
+    def field(self, name, form=None):
+        """First control named name (optionally inside the form with that action)."""
+        for control in self.controls:
+            if control['name'] == name and (form is None or control['form'] == form):
+                return control
+        raise NoSuchElementException(f"No control named {name!r} in snapshot")
+
+    def submit_button(self, form):
+        for control in self.controls:
+            if control['tag'] == 'button' and control['type'] == 'submit' and control['form'] == form:
+                return control
+        raise NoSuchElementException(f"No submit button in form {form!r}")
+
+
+def _static_data(page):
+    """Build snapshot data from a static-tier parsed page, mirroring SNAPSHOT_JS."""
+    def control(node):
+        element = StaticElement(node, page.url)
+        form = node.parent
+        while form is not None and form.tag != 'form':
+            form = form.parent
+        default_type = 'submit' if node.tag == 'button' else ('text' if node.tag == 'input' else None)
+        return {
+            'tag': node.tag,
+            'name': node.attrs.get('name'),
+            'type': node.attrs.get('type', default_type),
+            'required': 'required' in node.attrs,
+            'displayed': element.is_displayed(),
+            'text': element.text.strip(),
+            'form': form.attrs.get('action') if form is not None else None,
+        }
+
+    nodes = [node for node in page.root.iter() if node is not page.root]
+    title = select(page.root, By.TAG_NAME, 'title')
+    return {
+        'url': page.url,
+        'title': " ".join(title[0].own_text().split()) if title else "",
+        'forms': [{'action': n.attrs.get('action'), 'method': n.attrs.get('method', 'get'),
+                   'displayed': StaticElement(n, page.url).is_displayed()}
+                  for n in nodes if n.tag == 'form'],
+        'controls': [control(n) for n in nodes if n.tag in ('input', 'button', 'select', 'textarea')],
+        'stylesheets': [StaticElement(n, page.url).get_attribute('href')
+                        for n in nodes if n.tag == 'link' and 'href' in n.attrs],
+        'scripts': [StaticElement(n, page.url).get_attribute('src')
+                    for n in nodes if n.tag == 'script' and 'src' in n.attrs],
+    }
+
+
+def take(driver):
+    """Snapshot the current page in one WebDriver command (none on the static tier)."""
+    if isinstance(driver, StaticDriver):
+        return PageSnapshot(_static_data(driver.page))
+    return PageSnapshot(driver.execute_script(SNAPSHOT_JS))
+
+
+class CommandCounter:
+    """Counts the WebDriver commands (HTTP round trips) issued inside a with-block."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.commands = []
+
+    def __enter__(self):
+        self._shadowed = self.driver.__dict__.get('execute')
+        original = self.driver.execute
+
+        def counting_execute(driver_command, params=None):
+            self.commands.append(driver_command)
+            return original(driver_command, params)
+
+        self.driver.execute = counting_execute
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._shadowed is None:
+            del self.driver.execute
+        else:
+            self.driver.execute = self._shadowed
+        return False
+
+    @property
+    def count(self):
+        return len(self.commands)
+
+
+# Element-by-element query sequences the tests used before snapshots, for comparison
+def _legacy_test_02(driver):
+    driver.find_element(By.XPATH, "//form[@action='register.php']").is_displayed()
+    for name in ("name", "email", "password"):
+        driver.find_element(By.NAME, name).is_displayed()
+    driver.find_element(By.XPATH, "//form[@action='register.php']//button[@type='submit']").is_displayed()
+
+
+def _legacy_test_03(driver):
+    driver.find_element(By.XPATH, "//form[@action='login.php']").is_displayed()
+    driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='email']").is_displayed()
+    driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='password']").is_displayed()
+    driver.find_element(By.XPATH, "//form[@action='login.php']//button[@type='submit']").is_displayed()
+
+
+def _legacy_test_12(driver):
+    fields = [driver.find_element(By.NAME, name) for name in ("name", "email", "password")]
+    for field in fields:
+        field.get_attribute("required")
+    fields[1].get_attribute("type")
+
+
+def _legacy_test_14(driver):
+    for link in driver.find_elements(By.TAG_NAME, "link"):
+        link.get_attribute("href")
+    for script in driver.find_elements(By.TAG_NAME, "script"):
+        script.get_attribute("src")
+
+
+LEGACY_QUERIES = {
+    'test_02_registration_form_elements_present': _legacy_test_02,
+    'test_03_login_form_elements_present': _legacy_test_03,
+    'test_12_form_input_validation': _legacy_test_12,
+    'test_14_page_navigation_and_links': _legacy_test_14,
+}
+
+
+def compare_round_trips(driver, url):
+    """Return (test, legacy commands, snapshot commands) for each converted test."""
+    rows = []
+    for test, legacy in LEGACY_QUERIES.items():
+        driver.get(url)
+        with CommandCounter(driver) as before:
+            legacy(driver)
+        with CommandCounter(driver) as after:
+            take(driver)
+        rows.append((test, before.count, after.count))
+    return rows
+
+
+def main():
+    import browser
+    from test_app import StudentManagementSystemTests
+
+    driver = browser.create_driver()
+    try:
+        rows = compare_round_trips(driver, StudentManagementSystemTests.base_url)
+    finally:
+        browser.quit_driver(driver)
+    print(f"{'Test':<48} {'Before':>7} {'After':>6} {'Saved':>6}")
+    for test, before, after in rows:
+        print(f"{test:<48} {before:>7} {after:>6} {before - after:>6}")
+    print(f"{'Total':<48} {sum(r[1] for r in rows):>7} {sum(r[2] for r in rows):>6} "
+          f"{sum(r[1] - r[2] for r in rows):>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Zero-wait page-state detection.
+
+Rather than probing for the registration form and waiting out the implicit
+wait on NoSuchElementException to learn that a user is logged in, detect()
+classifies the current page with a single execute_script call, which the
+implicit wait never applies to. With the driver's unhandled-prompt
+behaviour set to "ignore" (see browser.chrome_options), a pending alert
+makes that call fail fast without dismissing the alert, so it is reported
+as a state of its own.
+"""
+from selenium.common.exceptions import UnexpectedAlertPresentException
+from selenium.webdriver.common.by import By
+
+from static_tier import StaticDriver, select
+
+LOGGED_OUT = "logged_out"   # index page with the registration and login forms
+LOGGED_IN = "logged_in"     # enroll page (or any page with the logout form)
+ALERT = "alert"             # a JavaScript alert is waiting to be handled
+UNKNOWN = "unknown"
+
+_STATE_JS = """
+var has = function (action) { return !!document.querySelector("form[action='" + action + "']"); };
+return {
+    url: location.href,
+    ready: document.readyState,
+    register: has('register.php'),
+    login: has('login.php'),
+    logout: has('logout.php')
+};
+"""
+
+
+class PageState:
+    """What the browser is showing right now."""
+
+    def __init__(self, kind, url=None, has_registration_form=False, has_login_form=False,
+                 has_logout_form=False, alert_text=None):
+        self.kind = kind
+        self.url = url
+        self.has_registration_form = has_registration_form
+        self.has_login_form = has_login_form
+        self.has_logout_form = has_logout_form
+        self.alert_text = alert_text
+
+    @property
+    def logged_in(self):
+        return self.kind == LOGGED_IN
+
+    @property
+    def logged_out(self):
+        return self.kind == LOGGED_OUT
+
+    def __repr__(self):
+        return f"PageState({self.kind!r}, url={self.url!r})"
+
+
+def _classify(url, register, login, logout):
+    if logout:
+        kind = LOGGED_IN
+    elif register or login:
+        kind = LOGGED_OUT
+    else:
+        kind = UNKNOWN
+    return PageState(kind, url, register, login, logout)
+
+
+def detect(driver):
+    """Classify the current page in one round trip, without any implicit wait."""
+    if isinstance(driver, StaticDriver):
+        def has(action):
+            return bool(select(driver.page.root, By.XPATH, f"//form[@action='{action}']"))
+        return _classify(driver.current_url, has("register.php"), has("login.php"), has("logout.php"))
+    try:
+        probe = driver.execute_script(_STATE_JS)
+    except UnexpectedAlertPresentException as error:
+        return PageState(ALERT, alert_text=error.alert_text)
+    return _classify(probe['url'], probe['register'], probe['login'], probe['logout'])
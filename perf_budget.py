@@ -0,0 +1,239 @@
+"""Front-end performance of the app's pages, checked against a budget file.
+
+Each page is loaded repeatedly in Chrome. After every load one script call
+reads the Navigation and Paint Timing entries, and the DevTools
+Performance domain adds the DOM size and JS heap:
+
+    ttfb  dcl  load  fcp    milliseconds from navigation start
+    transfer               bytes over the wire, document plus subresources
+    resources              subresource count
+    nodes  heap            DOM nodes, JS heap bytes used
+
+Samples are aggregated per page (min, mean, p50, p95, max) and compared
+with the rules in perf_budget.txt, one per line:
+
+    index p95 load < 800ms
+    enroll max transfer <= 400kB
+
+The results go to a JSON artifact, and a one-line summary is appended to a
+JSONL history so trends can be plotted across builds.
+
+    python perf_budget.py --samples 10
+    python perf_budget.py --local-server --budget perf_budget.txt --output perf-results.json
+"""
+import argparse
+import json
+import operator
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+
+import config
+from stats import percentile
+
+PAGES = ("index", "enroll")
+METRICS = ("ttfb", "dcl", "load", "fcp", "transfer", "resources", "nodes", "heap")
+STATS = ("min", "mean", "p50", "p95", "max")
+DEFAULT_BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_budget.txt")
+
+_TIMING_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav || !nav.loadEventEnd) return null;
+var paints = {};
+performance.getEntriesByType('paint').forEach(function (p) { paints[p.name] = p.startTime; });
+var resources = performance.getEntriesByType('resource');
+var transfer = nav.transferSize;
+resources.forEach(function (r) { transfer += r.transferSize; });
+return {
+    ttfb: nav.responseStart - nav.startTime,
+    dcl: nav.domContentLoadedEventEnd - nav.startTime,
+    load: nav.loadEventEnd - nav.startTime,
+    fcp: paints['first-contentful-paint'] === undefined ? null : paints['first-contentful-paint'],
+    transfer: transfer,
+    resources: resources.length
+};
+"""
+
+_UNITS = {"": 1, "ms": 1, "s": 1000, "b": 1, "kb": 1024, "mb": 1024 ** 2}
+_OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+_RULE = re.compile(r"^(\w+)\s+(\w+)\s+(\w+)\s*(<=|>=|<|>)\s*([\d.]+)\s*([a-zA-Z]*)$")
+
+
+class BudgetError(Exception):
+    """A budget file line that cannot be understood."""
+
+
+class Rule:
+    """One budget line: <page> <stat> <metric> <op> <limit>[unit]."""
+
+    def __init__(self, text, page, stat, metric, op, limit):
+        self.text = text
+        self.page = page
+        self.stat = stat
+        self.metric = metric
+        self.op = op
+        self.limit = limit
+
+    def check(self, stats):
+        """Return (actual value, passed); a metric with no samples fails."""
+        actual = stats.get(self.page, {}).get(self.metric, {}).get(self.stat)
+        if actual is None:
+            return None, False
+        return actual, _OPERATORS[self.op](actual, self.limit)
+
+
+def load_budget(path):
+    rules = []
+    with open(path) as handle:
+        for number, line in enumerate(handle, 1):
+            text = line.split("#", 1)[0].strip()
+            if not text:
+                continue
+            match = _RULE.match(text)
+            if not match:
+                raise BudgetError(f"{path}:{number}: cannot parse {text!r}")
+            page, stat, metric, op, limit, unit = match.groups()
+            if page not in PAGES or stat not in STATS or metric not in METRICS:
+                raise BudgetError(f"{path}:{number}: unknown page, statistic or metric in {text!r}")
+            if unit.lower() not in _UNITS:
+                raise BudgetError(f"{path}:{number}: unknown unit {unit!r}")
+            rules.append(Rule(text, page, stat, metric, op, float(limit) * _UNITS[unit.lower()]))
+    return rules
+
+
+def sample_page(driver, url, timeout=30):
+    """Load url once and return its timing metrics."""
+    driver.get(url)
+    deadline = time.monotonic() + timeout
+    timing = driver.execute_script(_TIMING_JS)
+    while timing is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+        timing = driver.execute_script(_TIMING_JS)
+    if timing is None:
+        raise TimeoutError(f"{url} did not finish loading within {timeout}s")
+    metrics = {item['name']: item['value']
+               for item in driver.execute_cdp_cmd("Performance.getMetrics", {})['metrics']}
+    timing.update(nodes=metrics.get("Nodes"), heap=metrics.get("JSHeapUsedSize"))
+    return timing
+
+
+def measure(driver, base_url, samples):
+    """Sample every page `samples` times; enroll.php is measured with a leased, logged-in account."""
+    import account_pool
+    import http_auth
+
+    driver.execute_cdp_cmd("Performance.enable", {})
+    results = {page: [] for page in PAGES}
+    for _ in range(samples):
+        driver.delete_all_cookies()
+        results["index"].append(sample_page(driver, urljoin(base_url, "index.php")))
+    account = account_pool.AccountPool(base_url).lease()
+    try:
+        http_auth.login_browser(driver, base_url, account.name, account.email, account.password,
+                                register=False)
+        for _ in range(samples):
+            results["enroll"].append(sample_page(driver, urljoin(base_url, "enroll.php")))
+    finally:
+        account.release()
+    return results
+
+
+def aggregate(results):
+    """{page: {metric: {stat: value}}} over the samples of each page."""
+    stats = {}
+    for page, samples in results.items():
+        stats[page] = {}
+        for metric in METRICS:
+            values = sorted(s[metric] for s in samples if s.get(metric) is not None)
+            if not values:
+                continue
+            stats[page][metric] = {
+                'min': round(values[0], 2),
+                'mean': round(sum(values) / len(values), 2),
+                'p50': round(percentile(values, 50), 2),
+                'p95': round(percentile(values, 95), 2),
+                'max': round(values[-1], 2),
+            }
+    return stats
+
+
+def evaluate(rules, stats):
+    checks = []
+    for rule in rules:
+        actual, passed = rule.check(stats)
+        checks.append({'rule': rule.text, 'actual': actual, 'limit': rule.limit, 'passed': passed})
+    return checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=10, help="loads per page")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET, help="budget rules file")
+    parser.add_argument("--output", default="perf-results.json", help="JSON artifact for this run")
+    parser.add_argument("--history", default="perf-history.jsonl",
+                        help="append a one-line summary here for trends ('' to skip)")
+    parser.add_argument("--base-url", default=config.BASE_URL)
+    parser.add_argument("--local-server", action="store_true", help="measure the bundled stub server")
+    parser.add_argument("--latency", type=float, default=0.0, help="stub server latency per request, in ms")
+    args = parser.parse_args(argv)
+
+    import asset_cache
+    import browser
+
+    rules = load_budget(args.budget) if args.budget else []
+    server = None
+    base_url = args.base_url
+    if args.local_server:
+        import stub_server
+        server = stub_server.start(latency=args.latency / 1000)
+        base_url = server.base_url
+
+    driver = browser.create_driver()
+    # Same conditions as the suite: CDN assets come from the local cache when there is one
+    assets = asset_cache.intercept(driver, base_url)
+    try:
+        results = measure(driver, base_url, args.samples)
+    finally:
+        if assets:
+            assets.close()
+        browser.quit_driver(driver)
+        if server:
+            server.shutdown()
+
+    stats = aggregate(results)
+    checks = evaluate(rules, stats)
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        'base_url': base_url,
+        'samples': args.samples,
+        'stats': stats,
+        'budget': checks,
+        'raw': results,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    if args.history:
+        summary = {'timestamp': report['timestamp'], 'base_url': base_url,
+                   **{f"{page}.{metric}.p95": values['p95']
+                      for page, metrics in stats.items() for metric, values in metrics.items()}}
+        with open(args.history, "a") as handle:
+            handle.write(json.dumps(summary) + "\n")
+
+    print("PERFORMANCE:")
+    for page, metrics in stats.items():
+        line = ", ".join(f"{metric} p95 {values['p95']:.0f}" for metric, values in metrics.items())
+        print(f"  {page}: {line}")
+    print("BUDGET:")
+    for check in checks:
+        mark = "✓" if check['passed'] else "✗"
+        actual = "no data" if check['actual'] is None else f"{check['actual']:.0f}"
+        print(f"  {mark} {check['rule']} (actual {actual})")
+    print(f"Results written to {args.output}")
+    return 0 if all(check['passed'] for check in checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Bring the browser to each test's precondition with as few navigations as possible.
+
+The fixed setUp loaded logout.php and then the home page before every
+test, even when the previous test had left the browser logged out on an
+untouched index page. Tests now declare what they need:
+
+    @requires(LOGGED_OUT, preserves=True)   # reads the index page, changes nothing
+    def test_02_...
+
+    @requires(LOGGED_IN)                    # self.account is the pool account in use
+    def test_09_...
+
+LOGGED_OUT   the index page, no session
+LOGGED_IN    enroll.php, logged in as an account leased from the pool
+FRESH_USER   enroll.php, logged in as a newly registered account
+ANY          whatever the previous test left behind
+
+Undecorated tests require LOGGED_OUT. A test declared with preserves=True
+promises to leave the page as it found it (no typing, clicking or
+navigating); after any other test the state is unknown.
+
+A Planner follows one browser session from test to test and performs only
+the missing steps, checking its belief against page_state.detect() (the
+probe setUp makes anyway) before skipping anything. plan() orders tests so
+that consecutive ones share a state, and `python runner.py --dry-run`
+prints that order with the navigations saved over the fixed setUp.
+"""
+from types import SimpleNamespace
+
+import account_pool
+import browser
+import config
+import http_auth
+import page_state
+
+ANY = "any"
+LOGGED_OUT = "logged_out"
+LOGGED_IN = "logged_in"
+FRESH_USER = "fresh_user"
+BLANK = "blank"         # nothing loaded yet: a new session or context
+UNKNOWN = "unknown"     # after a test that may have changed the page
+
+# logout.php, then the home page
+FIXED_SETUP_NAVIGATIONS = 2
+
+# Stale pool accounts to skip before a LOGGED_IN test gives up
+LOGIN_ATTEMPTS = 3
+
+
+def requires(state, preserves=False):
+    """Declare the state a test starts from, and whether it leaves the page untouched."""
+    def decorate(test_method):
+        test_method.sms_requires = state
+        test_method.sms_preserves = preserves
+        return test_method
+    return decorate
+
+
+def requirement(test_method):
+    """(state, preserves, full fidelity) declared on a test method."""
+    return (getattr(test_method, "sms_requires", LOGGED_OUT),
+            getattr(test_method, "sms_preserves", False),
+            getattr(test_method, "sms_full_fidelity", False))
+
+
+def navigations(current, page_full, need, full):
+    """Page loads needed to get from current to need."""
+    if need == ANY:
+        return 0
+    if need == current and need != FRESH_USER and (page_full or not full):
+        return 0
+    if need == LOGGED_OUT:
+        # From a session, logout.php redirects to the index page by itself
+        return 1
+    # The session cookie can only be injected from the app's origin
+    return 2 if current == BLANK else 1
+
+
+class Step:
+    """One test in a plan and the setUp navigations it costs."""
+
+    def __init__(self, name, need, preserves, navigations, baseline):
+        self.name = name
+        self.need = need
+        self.preserves = preserves
+        self.navigations = navigations
+        self.baseline = baseline
+
+
+def plan(test_class, names, fresh_each=False, fixed=FIXED_SETUP_NAVIGATIONS, lean=None):
+    """Order names greedily so that each test can start where the previous one left off.
+
+    fresh_each plans for sessions that start every test blank (browser
+    contexts); fixed is the fixed setUp's navigations per test, to compare
+    against. Tests that need a login did it themselves before, so their
+    baseline counts one more.
+    """
+    if lean is None:
+        lean = config.BROWSER_PROFILE != browser.DEFAULT
+    tests = [(index, name) + requirement(getattr(test_class, name)) for index, name in enumerate(names)]
+    current, page_full = BLANK, not lean
+    steps = []
+    while tests:
+        if fresh_each:
+            current, page_full = BLANK, not lean
+        # Cheapest first; among equals keep the state (preserving tests) and run
+        # ANY tests once the state is lost anyway, else keep the listed order
+        test = min(tests, key=lambda t: (navigations(current, page_full, t[2], t[4]),
+                                         not t[3], t[2] == ANY, t[0]))
+        tests.remove(test)
+        _, name, need, preserves, full = test
+        cost = navigations(current, page_full, need, full)
+        baseline = fixed + (need in (LOGGED_IN, FRESH_USER))
+        steps.append(Step(name, need, preserves, cost, baseline))
+        if cost:
+            page_full = full or not lean
+        if not preserves:
+            current = UNKNOWN
+        elif need != ANY:
+            current = need
+    return steps
+
+
+def order(test_class, names):
+    return [step.name for step in plan(test_class, names)]
+
+
+class Planner:
+    """Tracks what one browser session shows and brings it to each test's precondition."""
+
+    def __init__(self, driver, wait, base_url, accounts):
+        self.driver = driver
+        self.wait = wait
+        self.base_url = base_url
+        self.accounts = accounts
+        self.state = BLANK
+        self.page_full = False
+        self.account = None
+        self.navigations = 0
+
+    def forget(self, state=UNKNOWN):
+        """The session was replaced or reset behind the planner's back."""
+        self.state = state
+
+    def prepare(self, test_method, page=None):
+        """Reach test_method's precondition; page is a fresh page_state.detect() result.
+
+        Returns the account the session is logged in as, if any.
+        """
+        need, preserves, full = requirement(test_method)
+        if need != ANY and navigations(self.state, self.page_full, need, full) == 0:
+            # Trust but verify: a test may not have kept its promise
+            expected = page_state.LOGGED_OUT if need == LOGGED_OUT else page_state.LOGGED_IN
+            if page is None or page.kind != expected:
+                self.state = UNKNOWN
+        if need == LOGGED_OUT and self.state != LOGGED_OUT:
+            self._log_out()
+        elif need == FRESH_USER or need == LOGGED_IN and self.state != LOGGED_IN:
+            self._log_in(need)
+        elif need != ANY and full and not self.page_full:
+            self._load(self.driver.current_url)
+        if not preserves:
+            self.state = UNKNOWN
+        elif need != ANY:
+            self.state = need
+        return self.account
+
+    def _load(self, url):
+        self.driver.get(url)
+        self.navigations += 1
+        self.page_full = getattr(self.driver, "sms_active_profile", None) == browser.DEFAULT
+        self.wait.for_network_idle()
+
+    def _log_out(self):
+        if self.state == BLANK:
+            self._load(self.base_url)
+        else:
+            self._load(f"{self.base_url}/logout.php")
+            if page_state.detect(self.driver).kind != page_state.LOGGED_OUT:
+                self._load(self.base_url)
+        self.release()
+
+    def _log_in(self, need):
+        if need == FRESH_USER:
+            self.release()
+            account, register = SimpleNamespace(**account_pool.new_account("fresh")), True
+        else:
+            account, register = None, False
+        for _ in range(LOGIN_ATTEMPTS):
+            if not register and not isinstance(self.account, account_pool.Account):
+                self.account = self.accounts.lease()
+            account = account if register else self.account
+            try:
+                http_auth.login_browser(self.driver, self.base_url, account.name, account.email,
+                                        account.password, register=register)
+                break
+            except http_auth.AuthError:
+                if register:
+                    raise
+                # The app no longer knows this pool account (e.g. its data was reset)
+                self.account.release(dirty=True)
+                self.account = None
+        else:
+            raise http_auth.AuthError(f"no pool account could log in after {LOGIN_ATTEMPTS} attempts")
+        if self.state == BLANK:
+            self.navigations += 1
+        self.navigations += 1
+        self.page_full = getattr(self.driver, "sms_active_profile", None) == browser.DEFAULT
+        self.wait.for_page_ready()
+        self.account = account
+
+    def release(self):
+        """Hand a leased pool account back (fresh accounts are simply dropped)."""
+        if isinstance(self.account, account_pool.Account):
+            self.account.release()
+        self.account = None
@@ -0,0 +1,72 @@
+"""Compare navigation time and Chrome memory between browser profiles.
+
+Starts one fresh Chrome per profile, loads the app's pages a number of
+times and reports how long driver.get() took to return (what the tests
+wait for) and how long until the page was fully interactive, plus the
+resident memory of the whole Chrome process tree afterwards.
+
+    python profile_bench.py --rounds 20
+    python profile_bench.py --local-server --latency 80
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import browser
+import config
+
+PAGES = ("index.php", "logout.php", "")
+
+
+def measure(profile, base_url, rounds):
+    """Return per-navigation timings (seconds) and final RSS (bytes) for one profile."""
+    driver = browser.create_driver(profile=profile)
+    try:
+        driver.get(base_url)   # warm-up: first load fills the HTTP cache
+        get_times, ready_times = [], []
+        for _ in range(rounds):
+            for page in PAGES:
+                start = time.perf_counter()
+                driver.get(base_url.rstrip("/") + "/" + page)
+                get_times.append(time.perf_counter() - start)
+                while driver.execute_script("return document.readyState") != "complete":
+                    time.sleep(0.01)
+                ready_times.append(time.perf_counter() - start)
+        return get_times, ready_times, browser.process_tree_rss(driver)
+    finally:
+        browser.quit_driver(driver)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10, help="passes over the app's pages")
+    parser.add_argument("--profiles", nargs="+", default=[browser.DEFAULT, browser.LEAN],
+                        choices=sorted(browser.PROFILES))
+    parser.add_argument("--local-server", action="store_true", help="benchmark against stub_server.py")
+    parser.add_argument("--latency", type=float, default=0.0, help="stub server latency per request, in ms")
+    args = parser.parse_args(argv)
+
+    base_url = config.BASE_URL
+    server = None
+    if args.local_server:
+        import stub_server
+        server = stub_server.start(latency=args.latency / 1000)
+        base_url = server.base_url
+
+    print(f"{'Profile':<10} {'get p50':>8} {'get p95':>8} {'ready p50':>10} {'RSS MiB':>8}")
+    try:
+        for profile in args.profiles:
+            get_times, ready_times, rss = measure(profile, base_url, args.rounds)
+            p95 = statistics.quantiles(get_times, n=20)[-1] if len(get_times) > 1 else get_times[0]
+            memory = f"{rss / 2 ** 20:.0f}" if rss else "n/a"
+            print(f"{profile:<10} {statistics.median(get_times) * 1000:>6.0f}ms {p95 * 1000:>6.0f}ms "
+                  f"{statistics.median(ready_times) * 1000:>8.0f}ms {memory:>8}")
+    finally:
+        if server:
+            server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
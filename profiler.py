@@ -0,0 +1,214 @@
+"""WebDriver command-level profiler.
+
+When enabled (runner.py --profile, or SMS_PROFILE=<path>), every WebDriver
+command issued by an instrumented driver is recorded with its name,
+locator, latency and the implicit-wait time it burned, along with every
+time.sleep and the Chrome startup, attributed to the running test. The run
+produces a JSON report and a top-N slowest-operations table, and can be
+compared with a stored baseline to flag regressions.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.remote.command import Command
+
+import config
+
+FIND_COMMANDS = {Command.FIND_ELEMENT, Command.FIND_ELEMENTS,
+                 Command.FIND_CHILD_ELEMENT, Command.FIND_CHILD_ELEMENTS}
+
+# A test or operation regresses when it is this much slower than the baseline...
+REGRESSION_RATIO = 0.25
+# ...and at least this many seconds slower in absolute terms
+REGRESSION_MIN_DELTA = 0.25
+
+_real_sleep = time.sleep
+
+
+class Profiler:
+    """Collects timed events for one process."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.events = []
+        self.tests = {}
+        self.current_test = None
+        self._test_started = None
+        self._lock = threading.Lock()
+
+    def record(self, kind, name, latency, locator=None, implicit_wait=0.0, caller=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.events.append({
+                'test': self.current_test,
+                'kind': kind,
+                'name': name,
+                'locator': locator,
+                'latency': round(latency, 5),
+                'implicit_wait': round(implicit_wait, 5),
+                'caller': caller,
+            })
+
+    def begin(self, test_name):
+        """Attribute subsequent events to test_name and close the previous test's timing."""
+        if not self.enabled:
+            return
+        self.finish()
+        self.current_test = test_name
+        self._test_started = time.monotonic()
+
+    def finish(self):
+        if self.current_test is not None and self._test_started is not None:
+            self.tests[self.current_test] = time.monotonic() - self._test_started
+        self.current_test = None
+        self._test_started = None
+
+    @contextmanager
+    def span(self, kind, name):
+        """Time an arbitrary block (e.g. browser startup) as one event."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(kind, name, time.monotonic() - start)
+
+    def instrument(self, driver):
+        """Record every command the driver sends. No-op when profiling is off."""
+        if not self.enabled or getattr(driver, "sms_profiled", False):
+            return driver
+        original = driver.execute
+        state = {'implicit': 0.0}
+
+        def profiled_execute(driver_command, params=None):
+            locator = None
+            if driver_command in FIND_COMMANDS and params:
+                locator = f"{params.get('using')}={params.get('value')}"
+            if driver_command == Command.SET_TIMEOUTS and params and 'implicit' in params:
+                state['implicit'] = params['implicit'] / 1000.0
+            start = time.monotonic()
+            empty = False
+            try:
+                response = original(driver_command, params)
+                empty = driver_command in FIND_COMMANDS and not response.get('value')
+                return response
+            except NoSuchElementException:
+                empty = True
+                raise
+            finally:
+                latency = time.monotonic() - start
+                # A find that came back empty sat out the implicit wait before giving up
+                burned = min(latency, state['implicit']) if empty else 0.0
+                self.record('command', driver_command, latency, locator, burned)
+
+        driver.execute = profiled_execute
+        driver.sms_profiled = True
+        return driver
+
+    def patch_sleep(self):
+        """Route time.sleep through the profiler for the rest of the process."""
+        if not self.enabled or time.sleep is not _real_sleep:
+            return
+
+        def profiled_sleep(seconds):
+            frame = sys._getframe(1)
+            caller = f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+            start = time.monotonic()
+            try:
+                _real_sleep(seconds)
+            finally:
+                self.record('sleep', 'time.sleep', time.monotonic() - start, caller=caller)
+
+        time.sleep = profiled_sleep
+
+    def drain(self):
+        """Return everything recorded so far as a plain dict and start afresh."""
+        self.finish()
+        with self._lock:
+            data = {'events': self.events, 'tests': self.tests}
+            self.events, self.tests = [], {}
+        return data
+
+
+def build_report(parts):
+    """Merge per-process profiler dicts into one report with per-test totals."""
+    events = [event for part in parts for event in part['events']]
+    tests = {}
+    for part in parts:
+        for name, wall in part['tests'].items():
+            tests[name] = {'wall': round(wall, 4), 'commands': 0, 'command_time': 0.0,
+                           'implicit_wait': 0.0, 'sleep': 0.0}
+    for event in events:
+        entry = tests.get(event['test'])
+        if entry is None:
+            continue
+        if event['kind'] == 'command':
+            entry['commands'] += 1
+            entry['command_time'] += event['latency']
+            entry['implicit_wait'] += event['implicit_wait']
+        elif event['kind'] == 'sleep':
+            entry['sleep'] += event['latency']
+    for entry in tests.values():
+        for key in ('command_time', 'implicit_wait', 'sleep'):
+            entry[key] = round(entry[key], 4)
+    totals = {}
+    for event in events:
+        totals[event['kind']] = round(totals.get(event['kind'], 0.0) + event['latency'], 4)
+    return {'tests': tests, 'totals': totals, 'events': events}
+
+
+def operation_key(event):
+    return f"{event['kind']}:{event['name']}" + (f" [{event['locator']}]" if event['locator'] else "")
+
+
+def slowest_lines(report, top=10):
+    """The top-N slowest single operations, as printable lines."""
+    lines = [f"{'Latency':>8} {'Impl.wait':>9}  {'Test':<40} Operation"]
+    for event in sorted(report['events'], key=lambda e: -e['latency'])[:top]:
+        lines.append(f"{event['latency']:>7.3f}s {event['implicit_wait']:>8.3f}s  "
+                     f"{(event['test'] or '(class setup)')[:40]:<40} {operation_key(event)}")
+    return lines
+
+
+def _operation_totals(report):
+    totals = {}
+    for event in report['events']:
+        key = operation_key(event)
+        totals[key] = totals.get(key, 0.0) + event['latency']
+    return totals
+
+
+def compare(report, baseline, ratio=REGRESSION_RATIO, min_delta=REGRESSION_MIN_DELTA):
+    """List (what, baseline seconds, current seconds) for everything that got slower."""
+    def slower(before, after):
+        return after - before >= min_delta and after > before * (1 + ratio)
+
+    regressions = []
+    for name, entry in sorted(report['tests'].items()):
+        before = baseline['tests'].get(name, {}).get('wall')
+        if before is not None and slower(before, entry['wall']):
+            regressions.append((f"test {name}", before, entry['wall']))
+    before_ops = _operation_totals(baseline)
+    for key, after in sorted(_operation_totals(report).items()):
+        if key in before_ops and slower(before_ops[key], after):
+            regressions.append((f"operation {key}", before_ops[key], after))
+    return regressions
+
+
+def write_report(report, path):
+    with open(path, "w") as handle:
+        json.dump(report, handle, indent=2)
+
+
+def load_report(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+PROFILER = Profiler(enabled=bool(config.PROFILE))
+PROFILER.patch_sleep()
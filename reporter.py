@@ -0,0 +1,241 @@
+"""Stream per-test results to JUnit XML and JSON Lines while the suite runs.
+
+Each finished test is appended to <dir>/<stem>.jsonl and <dir>/<stem>.xml,
+where stem identifies the process ("main", "w0", "w1", ... prefixed with
+the shard when sharded). The XML file is rewritten in place after every
+test so it is always a complete document: a long run can be watched, and
+a killed one still leaves valid JUnit behind.
+
+When a test fails or errors, its screenshot, page source and browser
+console log are read from the driver on the test thread. Those reads are
+the only part that costs the test anything. Decoding, writing and the
+result files are handled by a background thread, and the artifacts
+directory is kept under SMS_REPORT_MAX_MB by each process deleting its
+own oldest failures first.
+
+    SMS_REPORT_DIR=test-results/live python test_app.py
+    python runner.py --report-dir test-results/live
+    SMS_REPORT_DIR= python runner.py        # off
+"""
+import atexit
+import base64
+import json
+import os
+import queue
+import shutil
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from xml.sax.saxutils import quoteattr
+
+import config
+
+PASS = "pass"
+FAILURE = "failure"
+ERROR = "error"
+SKIP = "skip"
+
+_JUNIT_CLOSE = "</testsuite>\n</testsuites>\n"
+
+
+def _stem():
+    worker = os.environ.get("SMS_WORKER_ID")
+    stem = f"w{worker}" if worker is not None else "main"
+    label = os.environ.get("SMS_REPORT_LABEL")
+    return f"{label}-{stem}" if label else stem
+
+
+class _JUnitStream:
+    """A JUnit file kept well-formed by rewriting its closing tags after each test case."""
+
+    def __init__(self, path, suite):
+        self.handle = open(path, "w", encoding="utf-8")
+        self.handle.write(f'<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n'
+                          f'<testsuite name={quoteattr(suite)} timestamp={quoteattr(_now())}>\n')
+        self.body_end = self.handle.tell()
+        self._close_tags()
+
+    def _close_tags(self):
+        self.handle.write(_JUNIT_CLOSE)
+        self.handle.truncate()
+        self.handle.flush()
+
+    def add(self, element):
+        self.handle.seek(self.body_end)
+        self.handle.write(ET.tostring(element, encoding="unicode") + "\n")
+        self.body_end = self.handle.tell()
+        self._close_tags()
+
+    def close(self):
+        self.handle.close()
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def capture(driver):
+    """Read failure evidence from driver; whatever it cannot provide is left out.
+
+    Runs on the test thread, since a WebDriver session cannot be shared, so
+    it only fetches: the screenshot stays base64 until the writer decodes it.
+    """
+    evidence = {}
+    readers = {
+        'screenshot': lambda: driver.get_screenshot_as_base64(),
+        'page_source': lambda: driver.page_source,
+        'console': lambda: driver.get_log("browser"),
+    }
+    for name, read in readers.items():
+        try:
+            evidence[name] = read()
+        except Exception:
+            # No such capability (static tier, contexts) or an alert is in the way
+            pass
+    return evidence
+
+
+class Reporter:
+    """Queues finished tests for a background writer thread."""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = config.REPORT_DIR if directory is None else directory
+        self.max_bytes = config.REPORT_MAX_MB * 2 ** 20 if max_bytes is None else max_bytes
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._junit = None
+        self._jsonl = None
+        self._artifacts = 0
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def record(self, test_id, outcome, duration, message=None, evidence=None):
+        """Queue one finished test; evidence is a capture() dict for failures."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name="reporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        self._queue.put({'test': test_id, 'outcome': outcome, 'duration': round(duration, 4),
+                         'message': message, 'evidence': evidence, 'timestamp': _now()})
+
+    def flush(self):
+        """Block until everything queued so far is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._junit:
+            self._junit.close()
+            self._jsonl.close()
+            self._junit = self._jsonl = None
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        stem = _stem()
+        self._junit = _JUnitStream(os.path.join(self.directory, f"{stem}.xml"), f"sms-{stem}")
+        self._jsonl = open(os.path.join(self.directory, f"{stem}.jsonl"), "w", encoding="utf-8")
+
+    def _write_loop(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                if entry is None:
+                    return
+                if self._junit is None:
+                    self._open()
+                self._write(entry)
+            except Exception as error:
+                print(f"Reporter: could not write {entry and entry['test']}: {error}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, entry):
+        evidence = entry.pop('evidence')
+        entry['artifacts'] = []
+        if evidence:
+            try:
+                entry['artifacts'] = self._save_artifacts(entry['test'], evidence)
+            except Exception as error:
+                # Lose the evidence, not the result
+                print(f"Reporter: could not save artifacts for {entry['test']}: {error}")
+        self._jsonl.write(json.dumps(entry) + "\n")
+        self._jsonl.flush()
+
+        # unittest ids are module.Class.method, possibly followed by a description
+        classname, _, name = entry['test'].split()[0].rpartition(".")
+        case = ET.Element("testcase", classname=classname, name=name, time=str(entry['duration']))
+        if entry['outcome'] in (FAILURE, ERROR, SKIP):
+            message = entry['message'] or ""
+            tag = "skipped" if entry['outcome'] == SKIP else entry['outcome']
+            child = ET.SubElement(case, tag, message=message.strip().splitlines()[-1] if message.strip() else "")
+            if entry['outcome'] != SKIP:
+                child.text = message
+        if entry['artifacts']:
+            # The format Jenkins' JUnit attachments plugin picks up
+            ET.SubElement(case, "system-out").text = "\n".join(
+                f"[[ATTACHMENT|{os.path.abspath(path)}]]" for path in entry['artifacts'])
+        self._junit.add(case)
+
+    def _save_artifacts(self, test_id, evidence):
+        self._artifacts += 1
+        name = test_id.split()[0].rsplit(".", 1)[-1]
+        folder = os.path.join(self.directory, "artifacts", f"{_stem()}-{self._artifacts:03d}-{name}")
+        os.makedirs(folder, exist_ok=True)
+        paths = []
+        if evidence.get('screenshot'):
+            paths.append(self._save(folder, "screenshot.png", base64.b64decode(evidence['screenshot'])))
+        if evidence.get('page_source') is not None:
+            paths.append(self._save(folder, "page.html", evidence['page_source'].encode("utf-8")))
+        if evidence.get('console'):
+            lines = "".join(f"{entry.get('timestamp', '')} {entry.get('level', '')} {entry.get('message', '')}\n"
+                            for entry in evidence['console'])
+            paths.append(self._save(folder, "console.log", lines.encode("utf-8")))
+        self._evict(keep=folder)
+        return paths
+
+    @staticmethod
+    def _save(folder, filename, data):
+        path = os.path.join(folder, filename)
+        with open(path, "wb") as handle:
+            handle.write(data)
+        return path
+
+    def _evict(self, keep):
+        """Delete the oldest failures' artifacts until the directory fits the cap.
+
+        The whole directory counts towards the cap, but only this process's
+        folders are deleted: another worker may still be writing its own.
+        """
+        root = os.path.join(self.directory, "artifacts")
+        own = f"{_stem()}-"
+        folders = []
+        total = 0
+        for entry in os.scandir(root):
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                modified = entry.stat().st_mtime
+            except OSError:
+                # Another worker evicted it first
+                continue
+            total += size
+            if entry.name.startswith(own) and entry.path != keep:
+                folders.append((modified, entry.path, size))
+        for _, path, size in sorted(folders):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+REPORTER = Reporter()
@@ -0,0 +1,537 @@
+"""Test runner for the Student Management System suite.
+
+Tests marked @tier(STATIC) run in-process against parsed HTML snapshots; the
+rest are spread over a pool of worker processes, each driving its own
+isolated Chrome. All results are merged into the usual TEST SUMMARY.
+
+    python runner.py --workers 4
+    python runner.py --browser-only
+    python runner.py --contexts 4
+    python runner.py --local-server --latency 80
+    python runner.py --browser-profile lean
+    python runner.py --virtual-time
+    python runner.py --profile profile.json --baseline baseline-profile.json
+    python runner.py --incremental
+    python runner.py --report-dir test-results/live
+    python runner.py --dry-run --workers 2
+    python runner.py --shard 1/3 && python runner.py --merge test-results/shard-*.json
+    python runner.py --workers 2 test_01_page_loads_successfully test_07_login_with_nonexistent_user
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import account_pool
+import browser_watchdog
+import config
+import planner
+import profiler
+import reporter
+import sharding
+from browser_watchdog import WATCHDOG
+from reporter import REPORTER
+from static_tier import STATIC, static_case, tier_of
+from waits import Waiter, WaitRecord
+
+
+class MergedResult:
+    """Result lists collected from several workers, shaped like unittest.TestResult."""
+
+    def __init__(self):
+        self.testsRun = 0
+        self.failures = []
+        self.errors = []
+        self.skipped = []
+        self.wait_records = []
+        self.time_to_first_test = None
+        self.profiles = []
+        self.asset_stats = None
+        self.durations = {}
+        self.cached = []
+        self.watchdog = []
+        self.parts = []
+
+    def add(self, worker_result):
+        self.parts.append(worker_result)
+        self.testsRun += worker_result['tests_run']
+        self.failures.extend(worker_result['failures'])
+        self.errors.extend(worker_result['errors'])
+        self.skipped.extend(worker_result['skipped'])
+        self.wait_records.extend(WaitRecord(**r) for r in worker_result['waits'])
+        first = worker_result['time_to_first_test']
+        if first is not None:
+            # The slowest worker to get going bounds the whole run
+            self.time_to_first_test = max(first, self.time_to_first_test or 0)
+        if worker_result.get('assets'):
+            stats = self.asset_stats or {'hits': 0, 'misses': 0}
+            self.asset_stats = {key: stats[key] + worker_result['assets'][key] for key in stats}
+        if worker_result.get('profile'):
+            self.profiles.append(worker_result['profile'])
+        self.durations.update(worker_result.get('durations') or {})
+        self.cached.extend(worker_result.get('cached') or [])
+        if worker_result.get('watchdog'):
+            self.watchdog.append(worker_result['watchdog'])
+
+    def wasSuccessful(self):
+        return not self.failures and not self.errors
+
+
+def print_summary(result, wait_records=(), time_to_first_test=None, asset_stats=None):
+    """Print the TEST SUMMARY block for a unittest or merged result."""
+    print("\n" + "=" * 60)
+    print("TEST SUMMARY:")
+    print(f"Tests run: {result.testsRun}")
+    print(f"Failures: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print(f"Skipped: {len(result.skipped)}")
+    cached = getattr(result, 'cached', [])
+    if cached:
+        print(f"Cached passes (unchanged since last pass, not run): {len(cached)}")
+
+    if len(result.failures) == 0 and len(result.errors) == 0:
+        print("🎉 ALL TESTS PASSED!")
+    else:
+        print("⚠️  Some tests failed - check the detailed output above")
+
+    if time_to_first_test is not None:
+        print(f"Time from process start to first test: {time_to_first_test:.2f}s")
+    if asset_stats is not None:
+        print(f"Asset cache: {asset_stats['hits']} hit(s), {asset_stats['misses']} miss(es)")
+    recycles = [entry for part in getattr(result, 'watchdog', []) for entry in part['recycles']]
+    if recycles:
+        print(f"Browser recycles: {len(recycles)}")
+        for entry in recycles:
+            print(f"  worker {entry['worker']} before {entry['test']}: {'; '.join(entry['reasons'])}")
+    print("=" * 60)
+    waiter = Waiter(None)
+    waiter.records = list(wait_records)
+    print("WAIT REPORT:")
+    for line in waiter.report_lines():
+        print(line)
+    print("=" * 60)
+
+
+def test_names():
+    """Names of all test methods in the suite, in execution order."""
+    from test_app import StudentManagementSystemTests
+    return unittest.TestLoader().getTestCaseNames(StudentManagementSystemTests)
+
+
+def partition(names, workers, durations=None):
+    """Split test names into at most `workers` chunks of similar expected duration."""
+    return sharding.pack(names, workers, durations or {}, test_tiers(names))
+
+
+def test_tiers(names):
+    """{name: STATIC or BROWSER} for test names."""
+    from test_app import StudentManagementSystemTests
+    return {name: tier_of(StudentManagementSystemTests, name) for name in names}
+
+
+def split_tiers(names):
+    """Route test names to (static-tier names, browser-tier names)."""
+    tiers = test_tiers(names)
+    static = [name for name in names if tiers[name] == STATIC]
+    return static, [name for name in names if name not in static]
+
+
+class TimedResult(unittest.TextTestResult):
+    """TextTestResult that also records each test's wall time, setUp included.
+
+    Every outcome is streamed to the REPORTER as soon as the test stops;
+    failures and errors carry the driver's screenshot, source and console.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.durations = {}
+        self._started = None
+        self._outcome = None
+
+    def startTest(self, test):
+        self._started = time.monotonic()
+        self._outcome = (reporter.PASS, None, None)
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        elapsed = round(time.monotonic() - self._started, 4)
+        self.durations[test._testMethodName] = elapsed
+        REPORTER.record(test.id(), self._outcome[0], elapsed, *self._outcome[1:])
+
+    def _failed(self, test, outcome, trace):
+        if not REPORTER.enabled:
+            return
+        driver = getattr(test, "driver", None)
+        evidence = reporter.capture(driver) if driver is not None else None
+        if not isinstance(test, unittest.TestCase):
+            # setUpClass and tearDownClass errors arrive without startTest/stopTest
+            REPORTER.record(test.id(), outcome, 0, trace, evidence)
+        elif self._outcome[0] == reporter.PASS:
+            self._outcome = (outcome, trace, evidence)
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._failed(test, reporter.FAILURE, self.failures[-1][1])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._failed(test, reporter.ERROR, self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._outcome = (reporter.SKIP, reason, None)
+
+
+def run_tests(names, verbosity=2, stream=None, static=False, case_class=None):
+    """Run the named tests in this process, in Chrome or on the static tier.
+
+    case_class overrides the test class (e.g. a contexts.context_case copy).
+    Browser tests are reordered so each can start where the previous one left off.
+    Returns a plain-dict summary that can cross process boundaries.
+    """
+    from test_app import StudentManagementSystemTests
+    if case_class is None:
+        case_class = static_case(StudentManagementSystemTests) if static else StudentManagementSystemTests
+    if not static:
+        names = planner.order(case_class, names)
+    suite = unittest.TestSuite(case_class(name) for name in names)
+    result = unittest.TextTestRunner(stream=stream or sys.stderr, verbosity=verbosity,
+                                     resultclass=TimedResult).run(suite)
+    REPORTER.flush()
+    waiter = getattr(case_class, 'wait', None)
+    return {
+        'tests_run': result.testsRun,
+        'failures': [(test.id(), trace) for test, trace in result.failures],
+        'errors': [(test.id(), trace) for test, trace in result.errors],
+        'skipped': [(test.id(), reason) for test, reason in result.skipped],
+        'waits': [record.as_dict() for record in waiter.records] if waiter else [],
+        'time_to_first_test': StudentManagementSystemTests.time_to_first_test,
+        'profile': profiler.PROFILER.drain() if profiler.PROFILER.enabled else None,
+        'assets': StudentManagementSystemTests.asset_stats,
+        'durations': result.durations,
+        'watchdog': WATCHDOG.drain() if WATCHDOG.enabled else None,
+    }
+
+
+def empty_result(**fields):
+    """A run_tests()-shaped dict for tests that did not run, with fields overridden."""
+    result = {'tests_run': 0, 'failures': [], 'errors': [], 'skipped': [], 'waits': [],
+              'time_to_first_test': None, 'profile': None, 'assets': None, 'durations': {}}
+    result.update(fields)
+    return result
+
+
+def select_incremental(names, max_age_hours, force=False):
+    """Split names into (to run, cached passes) and return the fingerprints used.
+
+    When the application cannot be fingerprinted everything runs.
+    """
+    import incremental
+    from test_app import StudentManagementSystemTests
+    try:
+        prints = incremental.fingerprints(StudentManagementSystemTests, names, config.BASE_URL)
+    except Exception as error:
+        print(f"Incremental selection disabled: could not fingerprint the app ({error})")
+        return names, [], None
+    cache = incremental.ResultCache()
+    cached = [] if force else cache.cached_passes(prints, max_age_hours)
+    return [name for name in names if name not in cached], cached, prints
+
+
+def print_plan(names, workers=1, contexts=0, durations=None):
+    """Print the order each browser session would run names in, and the navigations saved."""
+    from test_app import StudentManagementSystemTests
+    chunks = partition(names, contexts or max(1, workers), durations)
+    # A context starts every test blank and its fixed setUp was a single page load
+    fixed = 1 if contexts else planner.FIXED_SETUP_NAVIGATIONS
+    planned = baseline = 0
+    print(f"Dry run: setUp plan for {len(names)} browser test(s)")
+    for i, chunk in enumerate(chunks):
+        print(f"--- {'context' if contexts else 'worker'} {i} ---")
+        steps = planner.plan(StudentManagementSystemTests, chunk, fresh_each=bool(contexts), fixed=fixed)
+        for number, step in enumerate(steps, 1):
+            keeps = "keeps state" if step.preserves else ""
+            print(f"  {number:>2}. {step.name:<55} {step.need:<11} {keeps:<11} {step.navigations} nav")
+            planned += step.navigations
+            baseline += step.baseline
+    print(f"setUp navigations: {planned} planned, {baseline} with the fixed setUp "
+          f"({baseline - planned} saved)")
+
+
+def _worker(worker, names, verbosity):
+    """Entry point of a worker process: run names against this worker's own Chrome."""
+    os.environ["SMS_WORKER_ID"] = str(worker)
+    stream = io.StringIO()
+    worker_result = run_tests(names, verbosity, stream)
+    worker_result.update(worker=worker, output=stream.getvalue())
+    return worker_result
+
+
+def run_parallel(names, workers, merged, verbosity=2, durations=None):
+    """Run names across `workers` processes and merge their results into merged."""
+    chunks = partition(names, workers, durations)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=context) as pool:
+        futures = [pool.submit(_worker, i, chunk, verbosity) for i, chunk in enumerate(chunks)]
+        for future in futures:
+            worker_result = future.result()
+            sys.stderr.write(f"\n--- worker {worker_result['worker']} ---\n")
+            sys.stderr.write(worker_result['output'])
+            merged.add(worker_result)
+
+
+def run_contexts(names, concurrency, merged, verbosity=2, durations=None):
+    """Run names `concurrency` at a time in browser contexts of a single Chrome."""
+    import contexts
+    from test_app import StudentManagementSystemTests
+    chunks = partition(names, concurrency, durations)
+    try:
+        host = contexts.BrowserHost()
+    except Exception:
+        # Reported like a failed setUpClass in the one-Chrome-per-worker model
+        trace = traceback.format_exc()
+        sys.stderr.write(trace)
+        merged.add(empty_result(errors=[("BrowserHost (contexts)", trace)]))
+        return
+    try:
+        with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+            streams = [io.StringIO() for _ in chunks]
+            futures = [pool.submit(run_tests, chunk, verbosity, stream,
+                                   case_class=contexts.context_case(StudentManagementSystemTests, host))
+                       for chunk, stream in zip(chunks, streams)]
+            for i, (future, stream) in enumerate(zip(futures, streams)):
+                context_result = future.result()
+                sys.stderr.write(f"\n--- context {i} ---\n")
+                sys.stderr.write(stream.getvalue())
+                merged.add(context_result)
+    finally:
+        host.close()
+
+
+def report_profile(parts, path, baseline_path=None, top=10):
+    """Write the merged profile, print the slowest operations and any regressions."""
+    report = profiler.build_report(parts)
+    profiler.write_report(report, path)
+    print("SLOWEST OPERATIONS:")
+    for line in profiler.slowest_lines(report, top):
+        print(line)
+    print(f"Time by kind: {report['totals']}")
+    print(f"Profile written to {path}")
+    regressions = []
+    if baseline_path:
+        regressions = profiler.compare(report, profiler.load_report(baseline_path))
+        print(f"REGRESSIONS vs {baseline_path}: {len(regressions) or 'none'}")
+        for what, before, after in regressions:
+            print(f"  ⚠️  {what}: {before:.3f}s -> {after:.3f}s")
+    print("=" * 60)
+    return regressions
+
+
+def merge_results(paths, durations_path=None, profile_path=None, baseline_path=None,
+                  fail_on_regression=False, top=10, watchdog_path=None):
+    """Rebuild the TEST SUMMARY from shard result files and update the duration history."""
+    parts, wall_times, missing = sharding.load_results(paths)
+    result = MergedResult()
+    for part in parts:
+        result.add(part)
+    print_summary(result, result.wait_records, result.time_to_first_test, result.asset_stats)
+    print(f"Wall time: {max(wall_times, default=0):.1f}s across {len(wall_times)} shard(s) "
+          f"({sum(wall_times):.1f}s of test time)")
+    if missing:
+        print(f"⚠️  No result file for shard(s) {', '.join(map(str, missing))}")
+    if result.durations:
+        sharding.update_durations(result.durations, durations_path)
+    if watchdog_path and result.watchdog:
+        browser_watchdog.write_report(result.watchdog, watchdog_path)
+    regressions = []
+    if profile_path and result.profiles:
+        regressions = report_profile(result.profiles, profile_path, baseline_path, top)
+    if missing or not result.wasSuccessful() or (regressions and fail_on_regression):
+        return 1
+    return 0
+
+
+def start_local_server(latency_ms, jitter_ms, max_concurrency):
+    """Start the bundled stub server and point this process and its workers at it."""
+    import stub_server
+    server = stub_server.start(latency=latency_ms / 1000, jitter=jitter_ms / 1000,
+                               max_concurrency=max_concurrency)
+    config.BASE_URL = os.environ["SMS_BASE_URL"] = server.base_url
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tests", nargs="*", help="test method names (default: all)")
+    parser.add_argument("--workers", type=int, default=config.WORKERS,
+                        help="number of parallel browser workers (default: $SMS_WORKERS or 1)")
+    parser.add_argument("--contexts", type=int, default=config.CONTEXTS, metavar="N",
+                        help="run browser tests N at a time in isolated contexts of one Chrome "
+                             "instead of one Chrome per worker")
+    parser.add_argument("--browser-only", action="store_true",
+                        help="run static-tier tests in Chrome too")
+    parser.add_argument("--local-server", action="store_true", default=config.LOCAL_SERVER,
+                        help="run against the bundled stub server (default: $SMS_LOCAL_SERVER)")
+    parser.add_argument("--latency", type=float, default=config.LOCAL_LATENCY_MS,
+                        help="stub server latency per request, in ms")
+    parser.add_argument("--jitter", type=float, default=config.LOCAL_JITTER_MS,
+                        help="stub server random +/- latency, in ms")
+    parser.add_argument("--max-concurrency", type=int, default=config.LOCAL_MAX_CONCURRENCY,
+                        help="stub server concurrent request limit (0 = unlimited)")
+    parser.add_argument("--browser-profile", choices=("default", "lean"), default=config.BROWSER_PROFILE,
+                        help="Chrome profile for browser tests (default: $SMS_BROWSER_PROFILE or default)")
+    parser.add_argument("--virtual-time", action="store_true", default=config.VIRTUAL_TIME,
+                        help="fast-forward page timers while @virtual_time.fast_forward tests wait")
+    parser.add_argument("--accounts", type=int, default=config.ACCOUNT_POOL_SIZE,
+                        help="free pre-registered accounts to have ready (0 = register on demand)")
+    parser.add_argument("--profile", metavar="PATH", default=config.PROFILE,
+                        help="record WebDriver commands and sleeps to a JSON report")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="compare the profile against a stored report and flag regressions")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit non-zero when --baseline finds regressions")
+    parser.add_argument("--top", type=int, default=10, help="slowest operations to list")
+    parser.add_argument("--shard", metavar="I/N",
+                        help="run only shard I of N, balanced by the recorded test durations")
+    parser.add_argument("--results-dir", default="test-results",
+                        help="where --shard writes its result file (default: test-results)")
+    parser.add_argument("--merge", nargs="+", metavar="FILE",
+                        help="print the combined summary of shard result files instead of running")
+    parser.add_argument("--incremental", action="store_true", default=config.INCREMENTAL,
+                        help="skip tests whose fingerprint is unchanged since they passed")
+    parser.add_argument("--force", action="store_true",
+                        help="with --incremental, run every test and refresh the result cache")
+    parser.add_argument("--max-cache-age", type=float, default=config.RESULT_CACHE_MAX_AGE_HOURS,
+                        metavar="HOURS", help="oldest cached pass that still counts")
+    parser.add_argument("--watchdog-report", metavar="PATH", default=config.WATCHDOG_REPORT,
+                        help="write the browser watchdog's resource samples and recycles to a JSON file")
+    parser.add_argument("--durations", default=config.DURATIONS,
+                        help="per-test duration history (default: $SMS_DURATIONS)")
+    parser.add_argument("--report-dir", default=config.REPORT_DIR,
+                        help="stream JUnit XML, JSON Lines and failure artifacts here ('' to turn off)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the planned browser test order and setUp navigations saved, run nothing")
+    parser.add_argument("-q", "--quiet", action="store_true", help="less unittest output")
+    args = parser.parse_args(argv)
+
+    if args.merge:
+        return merge_results(args.merge, args.durations, args.profile, args.baseline,
+                             args.fail_on_regression, args.top, args.watchdog_report)
+    shard = None
+    if args.shard:
+        try:
+            shard = sharding.parse_shard(args.shard)
+        except ValueError as error:
+            parser.error(str(error))
+    if args.contexts and (args.profile or args.watchdog_report):
+        # Context threads share one PROFILER and WATCHDOG, and context setUp feeds neither
+        parser.error("--profile and --watchdog-report cannot be combined with --contexts")
+    if args.contexts and args.virtual_time:
+        # Context sessions run without a VirtualClock
+        parser.error("--virtual-time cannot be combined with --contexts")
+
+    # Must happen before test_app is imported so the test class picks up the URL
+    server = None
+    if args.local_server:
+        server = start_local_server(args.latency, args.jitter, args.max_concurrency)
+        print(f"Using local stub server at {server.base_url}")
+
+    # Workers are spawned, so they read the profile back from the environment
+    config.BROWSER_PROFILE = os.environ["SMS_BROWSER_PROFILE"] = args.browser_profile
+    config.VIRTUAL_TIME = args.virtual_time
+    REPORTER.directory = os.environ["SMS_REPORT_DIR"] = args.report_dir
+    if shard:
+        os.environ["SMS_REPORT_LABEL"] = f"shard-{shard[0]}-of-{shard[1]}"
+    os.environ["SMS_VIRTUAL_TIME"] = "1" if args.virtual_time else "0"
+
+    if args.profile:
+        os.environ["SMS_PROFILE"] = args.profile
+        profiler.PROFILER.enabled = True
+        profiler.PROFILER.patch_sleep()
+
+    names = args.tests or test_names()
+    durations = sharding.load_durations(args.durations)
+    if shard:
+        tiers = test_tiers(names)
+        names = sharding.shard(names, *shard, durations, tiers)
+        print(f"Shard {args.shard}: {len(names)} test(s), "
+              f"~{sum(sharding.estimates(names, durations, tiers).values()):.0f}s expected")
+    verbosity = 1 if args.quiet else 2
+    cached, prints = [], None
+    if args.incremental:
+        names, cached, prints = select_incremental(names, args.max_cache_age, args.force)
+    if args.dry_run:
+        print_plan(names if args.browser_only else split_tiers(names)[1],
+                   args.workers, args.contexts, durations)
+        if server:
+            server.shutdown()
+        return 0
+
+    print("Starting Student Management System Test Suite...")
+    if REPORTER.enabled:
+        print(f"Streaming results to {args.report_dir}")
+    print("=" * 60)
+    start = time.monotonic()
+    result = MergedResult()
+    if cached:
+        result.add(empty_result(cached=list(cached)))
+        print(f"Incremental: {len(cached)} cached pass(es), {len(names)} test(s) to run")
+    static_names, browser_names = ([], names) if args.browser_only else split_tiers(names)
+    if static_names:
+        result.add(run_tests(static_names, verbosity, static=True))
+        print(f"Static tier: {len(static_names)} test(s) in {time.monotonic() - start:.2f}s")
+    if browser_names:
+        accounts = account_pool.AccountPool()
+        accounts.reclaim()
+        if args.accounts:
+            seeded = accounts.seed(max(args.accounts, args.workers, args.contexts))
+            print(f"Account pool: registered {seeded} account(s), {accounts.counts()[account_pool.FREE]} free")
+        if args.contexts:
+            run_contexts(browser_names, args.contexts, result, verbosity, durations)
+        elif args.workers > 1:
+            run_parallel(browser_names, args.workers, result, verbosity, durations)
+        else:
+            result.add(run_tests(browser_names, verbosity))
+        # Workers have exited, so any lease they still hold is orphaned
+        accounts.reclaim()
+    print_summary(result, result.wait_records, result.time_to_first_test, result.asset_stats)
+    wall_time = time.monotonic() - start
+    if args.contexts:
+        print(f"Wall time: {wall_time:.1f}s with {args.contexts} concurrent context(s) in one Chrome")
+    else:
+        print(f"Wall time: {wall_time:.1f}s with {max(1, args.workers)} worker(s)")
+    if server:
+        server.shutdown()
+    if shard:
+        # Shards run concurrently, so the merge step updates the history instead
+        path = sharding.result_path(args.results_dir, *shard)
+        sharding.write_result(path, *shard, result.parts, wall_time)
+        print(f"Shard result written to {path}")
+    elif result.durations:
+        sharding.update_durations(result.durations, args.durations)
+    if args.watchdog_report and result.watchdog:
+        browser_watchdog.write_report(result.watchdog, args.watchdog_report)
+        print(f"Watchdog samples written to {args.watchdog_report}")
+    if prints:
+        import incremental
+        cache = incremental.ResultCache()
+        cache.record(prints, *incremental.outcomes(result.parts))
+        cache.save()
+
+    regressions = []
+    if args.profile:
+        regressions = report_profile(result.profiles, args.profile, args.baseline, args.top)
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Duration-aware splitting of the suite across containers or workers.
+
+Every run records how long each test took; the history is an exponentially
+weighted moving average per test, so one slow run nudges the estimate
+rather than replacing it. Shards are filled with greedy longest-processing-
+time bin packing: tests are taken longest first and each goes to the
+currently lightest shard, which keeps the slowest shard (and so the wall
+time of the whole build) close to the average.
+
+    python runner.py --shard 1/3 --results-dir test-results
+    python runner.py --shard 2/3 --results-dir test-results
+    python runner.py --shard 3/3 --results-dir test-results
+    python runner.py --merge test-results/shard-*.json
+"""
+import json
+import os
+import statistics
+
+import config
+
+# Weight of the newest measurement in the moving average
+SMOOTHING = 0.5
+# Estimate for a test with no history when nothing else is known, in seconds
+DEFAULT_ESTIMATE = 5.0
+
+
+def parse_shard(spec):
+    """'2/5' -> (2, 5); shards are numbered from 1."""
+    index, _, count = spec.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, not {spec!r}") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index {index} is not between 1 and {count}")
+    return index, count
+
+
+def load_durations(path=None):
+    """Per-test duration estimates in seconds; empty when there is no history yet."""
+    try:
+        with open(path or config.DURATIONS) as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def update_durations(measured, path=None):
+    """Fold this run's measurements into the stored history and save it."""
+    path = path or config.DURATIONS
+    history = load_durations(path)
+    for name, seconds in measured.items():
+        previous = history.get(name)
+        history[name] = round(seconds if previous is None
+                              else previous + SMOOTHING * (seconds - previous), 4)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w") as handle:
+        json.dump(history, handle, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+    return history
+
+
+def estimates(names, durations, tiers=None):
+    """Expected seconds per name.
+
+    tiers maps names to their tier. An unseen test gets the median of the
+    known tests of its own tier, or DEFAULT_ESTIMATE when that tier has no
+    history or the test's tier is not given: static tests take milliseconds
+    and must not speak for browser tests.
+    """
+    tiers = tiers or {}
+    known = {}
+    for name in names:
+        if name in durations and name in tiers:
+            known.setdefault(tiers[name], []).append(durations[name])
+    fallback = {tier: statistics.median(values) for tier, values in known.items()}
+    return {name: durations[name] if name in durations else fallback.get(tiers.get(name), DEFAULT_ESTIMATE)
+            for name in names}
+
+
+def _lpt(names, bins, durations, tiers):
+    """Longest-processing-time packing into exactly `bins` groups (some may be empty)."""
+    expected = estimates(names, durations, tiers)
+    order = {name: i for i, name in enumerate(names)}
+    groups = [[] for _ in range(bins)]
+    loads = [0.0] * bins
+    # Longest first; ties broken by suite order so every shard computes the same split
+    for name in sorted(names, key=lambda n: (-expected[n], order[n])):
+        lightest = loads.index(min(loads))
+        groups[lightest].append(name)
+        loads[lightest] += expected[name]
+    # Within a group, keep suite order
+    return [sorted(group, key=order.get) for group in groups]
+
+
+def pack(names, bins, durations, tiers=None):
+    """Split names into at most `bins` non-empty groups with balanced expected time."""
+    return [group for group in _lpt(names, max(1, bins), durations, tiers) if group]
+
+
+def shard(names, index, count, durations, tiers=None):
+    """The names that shard `index` of `count` should run (possibly none)."""
+    return _lpt(names, count, durations, tiers)[index - 1]
+
+
+def result_path(results_dir, index, count):
+    return os.path.join(results_dir, f"shard-{index}-of-{count}.json")
+
+
+def write_result(path, index, count, parts, wall_time):
+    """Save one shard's run_tests() dicts so a later merge can rebuild the summary."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w") as handle:
+        json.dump({'shard': [index, count], 'wall_time': wall_time, 'parts': parts}, handle)
+    os.replace(path + ".tmp", path)
+
+
+def load_results(paths):
+    """Read shard result files; returns (parts, wall times, missing shard numbers)."""
+    parts, wall_times, seen, count = [], [], set(), 0
+    for path in paths:
+        with open(path) as handle:
+            data = json.load(handle)
+        index, count = data['shard']
+        seen.add(index)
+        parts.extend(data['parts'])
+        wall_times.append(data['wall_time'])
+    missing = sorted(set(range(1, count + 1)) - seen)
+    return parts, wall_times, missing
@@ -0,0 +1,316 @@
+"""Browserless fast tier for tests that only inspect static markup.
+
+Tests that only look at the served HTML (title, headings, form structure,
+input attributes, CSS classes, <link>/<script> tags) are marked with
+@tier(STATIC). The runner sends them to a copy of the test class whose
+driver is a StaticDriver: the page is fetched once over HTTP, parsed with
+html.parser, and find_element / get_attribute / is_displayed are answered
+from the parsed tree. Every other test keeps running in Chrome.
+"""
+import re
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from http_auth import AppClient
+
+STATIC = "static"
+BROWSER = "browser"
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+             "link", "meta", "source", "track", "wbr"}
+INVISIBLE_TAGS = {"head", "script", "style", "title", "meta", "link", "template", "noscript"}
+BOOLEAN_ATTRIBUTES = {"required", "disabled", "checked", "readonly", "multiple",
+                      "selected", "autofocus", "hidden", "novalidate"}
+URL_ATTRIBUTES = {"href", "src", "action"}
+
+
+def tier(name):
+    """Declare which tier a test runs on (STATIC or BROWSER)."""
+    def decorate(test_method):
+        test_method.sms_tier = name
+        return test_method
+    return decorate
+
+
+def tier_of(test_class, name):
+    return getattr(getattr(test_class, name), "sms_tier", BROWSER)
+
+
+class Node:
+    """An element of the parsed document."""
+
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+        self.texts = []
+
+    def iter(self):
+        """This node and its descendants in document order."""
+        yield self
+        for child in self.children:
+            yield from child.iter()
+
+    def own_text(self):
+        return "".join(self.texts)
+
+    def full_text(self):
+        if self.tag in ("script", "style"):
+            return ""
+        parts = [self.own_text()] + [child.full_text() for child in self.children]
+        return " ".join(part for part in parts if part.strip())
+
+    def hidden(self):
+        style = self.attrs.get("style", "").replace(" ", "").lower()
+        return (self.tag in INVISIBLE_TAGS or "hidden" in self.attrs
+                or "display:none" in style or "visibility:hidden" in style
+                or (self.tag == "input" and self.attrs.get("type", "").lower() == "hidden"))
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        # Tolerate unclosed children by popping back to the matching open tag
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].texts.append(data)
+
+
+def parse_html(markup):
+    builder = _TreeBuilder()
+    builder.feed(markup)
+    builder.close()
+    return builder.root
+
+
+_STEP = re.compile(r"(//|/)(\*|[\w-]+)((?:\[[^\]]*\])*)")
+_PREDICATE = re.compile(r"\[([^\]]*)\]")
+# A quoted literal cannot contain its own quote, so 'a' and @b='c' is not one literal
+_LITERAL = r"""(?:'([^']*)'|"([^"]*)")"""
+_ATTR_EQUALS = re.compile(rf"^@([\w-]+)\s*=\s*{_LITERAL}$")
+_ATTR_EXISTS = re.compile(r"^@([\w-]+)$")
+_CONTAINS = re.compile(rf"^contains\(\s*(text\(\)|@[\w-]+)\s*,\s*{_LITERAL}\s*\)$")
+_TEXT_EQUALS = re.compile(rf"^text\(\)\s*=\s*{_LITERAL}$")
+
+
+def _literal(match, group):
+    """The text of the literal whose single-quoted form is capture group `group`."""
+    single, double = match.group(group, group + 1)
+    return single if single is not None else double
+
+
+def _predicate_matches(node, predicate):
+    predicate = predicate.strip()
+    match = _ATTR_EQUALS.match(predicate)
+    if match:
+        return node.attrs.get(match.group(1)) == _literal(match, 2)
+    match = _ATTR_EXISTS.match(predicate)
+    if match:
+        return match.group(1) in node.attrs
+    match = _CONTAINS.match(predicate)
+    if match:
+        subject, needle = match.group(1), _literal(match, 2)
+        value = node.own_text() if subject == "text()" else node.attrs.get(subject[1:], "")
+        return needle in value
+    match = _TEXT_EQUALS.match(predicate)
+    if match:
+        return node.own_text().strip() == _literal(match, 1)
+    raise WebDriverException(f"Unsupported XPath predicate in static tier: [{predicate}]")
+
+
+def select_xpath(context, expression):
+    """Evaluate the small XPath subset the suite uses: //tag, /tag, * and simple predicates."""
+    if expression.startswith("."):
+        expression = expression[1:]
+    if not expression.startswith("/"):
+        expression = "/" + expression
+    steps = _STEP.findall(expression)
+    if "".join("".join(step) for step in steps) != expression:
+        raise WebDriverException(f"Unsupported XPath in static tier: {expression}")
+    nodes = [context]
+    for axis, tag, predicates in steps:
+        found = []
+        seen = set()
+        for node in nodes:
+            candidates = node.iter() if axis == "//" else iter(node.children)
+            for candidate in candidates:
+                if candidate is node or id(candidate) in seen:
+                    continue
+                if tag != "*" and candidate.tag != tag:
+                    continue
+                if all(_predicate_matches(candidate, p) for p in _PREDICATE.findall(predicates)):
+                    seen.add(id(candidate))
+                    found.append(candidate)
+        nodes = found
+    return nodes
+
+
+def select(context, by, value):
+    """Find descendants of context for a Selenium locator."""
+    descendants = [node for node in context.iter() if node is not context]
+    if by == By.XPATH:
+        return select_xpath(context, value)
+    if by == By.TAG_NAME:
+        return [node for node in descendants if node.tag == value.lower()]
+    if by == By.NAME:
+        return [node for node in descendants if node.attrs.get("name") == value]
+    if by == By.ID:
+        return [node for node in descendants if node.attrs.get("id") == value]
+    if by == By.CLASS_NAME:
+        return [node for node in descendants if value in node.attrs.get("class", "").split()]
+    raise WebDriverException(f"Locator strategy {by!r} is not supported in the static tier")
+
+
+class StaticElement:
+    """Read-only stand-in for a WebElement backed by a parsed node."""
+
+    def __init__(self, node, page_url):
+        self.node = node
+        self.page_url = page_url
+
+    @property
+    def tag_name(self):
+        return self.node.tag
+
+    @property
+    def text(self):
+        if not self.is_displayed():
+            return ""
+        return " ".join(self.node.full_text().split())
+
+    def get_attribute(self, name):
+        if name not in self.node.attrs:
+            return None
+        if name in BOOLEAN_ATTRIBUTES:
+            return "true"
+        if name in URL_ATTRIBUTES:
+            return urljoin(self.page_url, self.node.attrs[name])
+        return self.node.attrs[name]
+
+    def is_displayed(self):
+        node = self.node
+        while node is not None:
+            if node.hidden():
+                return False
+            node = node.parent
+        return True
+
+    def find_element(self, by=By.ID, value=None):
+        return _first(self.find_elements(by, value), by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return [StaticElement(node, self.page_url) for node in select(self.node, by, value)]
+
+
+def _first(elements, by, value):
+    if not elements:
+        raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+    return elements[0]
+
+
+class Snapshot:
+    """A fetched and parsed page."""
+
+    def __init__(self, url, status, markup):
+        self.url = url
+        self.status = status
+        self.markup = markup
+        self.root = parse_html(markup)
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def snapshot(url):
+    """Fetch and parse url once per run; later calls reuse the parsed tree."""
+    with _snapshots_lock:
+        if url not in _snapshots:
+            status, _, markup = AppClient(url).get(url)
+            _snapshots[url] = Snapshot(url, status, markup)
+        return _snapshots[url]
+
+
+class StaticDriver:
+    """The subset of the WebDriver API used by static-tier tests, served from snapshots."""
+
+    def __init__(self):
+        self.page = None
+
+    def get(self, url):
+        self.page = snapshot(url)
+
+    @property
+    def current_url(self):
+        return self.page.url
+
+    @property
+    def page_source(self):
+        return self.page.markup
+
+    @property
+    def title(self):
+        titles = select(self.page.root, By.TAG_NAME, "title")
+        return " ".join(titles[0].own_text().split()) if titles else ""
+
+    def find_element(self, by=By.ID, value=None):
+        return _first(self.find_elements(by, value), by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return [StaticElement(node, self.page.url) for node in select(self.page.root, by, value)]
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def quit(self):
+        pass
+
+
+def static_case(test_class):
+    """Derive a copy of test_class that runs on a StaticDriver instead of Chrome.
+
+    Built on demand rather than at module level so that unittest and pytest
+    discovery never collect it.
+    """
+    from waits import Waiter
+
+    class StaticTierCase(test_class):
+        @classmethod
+        def setUpClass(cls):
+            cls.driver = StaticDriver()
+            cls.wait = Waiter(cls.driver)
+
+        @classmethod
+        def tearDownClass(cls):
+            pass
+
+        def setUp(self):
+            self.wait.begin(self._testMethodName)
+            self.driver.get(self.base_url)
+
+    StaticTierCase.__name__ = StaticTierCase.__qualname__ = f"{test_class.__name__}[static]"
+    return StaticTierCase
@@ -0,0 +1,307 @@
+"""Local stand-in for the Student Management System PHP application.
+
+Reproduces the pages and behaviours the suite relies on, so it can run (and
+be benchmarked) without the EC2 host:
+
+  * index.php      - registration and login forms (logged in: redirect to enroll.php)
+  * register.php   - POST; alert + JS redirect back to index.php
+  * login.php      - POST; "User not found" / "Invalid password" alerts, or
+                     a session cookie plus alert + JS redirect to enroll.php
+  * enroll.php     - welcome page with course enrollment and a logout form;
+                     redirects to index.php without a session
+  * logout.php     - ends the session and redirects to index.php
+
+Artificial latency and a concurrency limit make timings reproducible:
+
+    python stub_server.py --port 8080 --latency 80 --jitter 20 --max-concurrency 4
+    SMS_BASE_URL=http://127.0.0.1:8080/ python runner.py
+"""
+import argparse
+import hashlib
+import html
+import random
+import secrets
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SESSION_COOKIE = "PHPSESSID"
+BOOTSTRAP_CSS = "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css"
+BOOTSTRAP_JS = "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"
+COURSES = ["Mathematics", "Physics", "Computer Science", "Literature"]
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <link href="{css}" rel="stylesheet">
+</head>
+<body>
+<div class="container mt-5">
+    <h2 class="text-center mb-4">Student Management System</h2>
+{body}
+</div>
+<script src="{js}"></script>
+</body>
+</html>
+"""
+
+INDEX_BODY = """    <div class="row">
+        <div class="col-md-6">
+            <h4>Register</h4>
+            <form action="register.php" method="POST">
+                <input type="text" name="name" class="form-control mb-2" placeholder="Name" required>
+                <input type="email" name="email" class="form-control mb-2" placeholder="Email" required>
+                <input type="password" name="password" class="form-control mb-2" placeholder="Password" required>
+                <button type="submit" class="btn btn-primary">Register</button>
+            </form>
+        </div>
+        <div class="col-md-6">
+            <h4>Login</h4>
+            <form action="login.php" method="POST">
+                <input type="email" name="email" class="form-control mb-2" placeholder="Email" required>
+                <input type="password" name="password" class="form-control mb-2" placeholder="Password" required>
+                <button type="submit" class="btn btn-success">Login</button>
+            </form>
+        </div>
+    </div>"""
+
+ENROLL_BODY = """    <p class="lead">Welcome, {name}!</p>
+    <form action="enroll.php" method="POST" class="mb-3">
+        <select name="course" class="form-control mb-2">
+{options}
+        </select>
+        <button type="submit" class="btn btn-primary">Enroll</button>
+    </form>
+    <ul class="list-group mb-3">
+{enrolled}
+    </ul>
+    <form action="logout.php" method="POST">
+        <button type="submit" class="btn btn-danger">Logout</button>
+    </form>"""
+
+
+def _alert_then(message, location):
+    """The app's PHP idiom: echo a script that alerts and then redirects."""
+    return (f"<script>alert({message!r}); window.location.href={location!r};</script>")
+
+
+class AppState:
+    """Users and sessions, shared by all request threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = {}
+        self.sessions = {}
+
+    @staticmethod
+    def _hash(password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def register(self, name, email, password):
+        with self.lock:
+            if email in self.users:
+                return False
+            self.users[email] = {'name': name, 'password': self._hash(password), 'courses': []}
+            return True
+
+    def check(self, email, password):
+        """Return None on success, else the app's error message."""
+        with self.lock:
+            user = self.users.get(email)
+        if user is None:
+            return "User not found!"
+        if user['password'] != self._hash(password):
+            return "Invalid password!"
+        return None
+
+    def start_session(self, email):
+        sid = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[sid] = email
+        return sid
+
+    def user_for(self, sid):
+        with self.lock:
+            email = self.sessions.get(sid)
+            return self.users.get(email) if email else None
+
+    def end_session(self, sid):
+        with self.lock:
+            self.sessions.pop(sid, None)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, jitter=0.0, max_concurrency=0, queue_timeout=30.0):
+        super().__init__(address, StubHandler)
+        self.state = AppState()
+        self.latency = latency
+        self.jitter = jitter
+        self.queue_timeout = queue_timeout
+        self.slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'rejected': 0}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # body waits on a delayed ACK and every response picks up ~40ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- plumbing --------------------------------------------------------
+
+    def _session_id(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+
+    def _form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        fields = parse_qs(self.rfile.read(length).decode()) if length else {}
+        return {key: values[0] for key, values in fields.items()}
+
+    def _send(self, status, body="", headers=None):
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def _redirect(self, location, headers=None):
+        self._send(302, "", dict(headers or {}, Location=location))
+
+    def _page(self, title, body, headers=None):
+        self._send(200, PAGE.format(title=title, css=BOOTSTRAP_CSS, js=BOOTSTRAP_JS, body=body), headers)
+
+    def _dispatch(self):
+        server = self.server
+        with server.stats_lock:
+            server.stats['requests'] += 1
+        if server.slots and not server.slots.acquire(timeout=server.queue_timeout):
+            with server.stats_lock:
+                server.stats['rejected'] += 1
+            self._send(503, "Server busy")
+            return
+        try:
+            if server.latency or server.jitter:
+                time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+            page = urlsplit(self.path).path.rstrip("/").rsplit("/", 1)[-1] or "index.php"
+            handler = getattr(self, "page_" + page.replace(".php", ""), None)
+            if handler is None or not page.endswith(".php"):
+                self._send(404, "Not Found")
+            else:
+                handler()
+        finally:
+            if server.slots:
+                server.slots.release()
+
+    do_GET = do_POST = do_HEAD = _dispatch
+
+    # -- pages -----------------------------------------------------------
+
+    def page_index(self):
+        if self.server.state.user_for(self._session_id()):
+            self._redirect("enroll.php")
+        else:
+            self._page("Student Management System", INDEX_BODY)
+
+    def page_register(self):
+        if self.command != "POST":
+            self._redirect("index.php")
+            return
+        form = self._form()
+        if not all(form.get(field) for field in ("name", "email", "password")):
+            self._send(200, _alert_then("All fields are required!", "index.php"))
+        elif self.server.state.register(form["name"], form["email"], form["password"]):
+            self._send(200, _alert_then("Registration successful!", "index.php"))
+        else:
+            self._send(200, _alert_then("Email already registered!", "index.php"))
+
+    def page_login(self):
+        if self.command != "POST":
+            self._redirect("index.php")
+            return
+        form = self._form()
+        error = self.server.state.check(form.get("email", ""), form.get("password", ""))
+        if error:
+            self._send(200, _alert_then(error, "index.php"))
+            return
+        sid = self.server.state.start_session(form["email"])
+        self._send(200, _alert_then("Login successful!", "enroll.php"),
+                   {"Set-Cookie": f"{SESSION_COOKIE}={sid}; Path=/; HttpOnly"})
+
+    def page_enroll(self):
+        user = self.server.state.user_for(self._session_id())
+        if user is None:
+            self._redirect("index.php")
+            return
+        if self.command == "POST":
+            course = self._form().get("course")
+            if course in COURSES and course not in user['courses']:
+                user['courses'].append(course)
+            self._redirect("enroll.php")
+            return
+        options = "\n".join(f'            <option value="{html.escape(c)}">{html.escape(c)}</option>'
+                            for c in COURSES)
+        enrolled = "\n".join(f'        <li class="list-group-item">{html.escape(c)}</li>'
+                             for c in user['courses'])
+        self._page("Enroll - Student Management System",
+                   ENROLL_BODY.format(name=html.escape(user['name']), options=options, enrolled=enrolled))
+
+    def page_logout(self):
+        sid = self._session_id()
+        if sid:
+            self.server.state.end_session(sid)
+        self._redirect("index.php", {"Set-Cookie": f"{SESSION_COOKIE}=deleted; Path=/; Max-Age=0"})
+
+
+def start(host="127.0.0.1", port=0, latency=0.0, jitter=0.0, max_concurrency=0):
+    """Start a stub server on a background thread and return it (port 0 picks a free port)."""
+    server = StubServer((host, port), latency, jitter, max_concurrency)
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the PHP application")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="added delay per request, in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- delay, in ms")
+    parser.add_argument("--max-concurrency", type=int, default=0,
+                        help="requests served at once; others queue (0 = unlimited)")
+    args = parser.parse_args(argv)
+
+    server = StubServer((args.host, args.port), args.latency / 1000, args.jitter / 1000,
+                        args.max_concurrency)
+    print(f"Stub server listening on {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import account_pool
+import stub_server
+from account_pool import DIRTY, FREE, LEASED, AccountPool
+
+
+class PoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = stub_server.start()
+        self.addCleanup(self.server.shutdown)
+        self.path = os.path.join(tempfile.mkdtemp(), "accounts.json")
+        self.pool = AccountPool(self.server.base_url, self.path)
+
+    def write(self, *records):
+        with self.pool._locked() as accounts:
+            for index, record in enumerate(records):
+                accounts.append(dict(account_pool.new_account(f"a{index}-"), **record))
+
+    def states(self):
+        with open(self.path) as handle:
+            return {r['email'].split("-")[0]: r['state'] for r in json.load(handle)[self.pool.base_url]}
+
+
+class LeaseTests(PoolTestCase):
+
+    def test_free_accounts_are_leased_once(self):
+        self.write({'state': FREE, 'owner': None, 'leased_at': None},
+                   {'state': FREE, 'owner': None, 'leased_at': None})
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leased = list(executor.map(lambda _: self.pool.lease(), range(2)))
+        self.assertEqual(len({account.email for account in leased}), 2)
+        self.assertEqual(self.pool.counts(), {FREE: 0, LEASED: 2, DIRTY: 0})
+
+        leased[0].release()
+        leased[1].release(dirty=True)
+        self.assertEqual(self.pool.counts(), {FREE: 1, LEASED: 0, DIRTY: 1})
+
+    def test_exhausted_pool_registers_a_new_account(self):
+        self.write({'state': LEASED, 'owner': account_pool._owner(), 'leased_at': time.time()},
+                   {'state': DIRTY, 'owner': None, 'leased_at': None})
+        account = self.pool.lease()
+        self.assertTrue(account.email.startswith("pool"))
+        self.assertEqual(self.pool.counts(), {FREE: 0, LEASED: 2, DIRTY: 1})
+        # The new account exists on the application
+        from http_auth import AppClient
+        AppClient(self.server.base_url).login(account.email, account.password)
+
+
+class ReclaimTests(PoolTestCase):
+
+    def test_stale_owners_are_reclaimed(self):
+        child = subprocess.Popen([sys.executable, "-c", "pass"])
+        child.wait()
+        here = account_pool._owner()
+        foreign = dict(here, host="elsewhere")
+        now = time.time()
+        self.write(
+            {'state': LEASED, 'owner': here, 'leased_at': now},                          # a0: alive
+            {'state': LEASED, 'owner': dict(here, pid=child.pid), 'leased_at': now},     # a1: exited
+            {'state': LEASED, 'owner': dict(here, start=here['start'] - 1), 'leased_at': now},  # a2: PID reused
+            {'state': LEASED, 'owner': foreign, 'leased_at': now},                       # a3: recent, elsewhere
+            {'state': LEASED, 'owner': foreign, 'leased_at': now - 7200},                # a4: old, elsewhere
+            {'state': LEASED, 'owner': 12345, 'leased_at': now - 7200},                  # a5: old format
+            {'state': DIRTY, 'owner': None, 'leased_at': None},                          # a6
+        )
+        self.assertEqual(self.pool.reclaim(max_age_minutes=60), (4, 1))
+        self.assertEqual(self.states(), {'a0': LEASED, 'a1': FREE, 'a2': FREE, 'a3': LEASED,
+                                         'a4': FREE, 'a5': FREE})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,63 +1,127 @@
-import unittest
 import time
+
+# Reference point for the "time to first test" figure in the summary
+_PROCESS_START = time.monotonic()
+
+import unittest
 import random
 import string
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+import account_pool
+import asset_cache
+import browser
+import browser_watchdog
+import config
+import page_snapshot
+import page_state
+import planner
+import virtual_time
+from browser_watchdog import WATCHDOG
+from planner import ANY, LOGGED_IN, LOGGED_OUT, requires
+from profiler import PROFILER
+from static_tier import STATIC, tier
+from waits import Waiter
+
 class StudentManagementSystemTests(unittest.TestCase):
     
+    time_to_first_test = None
+    asset_stats = None
+    clock = None
+    # Set SMS_BASE_URL to point at your EC2 instance (see config.py)
+    base_url = config.BASE_URL
+    
+    @classmethod
+    def start_browser(cls):
+        """Start Chrome with headless options, instrumentation and the asset cache"""
+        # Each parallel worker gets its own profile directory and debugging port
+        with PROFILER.span("startup", "chrome start"):
+            cls.driver = browser.create_driver()
+        PROFILER.instrument(cls.driver)
+        WATCHDOG.attach(cls.driver)
+        cls.driver.implicitly_wait(10)
+        # Serve Bootstrap and other CDN assets from the local cache when there is one
+        cls.assets = asset_cache.intercept(cls.driver, cls.base_url)
+        # Page timers can be fast-forwarded for @virtual_time.fast_forward tests
+        cls.clock = virtual_time.attach(cls.driver)
+    
+    @classmethod
+    def stop_browser(cls, crashed=False):
+        """Close the browser, keeping the asset cache statistics"""
+        if cls.assets:
+            stats = cls.assets.stats()
+            if cls.asset_stats:
+                stats = {key: stats[key] + cls.asset_stats[key] for key in stats}
+            cls.asset_stats = stats
+            cls.assets.close()
+        if cls.clock:
+            cls.clock.close()
+        browser.quit_driver(cls.driver, crashed)
+    
+    @classmethod
+    def recycle_browser(cls, test_name, reasons):
+        """Replace a degraded session with a fresh one, carrying the cookies over"""
+        start = time.monotonic()
+        cookies = browser_watchdog.save_state(cls.driver)
+        cls.stop_browser(crashed=True)
+        cls.start_browser()
+        cls.wait.driver = cls.driver
+        browser_watchdog.restore_state(cls.driver, cls.base_url, cookies)
+        cls.planner.driver = cls.driver
+        cls.planner.forget()
+        WATCHDOG.record_recycle(test_name, reasons, time.monotonic() - start)
+    
     @classmethod
     def setUpClass(cls):
         """Set up Chrome driver with headless options"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--remote-debugging-port=9222")
-
-        cls.driver = webdriver.Chrome(options=chrome_options)
-        cls.driver.implicitly_wait(10)
-        # Update this URL to match your EC2 instance
-        cls.base_url = "http://3.89.8.171/"  # Change to your EC2 public IP/domain
+        cls.start_browser()
+        cls.wait = Waiter(cls.driver)
         
         # Test data
-        cls.test_user = {
-            'name': 'Test User',
-            'email': f'testuser{random.randint(1000, 9999)}@example.com',
-            'password': 'testpassword123'
-        }
+        cls.test_user = dict(account_pool.new_account("testuser"), name='Test User')
+        cls.accounts = account_pool.AccountPool(cls.base_url)
+        cls.planner = planner.Planner(cls.driver, cls.wait, cls.base_url, cls.accounts)
     
     @classmethod
     def tearDownClass(cls):
         """Clean up - close the browser"""
-        cls.driver.quit()
+        PROFILER.finish()
+        cls.planner.release()
+        cls.stop_browser()
     
     def setUp(self):
-        """Navigate to home page and ensure clean state before each test"""
-        # First try to logout if logged in
-        try:
-            self.driver.get(f"{self.base_url}/logout.php")
-            time.sleep(1)
-        except:
-            pass
-        
-        # Navigate to home page
-        self.driver.get(self.base_url)
-        time.sleep(2)
+        """Bring the browser to the state the test requires (see planner.py)"""
+        self.wait.begin(self._testMethodName)
+        PROFILER.begin(self._testMethodName)
+        if StudentManagementSystemTests.time_to_first_test is None:
+            StudentManagementSystemTests.time_to_first_test = time.monotonic() - _PROCESS_START
+        # Swap in a fresh browser if this one has died or its memory, renderers or latency crept up
+        reasons = WATCHDOG.check(self.driver, self._testMethodName)
+        if reasons:
+            self.recycle_browser(self._testMethodName, reasons)
+        # A previous test may have left an alert open; it would block navigation
+        page = page_state.detect(self.driver)
+        if page.kind == page_state.ALERT:
+            self.driver.switch_to.alert.accept()
+            page = None
+        # Lean sessions block images and fonts unless the test needs full fidelity
+        browser.prepare_for_test(self.driver, getattr(self, self._testMethodName))
+        
+        # Skip the logout and home page loads when the previous test left them in place
+        self.account = self.planner.prepare(getattr(self, self._testMethodName), page)
+        if self.clock and virtual_time.wanted(getattr(self, self._testMethodName)):
+            self.wait.clock = self.clock
     
     def generate_random_email(self):
         """Generate a random email for testing"""
         random_string = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
         return f"test{random_string}@example.com"
     
+    @tier(STATIC)
+    @requires(LOGGED_OUT, preserves=True)
     def test_01_page_loads_successfully(self):
         """Test Case 1: Verify that the main page loads successfully"""
         self.driver.get(self.base_url)
@@ -71,42 +135,53 @@ class StudentManagementSystemTests(unittest.TestCase):
         
         print("✓ Test 1 Passed: Page loads successfully")
     
+    @tier(STATIC)
+    @requires(LOGGED_OUT, preserves=True)
     def test_02_registration_form_elements_present(self):
         """Test Case 2: Verify registration form elements are present"""
+        # Read the whole form structure in one round trip
+        page = page_snapshot.take(self.driver)
+        
         # Check if registration form exists
-        registration_form = self.driver.find_element(By.XPATH, "//form[@action='register.php']")
-        self.assertTrue(registration_form.is_displayed())
+        registration_form = page.form("register.php")
+        self.assertTrue(registration_form['displayed'])
         
         # Check form fields
-        name_field = self.driver.find_element(By.NAME, "name")
-        email_field = self.driver.find_element(By.NAME, "email")
-        password_field = self.driver.find_element(By.NAME, "password")
-        submit_button = self.driver.find_element(By.XPATH, "//form[@action='register.php']//button[@type='submit']")
+        name_field = page.field("name")
+        email_field = page.field("email")
+        password_field = page.field("password")
+        submit_button = page.submit_button("register.php")
         
-        self.assertTrue(name_field.is_displayed())
-        self.assertTrue(email_field.is_displayed())
-        self.assertTrue(password_field.is_displayed())
-        self.assertTrue(submit_button.is_displayed())
+        self.assertTrue(name_field['displayed'])
+        self.assertTrue(email_field['displayed'])
+        self.assertTrue(password_field['displayed'])
+        self.assertTrue(submit_button['displayed'])
         
         print("✓ Test 2 Passed: Registration form elements are present")
     
+    @tier(STATIC)
+    @requires(LOGGED_OUT, preserves=True)
     def test_03_login_form_elements_present(self):
         """Test Case 3: Verify login form elements are present"""
+        # Read the whole form structure in one round trip
+        page = page_snapshot.take(self.driver)
+        
         # Check if login form exists
-        login_form = self.driver.find_element(By.XPATH, "//form[@action='login.php']")
-        self.assertTrue(login_form.is_displayed())
+        login_form = page.form("login.php")
+        self.assertTrue(login_form['displayed'])
         
         # Check form fields
-        email_field = self.driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='email']")
-        password_field = self.driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='password']")
-        submit_button = self.driver.find_element(By.XPATH, "//form[@action='login.php']//button[@type='submit']")
+        email_field = page.field("email", form="login.php")
+        password_field = page.field("password", form="login.php")
+        submit_button = page.submit_button("login.php")
         
-        self.assertTrue(email_field.is_displayed())
-        self.assertTrue(password_field.is_displayed())
-        self.assertTrue(submit_button.is_displayed())
+        self.assertTrue(email_field['displayed'])
+        self.assertTrue(password_field['displayed'])
+        self.assertTrue(submit_button['displayed'])
         
         print("✓ Test 3 Passed: Login form elements are present")
     
+    @virtual_time.fast_forward
     def test_04_successful_user_registration(self):
         """Test Case 4: Test successful user registration"""
         # Generate unique email for this test
@@ -122,17 +197,17 @@ class StudentManagementSystemTests(unittest.TestCase):
         password_field.send_keys("testpass123")
         
         # Submit form
+        registration_form = self.driver.find_element(By.XPATH, "//form[@action='register.php']")
         submit_button = self.driver.find_element(By.XPATH, "//form[@action='register.php']//button[@type='submit']")
         submit_button.click()
         
         # Wait for page to process the registration
-        time.sleep(3)
+        self.wait.for_submission(registration_form, timeout=3, raise_on_timeout=False)
         
         # Check if redirected to index page or if alert was handled
         try:
             # Try to find alert and handle it
-            WebDriverWait(self.driver, 5).until(EC.alert_is_present())
-            alert = self.driver.switch_to.alert
+            alert = self.wait.for_alert(timeout=5)
             alert_text = alert.text
             alert.accept()
             self.assertIn("Registration successful", alert_text)
@@ -155,16 +230,20 @@ class StudentManagementSystemTests(unittest.TestCase):
     def test_05_registration_with_invalid_email(self):
         """Test Case 5: Test registration with invalid email format"""
         # Check if registration form is present (user not logged in)
+        if not page_state.detect(self.driver).has_registration_form:
+            print("✓ Test 5 Skipped: User already logged in, registration form not available")
+            return
+        
         try:
             # Wait for elements to be interactable
-            name_field = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.NAME, "name"))
+            name_field = self.wait.until(
+                "name clickable", EC.element_to_be_clickable((By.NAME, "name")), timeout=10
             )
-            email_field = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.NAME, "email"))
+            email_field = self.wait.until(
+                "email clickable", EC.element_to_be_clickable((By.NAME, "email")), timeout=10
             )
-            password_field = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.NAME, "password"))
+            password_field = self.wait.until(
+                "password clickable", EC.element_to_be_clickable((By.NAME, "password")), timeout=10
             )
             
             # Clear fields first
@@ -178,11 +257,12 @@ class StudentManagementSystemTests(unittest.TestCase):
             password_field.send_keys("testpass123")
             
             # Submit form
+            registration_form = self.driver.find_element(By.XPATH, "//form[@action='register.php']")
             submit_button = self.driver.find_element(By.XPATH, "//form[@action='register.php']//button[@type='submit']")
             submit_button.click()
             
             # Wait for response
-            time.sleep(3)
+            self.wait.for_submission(registration_form, timeout=3, raise_on_timeout=False)
             
             # Check if HTML5 validation prevented submission or server handled it
             current_url = self.driver.current_url
@@ -198,40 +278,38 @@ class StudentManagementSystemTests(unittest.TestCase):
             self.assertTrue(validation_worked)
             print("✓ Test 5 Passed: Invalid email format handled correctly")
             
-        except NoSuchElementException:
-            print("✓ Test 5 Skipped: User already logged in, registration form not available")
-            self.assertTrue(True)  # Pass the test as user is logged in
         except TimeoutException:
             print("✓ Test 5 Skipped: Elements not interactable, user might be logged in")
             self.assertTrue(True)  # Pass the test
     
     def test_06_empty_registration_fields(self):
         """Test Case 6: Test registration with empty required fields"""
-        try:
-            # Try to submit empty form
-            submit_button = self.driver.find_element(By.XPATH, "//form[@action='register.php']//button[@type='submit']")
-            submit_button.click()
-            
-            # Check if still on the same page (validation should prevent submission)
-            time.sleep(2)
-            current_url = self.driver.current_url
-            page_source = self.driver.page_source
-            
-            # Check if validation worked - either stayed on page or has registration form
-            validation_worked = (
-                current_url.endswith("/") or 
-                "index.php" in current_url or 
-                "Student Management System" in page_source or
-                "Register" in page_source
-            )
-            
-            self.assertTrue(validation_worked)
-            print("✓ Test 6 Passed: Empty registration fields validation works")
-            
-        except NoSuchElementException:
+        if not page_state.detect(self.driver).has_registration_form:
             print("✓ Test 6 Skipped: User already logged in, registration form not available")
-            self.assertTrue(True)  # Pass the test as user is logged in
+            return
+        
+        # Try to submit empty form
+        registration_form = self.driver.find_element(By.XPATH, "//form[@action='register.php']")
+        submit_button = self.driver.find_element(By.XPATH, "//form[@action='register.php']//button[@type='submit']")
+        submit_button.click()
+        
+        # Check if still on the same page (validation should prevent submission)
+        self.wait.for_submission(registration_form, timeout=2, raise_on_timeout=False)
+        current_url = self.driver.current_url
+        page_source = self.driver.page_source
+        
+        # Check if validation worked - either stayed on page or has registration form
+        validation_worked = (
+            current_url.endswith("/") or 
+            "index.php" in current_url or 
+            "Student Management System" in page_source or
+            "Register" in page_source
+        )
+        
+        self.assertTrue(validation_worked)
+        print("✓ Test 6 Passed: Empty registration fields validation works")
     
+    @virtual_time.fast_forward
     def test_07_login_with_nonexistent_user(self):
         """Test Case 7: Test login with non-existent user credentials"""
         # Fill login form with non-existent user
@@ -247,8 +325,7 @@ class StudentManagementSystemTests(unittest.TestCase):
         
         # Wait for alert
         try:
-            WebDriverWait(self.driver, 10).until(EC.alert_is_present())
-            alert = self.driver.switch_to.alert
+            alert = self.wait.for_alert(timeout=10)
             alert_text = alert.text
             alert.accept()
             
@@ -257,6 +334,7 @@ class StudentManagementSystemTests(unittest.TestCase):
         except TimeoutException:
             print("✓ Test 7 Passed: Login validation works (no alert shown)")
     
+    @virtual_time.fast_forward
     def test_08_complete_user_journey_registration_and_login(self):
         """Test Case 8: Complete user journey - Registration followed by Login"""
         # Generate unique email for this test
@@ -277,14 +355,13 @@ class StudentManagementSystemTests(unittest.TestCase):
         
         # Handle registration alert if present
         try:
-            WebDriverWait(self.driver, 5).until(EC.alert_is_present())
-            alert = self.driver.switch_to.alert
+            alert = self.wait.for_alert(timeout=5)
             alert.accept()
         except TimeoutException:
             pass
         
         # Step 2: Login with the registered user
-        time.sleep(2)
+        self.wait.for_page_ready(timeout=2, raise_on_timeout=False)
         self.driver.get(self.base_url)  # Go back to main page
         
         email_field = self.driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='email']")
@@ -298,108 +375,63 @@ class StudentManagementSystemTests(unittest.TestCase):
         
         # Handle login alert if present
         try:
-            WebDriverWait(self.driver, 5).until(EC.alert_is_present())
-            alert = self.driver.switch_to.alert
+            alert = self.wait.for_alert(timeout=5)
             alert.accept()
         except TimeoutException:
             pass
         
         # Check if redirected to enrollment page or logged in
-        time.sleep(3)
+        self.wait.for_url_contains("enroll.php", timeout=3, raise_on_timeout=False)
+        self.wait.for_page_ready(timeout=3, raise_on_timeout=False)
         current_url = self.driver.current_url
         self.assertTrue("enroll.php" in current_url or "Welcome" in self.driver.page_source)
         
         print("✓ Test 8 Passed: Complete user journey successful")
     
+    @requires(LOGGED_IN)
+    @virtual_time.fast_forward
     def test_09_logout_functionality(self):
         """Test Case 9: Test logout functionality"""
-        # First, we need to ensure we have a user to login
-        test_email = self.generate_random_email()
+        # setUp has logged in with an account leased from the pool
         
-        try:
-            # Quick registration
-            name_field = self.driver.find_element(By.NAME, "name")
-            email_field = self.driver.find_element(By.NAME, "email")
-            password_field = self.driver.find_element(By.NAME, "password")
-            
-            name_field.send_keys("Logout Test User")
-            email_field.send_keys(test_email)
-            password_field.send_keys("logout123")
-            
-            submit_button = self.driver.find_element(By.XPATH, "//form[@action='register.php']//button[@type='submit']")
-            submit_button.click()
-            
-            # Handle alert
-            try:
-                WebDriverWait(self.driver, 5).until(EC.alert_is_present())
-                alert = self.driver.switch_to.alert
-                alert.accept()
-            except TimeoutException:
-                pass
-            
-            # Login
-            time.sleep(2)
-            self.driver.get(self.base_url)
-            
-            # Check if login form is available (might be logged in already)
-            try:
-                email_field = self.driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='email']")
-                password_field = self.driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='password']")
-                
-                email_field.send_keys(test_email)
-                password_field.send_keys("logout123")
-                
-                submit_button = self.driver.find_element(By.XPATH, "//form[@action='login.php']//button[@type='submit']")
-                submit_button.click()
-                
-                # Handle login alert
-                try:
-                    WebDriverWait(self.driver, 5).until(EC.alert_is_present())
-                    alert = self.driver.switch_to.alert
-                    alert.accept()
-                except TimeoutException:
-                    pass
-                
-                time.sleep(3)
-            except NoSuchElementException:
-                # User might already be logged in
-                pass
-            
-            # Now test logout
-            try:
-                logout_button = self.driver.find_element(By.XPATH, "//form[@action='logout.php']//button")
-                logout_button.click()
-                
-                time.sleep(2)
-                # Check if redirected back to main page with login/register forms
-                page_source = self.driver.page_source
-                logout_successful = (
-                    "Register" in page_source or 
-                    "Login" in page_source or
-                    "Student Management System" in page_source
-                )
-                
-                self.assertTrue(logout_successful)
-                print("✓ Test 9 Passed: Logout functionality works")
-                
-            except NoSuchElementException:
-                print("✓ Test 9 Skipped: User not logged in or logout button not found")
-                self.assertTrue(True)  # Pass the test
-                
-        except NoSuchElementException:
-            print("✓ Test 9 Skipped: Registration form not available, user might be logged in")
-            self.assertTrue(True)  # Pass the test
+        # Now test logout
+        if not page_state.detect(self.driver).logged_in:
+            print("✓ Test 9 Skipped: User not logged in or logout button not found")
+            return
+        
+        logout_button = self.driver.find_element(By.XPATH, "//form[@action='logout.php']//button")
+        page_root = self.driver.find_element(By.TAG_NAME, "html")
+        logout_button.click()
+        
+        self.wait.for_navigation(page_root, timeout=2, raise_on_timeout=False)
+        # Check if redirected back to main page with login/register forms
+        page_source = self.driver.page_source
+        logout_successful = (
+            "Register" in page_source or 
+            "Login" in page_source or
+            "Student Management System" in page_source
+        )
+        
+        self.assertTrue(logout_successful)
+        print("✓ Test 9 Passed: Logout functionality works")
     
+    @requires(ANY)
     def test_10_enrollment_page_access_without_login(self):
         """Test Case 10: Test accessing enrollment page without login (should redirect)"""
         # Ensure we're logged out first
         self.driver.get(f"{self.base_url}/logout.php")
-        time.sleep(1)
+        self.wait.for_page_ready(timeout=1, raise_on_timeout=False)
         
         # Try to access enrollment page directly without login
         self.driver.get(f"{self.base_url}/enroll.php")
         
-        time.sleep(2)
+        # Wait for the redirect away from enroll.php, or for the forms to render in place
+        self.wait.until(
+            "enroll.php redirect",
+            lambda driver: "enroll.php" not in driver.current_url
+            or driver.execute_script("return !!document.querySelector(\"form[action='login.php']\")"),
+            timeout=2, raise_on_timeout=False)
+        self.wait.for_page_ready(timeout=2, raise_on_timeout=False)
         current_url = self.driver.current_url
         page_source = self.driver.page_source
         
@@ -415,44 +447,51 @@ class StudentManagementSystemTests(unittest.TestCase):
         self.assertTrue(redirect_worked)
         print("✓ Test 10 Passed: Enrollment page properly protected from unauthorized access")
     
+    @tier(STATIC)
+    @requires(LOGGED_OUT, preserves=True)
     def test_11_password_field_security(self):
         """Test Case 11: Verify password fields are properly masked"""
-        try:
-            # Check registration password field
-            reg_password_field = self.driver.find_element(By.XPATH, "//form[@action='register.php']//input[@name='password']")
-            self.assertEqual(reg_password_field.get_attribute("type"), "password")
-            
-            # Check login password field
-            login_password_field = self.driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='password']")
-            self.assertEqual(login_password_field.get_attribute("type"), "password")
-            
-            print("✓ Test 11 Passed: Password fields are properly secured")
-            
-        except NoSuchElementException:
+        if not page_state.detect(self.driver).logged_out:
             print("✓ Test 11 Skipped: User already logged in, password fields not visible")
-            self.assertTrue(True)  # Pass the test as user is logged in
+            return
+        
+        # Check registration password field
+        reg_password_field = self.driver.find_element(By.XPATH, "//form[@action='register.php']//input[@name='password']")
+        self.assertEqual(reg_password_field.get_attribute("type"), "password")
+        
+        # Check login password field
+        login_password_field = self.driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='password']")
+        self.assertEqual(login_password_field.get_attribute("type"), "password")
+        
+        print("✓ Test 11 Passed: Password fields are properly secured")
     
+    @tier(STATIC)
+    @requires(LOGGED_OUT, preserves=True)
     def test_12_form_input_validation(self):
         """Test Case 12: Test HTML5 form validation attributes"""
-        try:
-            # Check required attributes
-            name_field = self.driver.find_element(By.NAME, "name")
-            email_field = self.driver.find_element(By.NAME, "email")
-            password_field = self.driver.find_element(By.NAME, "password")
-            
-            self.assertTrue(name_field.get_attribute("required"))
-            self.assertTrue(email_field.get_attribute("required"))
-            self.assertTrue(password_field.get_attribute("required"))
-            
-            # Check email field type
-            self.assertEqual(email_field.get_attribute("type"), "email")
-            
-            print("✓ Test 12 Passed: Form validation attributes are correct")
-            
-        except NoSuchElementException:
+        if not page_state.detect(self.driver).logged_out:
             print("✓ Test 12 Skipped: User already logged in, form fields not visible")
-            self.assertTrue(True)  # Pass the test as user is logged in
+            return
+        
+        page = page_snapshot.take(self.driver)
+        
+        # Check required attributes
+        name_field = page.field("name")
+        email_field = page.field("email")
+        password_field = page.field("password")
+        
+        self.assertTrue(name_field['required'])
+        self.assertTrue(email_field['required'])
+        self.assertTrue(password_field['required'])
+        
+        # Check email field type
+        self.assertEqual(email_field['type'], "email")
+        
+        print("✓ Test 12 Passed: Form validation attributes are correct")
     
+    @tier(STATIC)
+    @requires(LOGGED_OUT, preserves=True)
+    @browser.full_fidelity
     def test_13_responsive_design_elements(self):
         """Test Case 13: Test responsive design elements"""
         # Check if Bootstrap classes are present
@@ -486,53 +525,37 @@ class StudentManagementSystemTests(unittest.TestCase):
         
         print("✓ Test 13 Passed: Responsive design elements are present")
     
+    @tier(STATIC)
+    @requires(LOGGED_OUT, preserves=True)
     def test_14_page_navigation_and_links(self):
         """Test Case 14: Test page navigation and external resource links"""
-        # Check if Bootstrap CSS is loaded
-        stylesheets = self.driver.find_elements(By.TAG_NAME, "link")
-        bootstrap_css_found = False
-        
-        for stylesheet in stylesheets:
-            href = stylesheet.get_attribute("href")
-            if href and "bootstrap" in href:
-                bootstrap_css_found = True
-                break
+        # Collect every stylesheet and script URL in one round trip
+        page = page_snapshot.take(self.driver)
         
+        # Check if Bootstrap CSS is loaded
+        bootstrap_css_found = any("bootstrap" in href for href in page.stylesheets if href)
         self.assertTrue(bootstrap_css_found, "Bootstrap CSS should be loaded")
         
         # Check if Bootstrap JS is loaded
-        scripts = self.driver.find_elements(By.TAG_NAME, "script")
-        bootstrap_js_found = False
-        
-        for script in scripts:
-            src = script.get_attribute("src")
-            if src and "bootstrap" in src:
-                bootstrap_js_found = True
-                break
-        
+        bootstrap_js_found = any("bootstrap" in src for src in page.scripts if src)
         self.assertTrue(bootstrap_js_found, "Bootstrap JS should be loaded")
         
         print("✓ Test 14 Passed: Page navigation and external resources work correctly")
 
 if __name__ == "__main__":
+    from runner import TimedResult, print_summary, report_profile
+
     # Create test suite
     print("Starting Student Management System Test Suite...")
     print("=" * 60)
     
-    # Run tests
-    result = unittest.main(verbosity=2, exit=False)
+    # Run tests, streaming each result (and failure artifacts) as it completes
+    result = unittest.main(exit=False, testRunner=unittest.TextTestRunner(verbosity=2, resultclass=TimedResult))
     
     # Print summary
-    print("\n" + "=" * 60)
-    print("TEST SUMMARY:")
-    print(f"Tests run: {result.result.testsRun}")
-    print(f"Failures: {len(result.result.failures)}")
-    print(f"Errors: {len(result.result.errors)}")
-    print(f"Skipped: {len(result.result.skipped)}")
-
-    if len(result.result.failures) == 0 and len(result.result.errors) == 0:
-        print("🎉 ALL TESTS PASSED!")
-    else:
-        print("⚠️  Some tests failed - check the detailed output above")
-    
-    print("=" * 60)
+    waiter = getattr(StudentManagementSystemTests, "wait", None)
+    print_summary(result.result, waiter.records if waiter else [],
+                  StudentManagementSystemTests.time_to_first_test,
+                  StudentManagementSystemTests.asset_stats)
+    if PROFILER.enabled:
+        report_profile([PROFILER.drain()], config.PROFILE)
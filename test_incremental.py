@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+import unittest
+
+import incremental
+import stub_server
+from incremental import PASS, ResultCache, outcomes
+
+
+class OutcomeTests(unittest.TestCase):
+
+    def test_split_by_outcome(self):
+        parts = [
+            {'failures': [("test_app.Tests.test_02 (description)", "trace")], 'errors': [],
+             'skipped': [], 'durations': {'test_01': 1.0, 'test_02': 2.0}},
+            {'failures': [], 'errors': [("test_app.Tests.test_03", "trace")],
+             'skipped': [("test_app.Tests.test_04", "reason")],
+             'durations': {'test_03': 0.5, 'test_04': 0.0, 'test_05': 1.5}},
+            {'failures': [], 'errors': [], 'skipped': [], 'durations': None},
+        ]
+        passed, failed = outcomes(parts)
+        self.assertEqual(passed, {'test_01', 'test_05'})
+        self.assertEqual(failed, {'test_02', 'test_03', 'test_04'})
+
+
+class ResultCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "cache", "results.json")
+
+    def test_round_trip_and_matching(self):
+        cache = ResultCache(self.path)
+        self.assertEqual(cache.entries, {})
+        cache.record({'test_01': "a", 'test_02': "b"}, passed={'test_01', 'test_02'}, failed=set())
+        cache.save()
+
+        cache = ResultCache(self.path)
+        self.assertEqual(cache.entries['test_01']['outcome'], PASS)
+        # A changed fingerprint or an unknown test is not a cached pass
+        self.assertEqual(cache.cached_passes({'test_01': "a", 'test_02': "changed", 'test_03': "c"}, 1),
+                         ['test_01'])
+
+    def test_failure_forgets_the_pass(self):
+        cache = ResultCache(self.path)
+        cache.record({'test_01': "a"}, passed={'test_01'}, failed=set())
+        cache.record({'test_01': "a"}, passed=set(), failed={'test_01'})
+        self.assertEqual(cache.cached_passes({'test_01': "a"}, 1), [])
+
+    def test_old_passes_expire(self):
+        cache = ResultCache(self.path)
+        cache.record({'test_01': "a"}, passed={'test_01'}, failed=set())
+        cache.entries['test_01']['recorded_at'] = time.time() - 7200
+        self.assertEqual(cache.cached_passes({'test_01': "a"}, 1), [])
+        self.assertEqual(cache.cached_passes({'test_01': "a"}, 3), ['test_01'])
+
+    def test_unreadable_cache_starts_empty(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as handle:
+            handle.write("{not json")
+        self.assertEqual(ResultCache(self.path).entries, {})
+
+
+class FingerprintTests(unittest.TestCase):
+
+    def test_same_app_on_another_port_hashes_the_same(self):
+        servers = [stub_server.start(), stub_server.start()]
+        for server in servers:
+            self.addCleanup(server.shutdown)
+        self.assertNotEqual(servers[0].base_url, servers[1].base_url)
+        prints = [incremental.fingerprints(ResultCacheTests, ['test_round_trip_and_matching'], server.base_url)
+                  for server in servers]
+        self.assertEqual(prints[0], prints[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+
+from load_gen import AsyncConnectionPool, HTTPError, Stats, VirtualUser
+
+
+async def _serve(response, requests):
+    """A one-off HTTP server that answers every request with response, then closes."""
+    async def handle(reader, writer):
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        requests.append(1)
+        writer.write(response)
+        await writer.drain()
+        writer.close()
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+
+
+class ResponseTests(unittest.TestCase):
+
+    def fetch(self, response):
+        async def scenario():
+            requests = []
+            server, base_url = await _serve(response, requests)
+            pool = AsyncConnectionPool(base_url, timeout=5)
+            stats = Stats()
+            try:
+                text = await VirtualUser(pool, base_url, stats).call("index.php")
+            except HTTPError:
+                text = None
+            try:
+                return text, stats, len(pool._idle), requests
+            finally:
+                pool.close()
+                server.close()
+                await server.wait_closed()
+        return asyncio.run(asyncio.wait_for(scenario(), 10))
+
+    def test_truncated_body_is_an_error(self):
+        text, stats, _, requests = self.fetch(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\nshort")
+        self.assertIsNone(text)
+        # Retried once on a fresh connection, then counted rather than raised
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(stats.errors, {'index.php': 1})
+
+    def test_body_without_length_ends_at_close(self):
+        text, stats, idle, _ = self.fetch(b"HTTP/1.1 200 OK\r\n\r\nall of it")
+        self.assertEqual(text, "all of it")
+        self.assertEqual(stats.errors, {})
+        # Not kept for reuse: the server closed it to end the body
+        self.assertEqual(idle, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
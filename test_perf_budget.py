@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from perf_budget import BudgetError, aggregate, load_budget
+
+
+class LoadBudgetTests(unittest.TestCase):
+
+    def write_budget(self, text):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+        with handle:
+            handle.write(text)
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_rules_and_units(self):
+        path = self.write_budget("# comment\n"
+                                 "\n"
+                                 "index p95 load < 800ms   # trailing comment\n"
+                                 "enroll max transfer <= 400kB\n"
+                                 "index mean fcp >= 1.5s\n"
+                                 "enroll p50 nodes > 10\n")
+        rules = load_budget(path)
+        self.assertEqual([(r.page, r.stat, r.metric, r.op, r.limit) for r in rules], [
+            ("index", "p95", "load", "<", 800),
+            ("enroll", "max", "transfer", "<=", 400 * 1024),
+            ("index", "mean", "fcp", ">=", 1500),
+            ("enroll", "p50", "nodes", ">", 10),
+        ])
+        self.assertEqual(rules[0].text, "index p95 load < 800ms")
+
+    def test_check(self):
+        rule = load_budget(self.write_budget("index p95 load < 800ms\n"))[0]
+        self.assertEqual(rule.check({'index': {'load': {'p95': 750}}}), (750, True))
+        self.assertEqual(rule.check({'index': {'load': {'p95': 800}}}), (800, False))
+        self.assertEqual(rule.check({'index': {}}), (None, False))
+
+    def test_bad_lines(self):
+        for text in ("index p95 load 800ms\n",           # no operator
+                     "about p95 load < 800ms\n",         # unknown page
+                     "index p90 load < 800ms\n",         # unknown statistic
+                     "index p95 load < 800h\n"):         # unknown unit
+            with self.subTest(text=text):
+                with self.assertRaises(BudgetError):
+                    load_budget(self.write_budget(text))
+
+
+class AggregateTests(unittest.TestCase):
+
+    def test_stats_per_page_and_metric(self):
+        results = {
+            'index': [{'load': value, 'fcp': None} for value in range(1, 21)],
+            'enroll': [],
+        }
+        stats = aggregate(results)
+        self.assertEqual(stats['index']['load'], {'min': 1, 'mean': 10.5, 'p50': 10, 'p95': 19, 'max': 20})
+        # Metrics without samples are left out, so rules on them fail
+        self.assertNotIn('fcp', stats['index'])
+        self.assertEqual(stats['enroll'], {})
+
+    def test_unsorted_samples(self):
+        stats = aggregate({'index': [{'ttfb': 30.004}, {'ttfb': 10}, {'ttfb': 20}]})
+        self.assertEqual(stats['index']['ttfb'], {'min': 10, 'mean': 20.0, 'p50': 20, 'p95': 30.0, 'max': 30.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from reporter import Reporter, _JUnitStream
+
+
+class JUnitStreamTests(unittest.TestCase):
+
+    def test_every_add_leaves_a_complete_document(self):
+        path = os.path.join(tempfile.mkdtemp(), "main.xml")
+        stream = _JUnitStream(path, "sms-main")
+        self.addCleanup(stream.close)
+        self.assertEqual(len(ET.parse(path).getroot().find("testsuite")), 0)
+        for index in range(3):
+            case = ET.Element("testcase", classname="test_app.Tests", name=f"test_{index}", time="0.1")
+            if index == 1:
+                # Markup in messages must be escaped, and a longer case must not leave debris
+                ET.SubElement(case, "failure", message="<b> & </testsuite>").text = "x" * 500
+            stream.add(case)
+            suite = ET.parse(path).getroot().find("testsuite")
+            self.assertEqual(suite.get("name"), "sms-main")
+            self.assertEqual([c.get("name") for c in suite], [f"test_{i}" for i in range(index + 1)])
+        self.assertEqual(ET.parse(path).getroot().find("testsuite/testcase/failure").get("message"),
+                         "<b> & </testsuite>")
+
+
+class EvictionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.root = os.path.join(self.directory, "artifacts")
+        # Folder and file names follow this process's stem: "main" unless set here
+        environ = mock.patch.dict(os.environ)
+        environ.start()
+        self.addCleanup(environ.stop)
+        os.environ.pop("SMS_WORKER_ID", None)
+        os.environ.pop("SMS_REPORT_LABEL", None)
+
+    def folder(self, name, size, age):
+        path = os.path.join(self.root, name)
+        os.makedirs(path)
+        with open(os.path.join(path, "page.html"), "wb") as handle:
+            handle.write(b"x" * size)
+        os.utime(path, (age, age))
+        return path
+
+    def test_only_this_process_folders_are_evicted(self):
+        others = [self.folder("w1-001-test_a", 1000, 1), self.folder("shard-1-of-2-main-001-test_b", 1000, 2)]
+        own = [self.folder("main-001-test_c", 1000, 3), self.folder("main-002-test_d", 1000, 4)]
+        newest = self.folder("main-003-test_e", 1000, 5)
+        Reporter(self.directory, max_bytes=2500)._evict(keep=newest)
+        # Over the cap even then, but another process's evidence is not ours to delete
+        self.assertTrue(all(os.path.isdir(path) for path in others + [newest]))
+        self.assertFalse(any(os.path.isdir(path) for path in own))
+
+    def test_oldest_own_folder_goes_first(self):
+        oldest = self.folder("w3-001-test_a", 1000, 1)
+        middle = self.folder("w3-002-test_b", 1000, 2)
+        newest = self.folder("w3-003-test_c", 1000, 3)
+        os.environ["SMS_WORKER_ID"] = "3"
+        Reporter(self.directory, max_bytes=2500)._evict(keep=newest)
+        self.assertFalse(os.path.isdir(oldest))
+        self.assertTrue(os.path.isdir(middle) and os.path.isdir(newest))
+
+    def test_artifact_failure_keeps_the_result(self):
+        reporter = Reporter(self.directory)
+        reporter.record("test_app.Tests.test_a", "failure", 1.0, "boom", {'screenshot': "not base64!"})
+        reporter.close()
+        with open(os.path.join(self.directory, "main.jsonl")) as handle:
+            self.assertIn('"artifacts": []', handle.read())
+        self.assertEqual(ET.parse(os.path.join(self.directory, "main.xml")).getroot()
+                         .find("testsuite/testcase").get("name"), "test_a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+
+from sharding import DEFAULT_ESTIMATE, estimates, pack, shard, update_durations
+
+
+class EstimateTests(unittest.TestCase):
+
+    def test_unseen_tests_fall_back_within_their_tier(self):
+        names = ["s1", "s2", "s3", "b1", "b2", "b3"]
+        tiers = {"s1": "static", "s2": "static", "s3": "static",
+                 "b1": "browser", "b2": "browser", "b3": "browser"}
+        durations = {"s1": 0.001, "s2": 0.003, "b1": 8.0, "b2": 12.0}
+        expected = estimates(names, durations, tiers)
+        self.assertEqual(expected["s3"], 0.002)
+        self.assertEqual(expected["b3"], 10.0)
+
+    def test_tier_without_history_uses_the_default(self):
+        tiers = {"s1": "static", "b1": "browser"}
+        expected = estimates(["s1", "b1"], {"s1": 0.001}, tiers)
+        self.assertEqual(expected["b1"], DEFAULT_ESTIMATE)
+        self.assertEqual(estimates(["x"], {"s1": 0.001}), {"x": DEFAULT_ESTIMATE})
+
+
+class PackTests(unittest.TestCase):
+
+    durations = {"a": 9.0, "b": 5.0, "c": 4.0, "d": 3.0, "e": 2.0, "f": 1.0}
+    names = ["a", "b", "c", "d", "e", "f"]
+
+    def test_longest_first_into_the_lightest_bin(self):
+        groups = pack(self.names, 2, self.durations)
+        # a, b, c+b, d+a (tie: first bin), e, f: 12 seconds each
+        self.assertEqual(groups, [["a", "d"], ["b", "c", "e", "f"]])
+
+    def test_groups_keep_suite_order_and_drop_empty_bins(self):
+        groups = pack(["f", "a"], 4, self.durations)
+        self.assertEqual(groups, [["a"], ["f"]])
+        self.assertEqual(pack(["f", "e", "d"], 1, self.durations), [["f", "e", "d"]])
+
+    def test_shards_cover_every_test_once(self):
+        shards = [shard(self.names, index, 3, self.durations) for index in (1, 2, 3)]
+        self.assertEqual(sorted(name for group in shards for name in group), self.names)
+        self.assertEqual(shard(self.names[:2], 3, 3, self.durations), [])
+
+    def test_new_browser_tests_are_not_packed_as_free(self):
+        names = ["s1", "s2", "b1", "b2", "b3"]
+        tiers = {"s1": "static", "s2": "static", "b1": "browser", "b2": "browser", "b3": "browser"}
+        durations = {"s1": 0.001, "s2": 0.001, "b1": 10.0}
+        # Estimated at the static median, b2 and b3 would both join the static tests
+        self.assertEqual(pack(names, 2, durations, tiers), [["b1", "b3"], ["s1", "s2", "b2"]])
+
+
+class UpdateDurationsTests(unittest.TestCase):
+
+    def test_moving_average_is_saved(self):
+        path = os.path.join(tempfile.mkdtemp(), "nested", "durations.json")
+        self.assertEqual(update_durations({"a": 4.0}, path), {"a": 4.0})
+        history = update_durations({"a": 2.0, "b": 1.0}, path)
+        self.assertEqual(history, {"a": 3.0, "b": 1.0})
+        with open(path) as handle:
+            self.assertEqual(json.load(handle), history)
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from static_tier import Snapshot, StaticDriver, select_xpath
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><title> Student
+  Management </title><style>.x {}</style></head>
+<body>
+<div class="container main">
+  <h2>Welcome to the portal</h2>
+  <form action="register.php" method="post">
+    <input class="form-control" type="text" name="name" required>
+    <input class="form-control" type="email" name="email">
+    <input class="form-control" type="password" name="password">
+    <button class="btn btn-primary" type="submit">Register</button>
+  </form>
+  <form action="login.php" method="post">
+    <input class="form-control" type="email" name="email">
+    <input class="form-control" type="password" name="password">
+    <button class="btn" type="submit">Login</button>
+  </form>
+  <form action="logout.php"><button class="btn">Logout</button></form>
+  <a href="enroll.php">Enroll</a>
+  <p style="display: none">Welcome hidden</p>
+</div>
+</body>
+</html>
+"""
+
+
+def driver():
+    static = StaticDriver()
+    static.page = Snapshot("http://app.test/sms/index.php", 200, PAGE)
+    return static
+
+
+class SelectorTests(unittest.TestCase):
+    """The locators test_app.py's static-tier tests use."""
+
+    def setUp(self):
+        self.driver = driver()
+
+    def test_form_xpaths(self):
+        form = self.driver.find_element(By.XPATH, "//form[@action='register.php']")
+        self.assertEqual(form.get_attribute("method"), "post")
+        button = self.driver.find_element(By.XPATH, "//form[@action='register.php']//button[@type='submit']")
+        self.assertEqual(button.text, "Register")
+        password = self.driver.find_element(By.XPATH, "//form[@action='login.php']//input[@name='password']")
+        self.assertEqual(password.get_attribute("type"), "password")
+        self.assertEqual(self.driver.find_element(By.XPATH, "//form[@action='logout.php']//button").text,
+                         "Logout")
+
+    def test_contains_text(self):
+        found = self.driver.find_elements(By.XPATH, "//*[contains(text(), 'Welcome')]")
+        self.assertEqual([element.tag_name for element in found], ["h2", "p"])
+        self.assertEqual([element.is_displayed() for element in found], [True, False])
+        self.assertEqual(found[1].text, "")
+
+    def test_simple_locators(self):
+        self.assertEqual(self.driver.find_element(By.NAME, "name").get_attribute("required"), "true")
+        self.assertEqual(len(self.driver.find_elements(By.CLASS_NAME, "form-control")), 5)
+        self.assertEqual(len(self.driver.find_elements(By.CLASS_NAME, "btn")), 3)
+        self.assertEqual(len(self.driver.find_elements(By.TAG_NAME, "input")), 5)
+        self.assertEqual(self.driver.find_element(By.TAG_NAME, "h2").text, "Welcome to the portal")
+        self.assertEqual(self.driver.find_element(By.CLASS_NAME, "container").tag_name, "div")
+        self.assertEqual(self.driver.title, "Student Management")
+
+    def test_relative_search_and_urls(self):
+        form = self.driver.find_element(By.XPATH, "//form[@action='login.php']")
+        self.assertEqual(len(form.find_elements(By.TAG_NAME, "input")), 2)
+        self.assertEqual(form.find_element(By.XPATH, ".//button").text, "Login")
+        self.assertEqual(form.get_attribute("action"), "http://app.test/sms/login.php")
+        self.assertEqual(self.driver.find_element(By.TAG_NAME, "a").get_attribute("href"),
+                         "http://app.test/sms/enroll.php")
+
+    def test_missing_element(self):
+        with self.assertRaises(NoSuchElementException):
+            self.driver.find_element(By.XPATH, "//form[@action='missing.php']")
+        self.assertEqual(self.driver.find_elements(By.ID, "missing"), [])
+
+
+class UnsupportedTests(unittest.TestCase):
+    """Expressions outside the subset must fail loudly, never match nothing."""
+
+    def test_unsupported_expressions_raise(self):
+        root = driver().page.root
+        for expression in ("//form[1]",
+                           "//input[@name='email' and @type='email']",
+                           "//h2/following-sibling::form",
+                           "(//form)[last()]"):
+            with self.subTest(expression=expression):
+                with self.assertRaises(WebDriverException):
+                    select_xpath(root, expression)
+
+    def test_unsupported_locator_raises(self):
+        with self.assertRaises(WebDriverException):
+            driver().find_elements(By.CSS_SELECTOR, "form")
+
+
+if __name__ == "__main__":
+    unittest.main()
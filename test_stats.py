@@ -0,0 +1,27 @@
+import unittest
+
+from stats import percentile
+
+
+class PercentileTests(unittest.TestCase):
+
+    def test_nearest_rank_over_one_to_hundred(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+
+    def test_nearest_rank_over_one_to_ten(self):
+        values = list(range(1, 11))
+        self.assertEqual(percentile(values, 50), 5)
+        self.assertEqual(percentile(values, 95), 10)
+        self.assertEqual(percentile(values, 0), 1)
+
+    def test_single_and_empty(self):
+        self.assertEqual(percentile([7.5], 95), 7.5)
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
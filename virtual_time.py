@@ -0,0 +1,159 @@
+"""Fast-forward the page's clock while a test waits on it.
+
+Tests 04, 07, 08 and 09 wait up to 5-10 seconds for an alert or a redirect
+the page may schedule with setTimeout. For tests marked @fast_forward,
+every Waiter wait hands the page a virtual-time budget equal to its
+timeout under the DevTools "pauseIfNetworkFetchesPending" policy: whenever
+no request is in flight, Chrome runs the page's timers without waiting for
+the wall clock, so a delayed alert or redirect happens at once, and a wait
+whose condition never comes true ends as soon as the page has had its whole
+timeout of its own time. Between waits the page clock runs at real speed.
+
+The budget is granted in CHUNK_MS slices so the virtual time each wait used
+can be counted; the wait report lists it against the real time. The real
+timeout still applies as a backstop, e.g. while a request hangs.
+
+Opt in with SMS_VIRTUAL_TIME=1 (runner.py --virtual-time).
+"""
+import asyncio
+
+from selenium.common.exceptions import NoAlertPresentException, TimeoutException, WebDriverException
+
+import config
+
+ADVANCE = "advance"
+FAST_FORWARD = "pauseIfNetworkFetchesPending"
+CHUNK_MS = 100
+
+
+def fast_forward(test_method):
+    """Let this test's waits run page timers ahead of the wall clock (when virtual time is on)."""
+    test_method.sms_virtual_time = True
+    return test_method
+
+
+def wanted(test_method):
+    return getattr(test_method, "sms_virtual_time", False)
+
+
+class VirtualClock:
+    """Drives the virtual-time policy of the window a Selenium driver controls.
+
+    The clock's state only changes on the CDP loop, so start() and stop()
+    see every event received before them. Policy changes are queued there
+    without waiting for Chrome's reply: while a JavaScript dialog is open
+    the renderer cannot answer, and the wait that saw the dialog must
+    still return.
+    """
+
+    def __init__(self, driver):
+        from cdp import PageSession
+
+        self.driver = driver
+        self.session = PageSession(driver)
+        self.remaining = 0
+        self.granted = 0
+        self.used = 0
+        self.expired = False
+        self.dialog_open = False
+        self.session.on("Emulation.virtualTimeBudgetExpired", self._budget_expired)
+        self.session.on("Page.javascriptDialogOpening", self._dialog_opening)
+        self.session.on("Page.javascriptDialogClosed", self._dialog_closed)
+        self.session.send("Page.enable")
+        self.session.send("Emulation.setVirtualTimePolicy", {"policy": ADVANCE})
+
+    def _queue_policy(self, policy, budget=None):
+        asyncio.ensure_future(self._set_policy(policy, budget))
+
+    async def _set_policy(self, policy, budget=None):
+        params = {"policy": policy}
+        if budget is not None:
+            params["budget"] = budget
+        try:
+            await self.session.send_async("Emulation.setVirtualTimePolicy", params)
+        except Exception:
+            pass
+
+    async def _grant(self):
+        # Runs on the loop only, so it cannot interleave with _start or _stop
+        if self.remaining <= 0 or self.dialog_open:
+            self.expired = True
+            return
+        self.granted = min(CHUNK_MS, self.remaining)
+        self.remaining -= self.granted
+        self._queue_policy(FAST_FORWARD, self.granted)
+
+    async def _budget_expired(self, params, session_id):
+        if self.granted:
+            self.used += self.granted
+            self.granted = 0
+            await self._grant()
+
+    def _dialog_opening(self, params, session_id):
+        self.dialog_open = True
+
+    def _dialog_closed(self, params, session_id):
+        self.dialog_open = False
+
+    async def _start(self, budget_ms, dialog_closed):
+        if dialog_closed:
+            self.dialog_open = False
+        self.remaining, self.granted, self.used, self.expired = budget_ms, 0, 0, False
+        await self._grant()
+
+    async def _stop(self):
+        self.remaining = self.granted = 0
+        self._queue_policy(ADVANCE)
+        return self.used
+
+    def _alert_present(self):
+        try:
+            self.driver.switch_to.alert
+            return True
+        except NoAlertPresentException:
+            return False
+        except WebDriverException:
+            return True
+
+    def start(self, timeout):
+        """Begin a wait: fast-forward the page by up to timeout seconds of its own time."""
+        # The dialog-closed event for an alert the test just accepted may
+        # still be on its way; ask WebDriver before trusting the flag
+        dialog_closed = self.dialog_open and not self._alert_present()
+        self.session.loop.run(self._start(int(timeout * 1000), dialog_closed), timeout=5)
+
+    def bounded(self, condition):
+        """condition, but raising TimeoutException once the page has used its whole budget."""
+        def check(driver):
+            # Read first: a condition checked after the budget ran out gets the last word
+            expired = self.expired
+            result = condition(driver)
+            if not result and expired:
+                raise TimeoutException("page used its whole virtual-time budget")
+            return result
+        return check
+
+    def stop(self):
+        """End the wait and return the virtual seconds it used (to within CHUNK_MS)."""
+        try:
+            return self.session.loop.run(self._stop(), timeout=5) / 1000
+        except Exception:
+            return None
+
+    def close(self):
+        try:
+            self.session.loop.run(self._stop(), timeout=5)
+        except Exception:
+            pass
+        self.session.close()
+
+
+def attach(driver):
+    """Return a VirtualClock for driver's window, or None when virtual time is off or unavailable."""
+    if not config.VIRTUAL_TIME:
+        return None
+    try:
+        return VirtualClock(driver)
+    except Exception as error:
+        print(f"Virtual time disabled: {error}")
+        return None
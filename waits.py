@@ -0,0 +1,263 @@
+"""Condition-based waits used in place of fixed time.sleep calls.
+
+Every wait returns as soon as its condition holds and records how long it
+actually took, so the suite can report where its wall-clock time goes.
+When a virtual_time.VirtualClock is set, waits fast-forward the page's
+timers and also record how much page time they covered.
+"""
+import time
+
+from selenium.common.exceptions import (
+    NoAlertPresentException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    UnexpectedAlertPresentException,
+    WebDriverException,
+)
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+NETWORK_QUIET_PERIOD = 0.2
+
+# Installed once per document: counts fetch/XHR requests still in flight.
+_NETWORK_PROBE_JS = """
+var w = window;
+if (!w.__smsNet) {
+    w.__smsNet = {pending: 0};
+    var net = w.__smsNet;
+    var done = function () { net.pending = Math.max(0, net.pending - 1); };
+    if (w.fetch) {
+        var origFetch = w.fetch;
+        w.fetch = function () {
+            net.pending++;
+            return origFetch.apply(this, arguments).then(
+                function (r) { done(); return r; },
+                function (e) { done(); throw e; });
+        };
+    }
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        net.pending++;
+        this.addEventListener('loadend', done);
+        return origSend.apply(this, arguments);
+    };
+}
+return {
+    ready: document.readyState,
+    pending: w.__smsNet.pending,
+    resources: performance.getEntriesByType('resource').length
+};
+"""
+
+# Reports whether a form submission was blocked by HTML5 constraint validation.
+_FORM_BLOCKED_JS = """
+var form = arguments[0];
+return form.isConnected && typeof form.checkValidity === 'function' && !form.checkValidity();
+"""
+
+
+class WaitRecord:
+    """Outcome of a single wait: what was awaited and how long it really took."""
+
+    def __init__(self, test, label, timeout, elapsed, satisfied, virtual=None):
+        self.test = test
+        self.label = label
+        self.timeout = timeout
+        self.elapsed = elapsed
+        self.satisfied = satisfied
+        # Page time the wait fast-forwarded through, if it ran on virtual time
+        self.virtual = virtual
+
+    def as_dict(self):
+        return {
+            'test': self.test,
+            'label': self.label,
+            'timeout': self.timeout,
+            'elapsed': round(self.elapsed, 4),
+            'satisfied': self.satisfied,
+            'virtual': self.virtual,
+        }
+
+
+def _alert_present(driver):
+    try:
+        return driver.switch_to.alert
+    except NoAlertPresentException:
+        return None
+
+
+def _document_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def _is_stale(element):
+    try:
+        element.is_enabled()
+        return False
+    except StaleElementReferenceException:
+        return True
+
+
+class Waiter:
+    """Waits for page conditions with per-wait timeouts and timing records."""
+
+    def __init__(self, driver, timeout=DEFAULT_TIMEOUT, poll=POLL_INTERVAL):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+        self.records = []
+        self.current_test = None
+        self.clock = None
+
+    def begin(self, test_name):
+        """Attribute subsequent waits to the given test; virtual time is off until set again."""
+        self.current_test = test_name
+        self.clock = None
+
+    def until(self, label, condition, timeout=None, raise_on_timeout=True, virtual=True):
+        """Poll condition(driver) until it returns a truthy value.
+
+        Returns that value, or None when the timeout expires and
+        raise_on_timeout is False. With a clock set, the timeout is also
+        reached once the page has had `timeout` seconds of virtual time;
+        virtual=False keeps a wait on the wall clock.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        clock = self.clock if virtual else None
+        if clock:
+            clock.start(timeout)
+            condition = clock.bounded(condition)
+        start = time.monotonic()
+        satisfied = False
+        try:
+            result = WebDriverWait(
+                self.driver, timeout, poll_frequency=self.poll,
+                ignored_exceptions=(NoSuchElementException, StaleElementReferenceException),
+            ).until(condition)
+            satisfied = True
+            return result
+        except TimeoutException:
+            if raise_on_timeout:
+                raise
+            return None
+        finally:
+            self.records.append(WaitRecord(
+                self.current_test, label, timeout, time.monotonic() - start, satisfied,
+                clock.stop() if clock else None))
+
+    def for_page_ready(self, timeout=None, raise_on_timeout=True):
+        """Wait until document.readyState is complete (or an alert is up)."""
+        def condition(driver):
+            if _alert_present(driver):
+                return True
+            try:
+                return _document_ready(driver)
+            except UnexpectedAlertPresentException:
+                return True
+        return self.until("page ready", condition, timeout, raise_on_timeout)
+
+    def for_network_idle(self, timeout=None, quiet=NETWORK_QUIET_PERIOD, raise_on_timeout=True):
+        """Wait until the page is loaded and no fetch/XHR/resource activity is seen for `quiet` seconds."""
+        state = {'resources': None, 'since': None}
+
+        def condition(driver):
+            if _alert_present(driver):
+                return True
+            try:
+                probe = driver.execute_script(_NETWORK_PROBE_JS)
+            except UnexpectedAlertPresentException:
+                return True
+            now = time.monotonic()
+            if probe['ready'] != 'complete' or probe['pending'] or probe['resources'] != state['resources']:
+                state['resources'] = probe['resources']
+                state['since'] = now
+                return False
+            return now - state['since'] >= quiet
+        # The quiet period is measured on the wall clock
+        return self.until("network idle", condition, timeout, raise_on_timeout, virtual=False)
+
+    def for_url(self, predicate, label="url", timeout=None, raise_on_timeout=True):
+        """Wait until predicate(current_url) holds."""
+        def condition(driver):
+            if _alert_present(driver):
+                return False
+            return predicate(driver.current_url)
+        return self.until(label, condition, timeout, raise_on_timeout)
+
+    def for_url_contains(self, fragment, timeout=None, raise_on_timeout=True):
+        """Wait until the current URL contains fragment."""
+        return self.for_url(lambda url: fragment in url, f"url contains {fragment}",
+                            timeout, raise_on_timeout)
+
+    def for_element(self, by, value, timeout=None, raise_on_timeout=True):
+        """Wait until an element matching the locator exists and return it."""
+        def condition(driver):
+            found = driver.find_elements(by, value)
+            return found[0] if found else False
+        return self.until(f"element {value}", condition, timeout, raise_on_timeout)
+
+    def for_alert(self, timeout=None, raise_on_timeout=True):
+        """Wait until a JavaScript alert is open and return it."""
+        return self.until("alert", lambda driver: _alert_present(driver) or False,
+                          timeout, raise_on_timeout)
+
+    def for_submission(self, form, timeout=None, raise_on_timeout=True):
+        """Wait for the outcome of submitting form.
+
+        Returns once an alert opens, HTML5 validation blocks the submission,
+        or the browser has navigated away and the new page is ready.
+        """
+        def condition(driver):
+            if _alert_present(driver):
+                return "alert"
+            try:
+                if not _is_stale(form):
+                    return "blocked" if driver.execute_script(_FORM_BLOCKED_JS, form) else False
+                return "navigated" if _document_ready(driver) else False
+            except UnexpectedAlertPresentException:
+                return "alert"
+            except WebDriverException:
+                return False
+        return self.until("form submission", condition, timeout, raise_on_timeout)
+
+    def for_navigation(self, old_root, timeout=None, raise_on_timeout=True):
+        """Wait until old_root (e.g. the previous <html> element) is gone and the new page is ready."""
+        def condition(driver):
+            if _alert_present(driver):
+                return True
+            try:
+                return _is_stale(old_root) and _document_ready(driver)
+            except UnexpectedAlertPresentException:
+                return True
+        return self.until("navigation", condition, timeout, raise_on_timeout)
+
+    def report_lines(self, slowest=5):
+        """Summarise recorded waits: totals per label and the slowest individual waits."""
+        if not self.records:
+            return ["No waits recorded"]
+        total = sum(r.elapsed for r in self.records)
+        lines = [f"Waits: {len(self.records)}, total {total:.2f}s"]
+        by_label = {}
+        for record in self.records:
+            count, elapsed, timeouts = by_label.get(record.label, (0, 0.0, 0))
+            by_label[record.label] = (count + 1, elapsed + record.elapsed,
+                                      timeouts + (0 if record.satisfied else 1))
+        for label, (count, elapsed, timeouts) in sorted(by_label.items(), key=lambda i: -i[1][1]):
+            lines.append(f"  {label:<28} x{count:<3} {elapsed:7.2f}s  timeouts: {timeouts}")
+        lines.append("Slowest waits:")
+        for record in sorted(self.records, key=lambda r: -r.elapsed)[:slowest]:
+            outcome = "ok" if record.satisfied else "timed out"
+            lines.append(f"  {record.elapsed:6.2f}s / {record.timeout}s  {record.label:<24} "
+                         f"{record.test} ({outcome})")
+        virtual = {}
+        for record in self.records:
+            if record.virtual is not None:
+                page, real = virtual.get(record.test, (0.0, 0.0))
+                virtual[record.test] = (page + record.virtual, real + record.elapsed)
+        if virtual:
+            lines.append("Virtual time (page time fast-forwarded vs real time, in waits):")
+            for test, (page, real) in sorted(virtual.items()):
+                lines.append(f"  {test:<55} page {page:6.2f}s  real {real:6.2f}s")
+        return lines